@@ -0,0 +1,68 @@
+"""Compare per-review and vectorized review aggregation on synthetic corpora.
+
+Run from the project root:
+    python -m benchmarks.bench_batch_analysis --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+
+from src.analyzer.batch_analysis import ReviewColumns, analyze_review_columns
+from src.analyzer.review_analyzer import ReviewAnalyzer
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+WORDS = ("great sound quality battery life comfortable fit noise cancelling works well "
+         "terrible connection poor build the this is and it was very good love perfect "
+         "bad worst amazing").split()
+
+
+def make_reviews(count, seed=0):
+    """Synthetic review dicts shaped like ReviewAnalyzer output"""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': f"R{i:013d}",
+            'rating': float(rng.choice((1, 2, 3, 4, 4, 5, 5, 5))),
+            'title': "Synthetic review",
+            'text': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 40))),
+            'date': f"Reviewed in the United States on {rng.choice(MONTHS)} "
+                    f"{rng.randint(1, 28)}, {rng.randint(2019, 2025)}",
+            'verified': rng.random() < 0.8,
+        }
+        for i in range(count)
+    ]
+
+
+def timed(function, *args):
+    """Run a function once and return (seconds, result)"""
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def run(sizes):
+    """Time the per-review loop against the columnar path at each corpus size"""
+    analyzer = ReviewAnalyzer(None)
+    print(f"{'reviews':>9}{'per-review s':>14}{'batch s':>10}{'columns s':>11}{'aggregate s':>13}")
+    for size in sizes:
+        reviews = make_reviews(size)
+        loop_seconds, _ = timed(analyzer.analyze_reviews, reviews)
+        batch_seconds, _ = timed(analyzer.analyze_reviews_batch, reviews)
+        build_seconds, columns = timed(
+            ReviewColumns.from_reviews, reviews, analyzer._analyze_sentiment
+        )
+        aggregate_seconds, _ = timed(analyze_review_columns, columns)
+        print(f"{size:>9}{loop_seconds:>14.3f}{batch_seconds:>10.3f}"
+              f"{build_seconds:>11.3f}{aggregate_seconds:>13.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+    run(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
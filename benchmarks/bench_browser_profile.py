@@ -0,0 +1,90 @@
+"""Compare page load time and memory of the full and lean browser profiles.
+
+Needs Chrome and chromedriver. Pages come from the local stand-in site, whose
+fixtures still reference remote images and scripts the way live pages do:
+    python -m benchmarks.bench_browser_profile --pages 20 --profiles full lean
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.standin_site import start_standin_site
+from src.auth.amazon_auth import AmazonAuthenticator, BROWSER_PROFILES
+
+
+def process_tree_rss(pid):
+    """Resident memory in MB of a process and all its descendants, read from /proc"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces; fields after it are space separated
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def run_profile(profile, urls):
+    """Seconds per page load and the driver's memory after loading every page"""
+    auth = AmazonAuthenticator(profile)
+    auth.initialize_driver()
+    try:
+        timings = []
+        for url in urls:
+            started = time.perf_counter()
+            auth.driver.get(url)
+            timings.append(time.perf_counter() - started)
+        return timings, process_tree_rss(auth.driver.service.process.pid)
+    finally:
+        auth.close()
+
+
+def run(pages, profiles):
+    """Load the same product and review pages with each profile"""
+    server = start_standin_site()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ['AMAZON_BASE_URL'] = base_url
+    urls = [
+        f"{base_url}/product-reviews/B08MVGF24M/?pageNumber=1&n={i}" if i % 2 else f"{base_url}/dp/B08MVGF24M?n={i}"
+        for i in range(pages)
+    ]
+
+    print(f"{'profile':<9}{'median ms':>11}{'p90 ms':>9}{'driver MB':>11}")
+    try:
+        for profile in profiles:
+            timings, rss = run_profile(profile, urls)
+            timings.sort()
+            print(f"{profile:<9}{statistics.median(timings) * 1000:>11.0f}"
+                  f"{timings[int(len(timings) * 0.9)] * 1000:>9.0f}{rss:>11.0f}")
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--profiles', nargs='+', choices=BROWSER_PROFILES, default=list(BROWSER_PROFILES))
+    args = parser.parse_args()
+    run(args.pages, args.profiles)
+
+
+if __name__ == "__main__":
+    main()
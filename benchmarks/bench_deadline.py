@@ -0,0 +1,141 @@
+"""Measure query latency percentiles with and without a deadline against the local stand-in site.
+
+Some product pages stall for a few seconds before answering. With
+--broken-reviews every review page fails, which the circuit breaker stops
+requesting after a few failures. Queries run the pipelined path over
+browserless fetches with a stub LLM:
+    python -m benchmarks.bench_deadline --queries 20 --stall-rate 0.1 --stall 5 --deadline 4
+"""
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from benchmarks.standin_site import StandInHandler, start_standin_site
+from benchmarks.stub_llm import StubLLMClient
+from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.main import AmazonAIShopperBot
+from src.scraper.circuit_breaker import CircuitBreaker
+from src.scraper.deadline import Deadline
+from src.scraper.fetchers import HttpFetcher
+from src.scraper.product_scraper import ProductScraper
+from src.scraper.rate_limiter import RateLimiter
+
+QUERY = "wireless headphones"
+
+
+class FlakyHandler(StandInHandler):
+    """Stand-in site whose product pages sometimes stall and whose review pages can be broken"""
+
+    stall = 0.0
+    stall_rate = 0.0
+    broken_reviews = False
+    requests = 0
+    _lock = threading.Lock()
+    _random = random.Random(0)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        with self._lock:
+            FlakyHandler.requests += 1
+            stalled = path.startswith('/dp/') and self._random.random() < self.stall_rate
+        if stalled:
+            time.sleep(self.stall)
+        try:
+            if self.broken_reviews and path.startswith('/product-reviews/'):
+                self.send_error(503)
+                return
+            super().do_GET()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on a stalled page at its deadline
+            pass
+
+
+def make_bot(workers, llm_latency, breaker):
+    """Shopper bot that fetches every page over HTTP and asks a stub LLM"""
+    bot = AmazonAIShopperBot(llm_client=StubLLMClient("1. Recommended Product: P1", latency=llm_latency))
+    bot.fetcher = HttpFetcher(cookies_file='', max_workers=workers, rate_limiter=RateLimiter(rate=0),
+                              circuit_breaker=breaker)
+    bot.scraper = ProductScraper(None, rate_limiter=bot.fetcher.rate_limiter, fetcher=bot.fetcher,
+                                 circuit_breaker=breaker)
+    bot.analyzer = ReviewAnalyzer(None, rate_limiter=bot.fetcher.rate_limiter, fetcher=bot.fetcher,
+                                  circuit_breaker=breaker)
+    bot.pipelined = True
+    return bot
+
+
+def measure(queries, deadline, workers, llm_latency, breaker):
+    """Latency of each query, how many answered from partial results, and the requests sent"""
+    FlakyHandler._random.seed(0)
+    FlakyHandler.requests = 0
+    bot = make_bot(workers, llm_latency, breaker)
+    latencies = []
+    partial = 0
+    try:
+        for _ in range(queries):
+            started = time.perf_counter()
+            bot.search_and_analyze(QUERY, deadline=Deadline(deadline))
+            latencies.append(time.perf_counter() - started)
+            partial += bot.partial
+    finally:
+        bot.release()
+    return sorted(latencies), partial, FlakyHandler.requests
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run(queries, stall, stall_rate, deadline, broken_reviews, workers, llm_latency):
+    """Compare no deadline, a deadline, and a deadline with the circuit breaker"""
+    FlakyHandler.stall = stall
+    FlakyHandler.stall_rate = stall_rate
+    FlakyHandler.broken_reviews = broken_reviews
+    server = start_standin_site(handler=FlakyHandler)
+    os.environ.update({
+        'AMAZON_BASE_URL': f"http://127.0.0.1:{server.server_address[1]}",
+        'SHOPPER_CACHE_PATH': '',
+        'SHOPPER_REVIEW_STORE': '',
+        'SHOPPER_PRERANK_TOP_K': '0',
+    })
+    # Each query logs its failed pages and deadlines; only the table matters here
+    logging.disable(logging.CRITICAL)
+
+    print(f"{queries} queries, {stall_rate:.0%} of product pages stall {stall:.1f}s, "
+          f"review pages {'broken' if broken_reviews else 'working'}, {llm_latency:.2f}s LLM latency")
+    print(f"{'setting':<22}{'p50':>8}{'p99':>8}{'max':>8}{'partial':>9}{'requests':>10}")
+    settings = [
+        ('no deadline', None, CircuitBreaker(failure_threshold=0)),
+        (f"{deadline:.1f}s deadline", deadline, CircuitBreaker(failure_threshold=0)),
+        (f"{deadline:.1f}s + breaker", deadline, CircuitBreaker(failure_threshold=5, reset_timeout=30)),
+    ]
+    try:
+        for name, seconds, breaker in settings:
+            latencies, partial, requests = measure(queries, seconds, workers, llm_latency, breaker)
+            print(f"{name:<22}{percentile(latencies, 0.5):>7.2f}s{percentile(latencies, 0.99):>7.2f}s"
+                  f"{latencies[-1]:>7.2f}s{partial:>9}{requests:>10}")
+    finally:
+        logging.disable(logging.NOTSET)
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--stall', type=float, default=5.0, help="seconds a stalled product page takes")
+    parser.add_argument('--stall-rate', type=float, default=0.1, help="share of product pages that stall")
+    parser.add_argument('--deadline', type=float, default=4.0, help="seconds allowed per query")
+    parser.add_argument('--broken-reviews', action='store_true', help="answer every review page with 503")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent page fetches")
+    parser.add_argument('--llm-latency', type=float, default=0.3, help="stub LLM latency in seconds")
+    args = parser.parse_args()
+    run(args.queries, args.stall, args.stall_rate, args.deadline, args.broken_reviews, args.workers,
+        args.llm_latency)
+
+
+if __name__ == "__main__":
+    main()
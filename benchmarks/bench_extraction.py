@@ -0,0 +1,59 @@
+"""Measure per-page snapshot extraction cost against saved HTML fixtures.
+
+Run from the project root:
+    python -m benchmarks.bench_extraction
+"""
+import argparse
+import os
+import timeit
+
+from src.scraper.html_extractor import (
+    extract_search_results,
+    extract_product_details,
+    extract_reviews,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Fixture name, extractor, and the WebDriver round-trips the element-by-element
+# path needs for the same page (one find_element/get_attribute per field).
+CASES = [
+    ('search_results.html',
+     lambda html: extract_search_results(html, 'https://www.amazon.com/s', limit=5),
+     lambda result: 1 + 5 * len(result)),
+    ('product_page.html',
+     extract_product_details,
+     lambda result: 4 + 1 + len(result['features'])),
+    ('reviews_page.html',
+     extract_reviews,
+     lambda result: 1 + 5 * len(result)),
+]
+
+
+def load_fixture(name):
+    """Read a saved HTML fixture"""
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def run(repeat):
+    """Time each extractor and print a per-page summary"""
+    print(f"{'fixture':<22}{'items':>7}{'ms/page':>10}{'pages/s':>10}{'webdriver calls':>17}")
+    for name, extractor, round_trips in CASES:
+        html = load_fixture(name)
+        result = extractor(html)
+        items = len(result) if isinstance(result, list) else 1
+        seconds = min(timeit.repeat(lambda: extractor(html), number=repeat, repeat=3)) / repeat
+        print(f"{name:<22}{items:>7}{seconds * 1000:>10.3f}{1 / seconds:>10.0f}"
+              f"{round_trips(result):>17}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help="extractions per timing run")
+    args = parser.parse_args()
+    run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
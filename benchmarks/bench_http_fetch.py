@@ -0,0 +1,55 @@
+"""Measure browserless page fetch throughput against the local stand-in site.
+
+Run from the project root:
+    python -m benchmarks.bench_http_fetch
+"""
+import argparse
+import time
+
+from benchmarks.standin_site import start_standin_site
+from src.scraper.fetchers import HttpFetcher
+from src.scraper.html_extractor import extract_product_details, extract_reviews
+from src.scraper.rate_limiter import RateLimiter
+
+
+def run(pages, workers):
+    """Fetch and parse product and review pages over pooled HTTP connections"""
+    server = start_standin_site()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    fetcher = HttpFetcher(cookies_file='', max_workers=workers, rate_limiter=RateLimiter(rate=0))
+
+    urls = []
+    for i in range(pages):
+        if i % 2:
+            urls.append(f"{base_url}/product-reviews/B08MVGF24M/?pageNumber=1&n={i}")
+        else:
+            urls.append(f"{base_url}/dp/B08MVGF24M?n={i}")
+
+    try:
+        started = time.perf_counter()
+        parsed = 0
+        for url, page_source in fetcher.fetch_many(urls):
+            if '/dp/' in url:
+                extract_product_details(page_source)
+            else:
+                extract_reviews(page_source)
+            parsed += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        fetcher.close()
+        server.shutdown()
+
+    print(f"{parsed} pages with {workers} workers: {elapsed:.3f}s, "
+          f"{elapsed / parsed * 1000:.2f} ms/page, {parsed / elapsed:.0f} pages/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    run(args.pages, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Time recommendation requests with and without the LLM response cache.
+
+Run from the project root:
+    python -m benchmarks.bench_llm_cache --latency 1.0
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_prompt import make_products
+from benchmarks.stub_llm import StubLLMClient
+from src.recommender.prompt_builder import PromptBuilder
+from src.storage.llm_cache import LLMCache
+
+
+def retag_links(products, tag):
+    """Copies of products whose links differ only in tracking parameters"""
+    return [
+        dict(product, basic_info=dict(product['basic_info'], link=product['basic_info']['link'] + tag))
+        for product in products
+    ]
+
+
+def recommend(builder, client, cache, products, query):
+    """One cached recommendation request; returns (milliseconds, served from cache)"""
+    started = time.perf_counter()
+    prompt = builder.build(products, query)
+    reply = cache.get_response(prompt.query, prompt.records, client.params())
+    hit = reply is not None
+    if not hit:
+        reply = client.complete(prompt.messages)
+        cache.put_response(prompt.query, prompt.records, client.params(), reply)
+    return (time.perf_counter() - started) * 1000, hit
+
+
+def run(latency, num_products):
+    """Send a first, repeated and near-repeated request through a stub client with API-like latency"""
+    products = make_products(num_products)
+    builder = PromptBuilder()
+    client = StubLLMClient(latency=latency)
+    requests = [
+        ("first request", products, "wireless headphones"),
+        ("exact repeat", products, "wireless headphones"),
+        ("near repeat", retag_links(products, "&th=1"), "  Wireless Headphones!"),
+        ("new query", products, "noise cancelling headphones"),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = LLMCache(os.path.join(directory, 'bench_cache.db'))
+        print(f"{'request':<15}{'ms':>9}{'cache':>7}")
+        for name, batch, query in requests:
+            elapsed, hit = recommend(builder, client, cache, batch, query)
+            print(f"{name:<15}{elapsed:>9.1f}{'hit' if hit else 'miss':>7}")
+        print(f"\nAPI calls: {len(client.requests)} of {len(requests)} requests")
+        cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=1.0, help="stub API latency in seconds")
+    parser.add_argument('--products', type=int, default=5)
+    args = parser.parse_args()
+    run(args.latency, args.products)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare time-to-first-output of blocking and streaming recommendations.
+
+Runs the real OpenAI client against the local stub API server, so it
+needs no network access or API key:
+    python -m benchmarks.bench_llm_stream --first-token 0.5 --token-delay 0.02
+"""
+import argparse
+import asyncio
+import time
+
+import openai
+
+from benchmarks.bench_prompt import make_products
+from benchmarks.stub_llm_server import StubLLMHandler, start_stub_llm_server
+from src.recommender.llm_client import OpenAIChatClient
+from src.recommender.prompt_builder import PromptBuilder
+
+
+def blocking(client, messages):
+    """(first output, total) seconds for a blocking completion"""
+    started = time.perf_counter()
+    client.complete(messages)
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+async def streaming(client, messages):
+    """(first output, total) seconds for a streamed completion"""
+    started = time.perf_counter()
+    first = None
+    async for _ in client.astream(messages):
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+async def cancelled(client, messages, timeout):
+    """Seconds until a stream is abandoned because of its timeout"""
+    client = OpenAIChatClient(api_base=client.api_base, timeout=timeout)
+    started = time.perf_counter()
+    try:
+        async for _ in client.astream(messages):
+            pass
+    except asyncio.TimeoutError:
+        return time.perf_counter() - started
+    return None
+
+
+def run(first_token, token_delay):
+    """Time both paths against the stub server"""
+    StubLLMHandler.first_token_delay = first_token
+    StubLLMHandler.token_delay = token_delay
+    server = start_stub_llm_server()
+    openai.api_key = openai.api_key or 'stub'
+
+    client = OpenAIChatClient(api_base=f"http://127.0.0.1:{server.server_port}/v1")
+    messages = PromptBuilder().build(make_products(5), "wireless headphones").messages
+
+    try:
+        print(f"{'path':<10}{'first output s':>16}{'total s':>9}")
+        for name, (first, total) in (
+            ('blocking', blocking(client, messages)),
+            ('streaming', asyncio.run(streaming(client, messages))),
+        ):
+            print(f"{name:<10}{first:>16.3f}{total:>9.3f}")
+
+        timeout = first_token / 2
+        abandoned = asyncio.run(cancelled(client, messages, timeout))
+        print(f"\nStream with a {timeout:.2f}s timeout abandoned after {abandoned:.3f}s")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--first-token', type=float, default=0.5, help="stub latency before the first token")
+    parser.add_argument('--token-delay', type=float, default=0.02, help="stub latency between tokens")
+    args = parser.parse_args()
+    run(args.first_token, args.token_delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare memory and time of whole-corpus and streaming phrase extraction.
+
+Run from the project root:
+    python -m benchmarks.bench_phrases --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+import tracemalloc
+from collections import defaultdict
+
+from benchmarks.bench_batch_analysis import make_reviews
+from src.analyzer.phrases import PhraseExtractor
+
+
+def whole_corpus_phrases(reviews):
+    """The original implementation: join every review and count every bigram"""
+    text = ' '.join(review['text'].lower() for review in reviews)
+    words = text.split()
+    phrases = defaultdict(int)
+
+    for i in range(len(words) - 1):
+        phrase = f"{words[i]} {words[i+1]}"
+        phrases[phrase] += 1
+
+    return dict(sorted(phrases.items(), key=lambda x: x[1], reverse=True)[:5])
+
+
+def streaming_phrases(reviews, capacity):
+    """Streaming extraction with a fixed number of tracked phrases"""
+    extractor = PhraseExtractor(n=2, capacity=capacity)
+    for review in reviews:
+        extractor.add(review['text'])
+    return extractor.top(5)
+
+
+def measure(function, *args):
+    """Seconds and peak traced memory (MB) of one call"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    function(*args)
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024
+
+
+def run(sizes, capacity):
+    """Time both extractors and report their peak memory at each corpus size"""
+    print(f"{'reviews':>9}{'whole s':>9}{'whole MB':>10}{'stream s':>10}{'stream MB':>11}")
+    for size in sizes:
+        reviews = make_reviews(size)
+        whole_seconds, whole_mb = measure(whole_corpus_phrases, reviews)
+        stream_seconds, stream_mb = measure(streaming_phrases, reviews, capacity)
+        print(f"{size:>9}{whole_seconds:>9.2f}{whole_mb:>10.1f}{stream_seconds:>10.2f}{stream_mb:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--capacity', type=int, default=1000, help="phrases tracked by the sketch")
+    args = parser.parse_args()
+    run(args.sizes, args.capacity)
+
+
+if __name__ == "__main__":
+    main()
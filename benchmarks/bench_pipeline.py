@@ -0,0 +1,101 @@
+"""Compare phased and pipelined candidate analysis against the local stand-in site.
+
+Pages are served with a fixed latency and product summaries come from a
+stub LLM client with its own latency, so the numbers show how much of the
+I/O wait the pipeline hides:
+    python -m benchmarks.bench_pipeline --products 5 --latency 0.2 --llm-latency 0.3
+"""
+import argparse
+import math
+import os
+import time
+
+from benchmarks.bench_extraction import load_fixture
+from benchmarks.standin_site import StandInHandler, start_standin_site
+from benchmarks.stub_llm import StubLLMClient
+from src.analyzer.review_analyzer import ReviewAnalyzer, REVIEWS_PER_PAGE
+from src.pipeline.product_pipeline import ProductPipeline
+from src.recommender.prompt_builder import PromptBuilder
+from src.scraper.amazon_urls import extract_asin, review_page_url
+from src.scraper.fetchers import HttpFetcher
+from src.scraper.html_extractor import extract_search_results, extract_product_details, extract_reviews
+from src.scraper.rate_limiter import RateLimiter
+
+QUERY = "wireless headphones"
+
+
+def phased(candidates, fetcher, analyzer, builder, client, num_reviews):
+    """Baseline: fetch every page, then parse, then analyze, then summarize"""
+    urls = {}
+    for rank, product in enumerate(candidates):
+        urls[product['link']] = (rank, 0)
+        for page in range(1, math.ceil(num_reviews / REVIEWS_PER_PAGE) + 1):
+            urls[review_page_url(extract_asin(product['link']), page)] = (rank, page)
+    pages = dict(fetcher.fetch_many(urls))
+
+    details = {}
+    reviews = {rank: [] for rank in range(len(candidates))}
+    for url, (rank, page) in urls.items():
+        if page == 0:
+            details[rank] = extract_product_details(pages[url])
+        else:
+            reviews[rank].extend(extract_reviews(pages[url]))
+
+    products = [
+        {'basic_info': product, 'detailed_info': details[rank],
+         'review_analysis': analyzer.analyze_reviews(reviews[rank][:num_reviews])}
+        for rank, product in enumerate(candidates)
+    ]
+    for product in products:
+        product['summary'] = client.complete(builder.build_summary(product, QUERY).messages)
+    return products
+
+
+def run(num_products, latency, llm_latency, workers, num_reviews):
+    """Time both paths on the same candidates"""
+    StandInHandler.latency = latency
+    server = start_standin_site()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ['AMAZON_BASE_URL'] = base_url
+
+    candidates = extract_search_results(load_fixture('search_results.html'), base_url, limit=num_products)
+    fetcher = HttpFetcher(cookies_file='', max_workers=workers, rate_limiter=RateLimiter(rate=0))
+    analyzer = ReviewAnalyzer(driver=None)
+    builder = PromptBuilder()
+    client = StubLLMClient("Solid battery life and comfort; some complaints about the microphone.",
+                           latency=llm_latency)
+
+    try:
+        started = time.perf_counter()
+        phased(candidates, fetcher, analyzer, builder, client, num_reviews)
+        phased_seconds = time.perf_counter() - started
+
+        pipeline = ProductPipeline(fetcher, analyzer, prompt_builder=builder, llm_client=client,
+                                   num_reviews=num_reviews)
+        started = time.perf_counter()
+        pipeline.run(candidates, QUERY)
+        pipelined_seconds = time.perf_counter() - started
+    finally:
+        fetcher.close()
+        server.shutdown()
+
+    print(f"{len(candidates)} products, {latency:.2f}s page latency, {workers} fetch workers, "
+          f"{llm_latency:.2f}s LLM latency")
+    print(f"phased     {phased_seconds:.3f}s")
+    print(f"pipelined  {pipelined_seconds:.3f}s ({phased_seconds / pipelined_seconds:.1f}x)\n")
+    print(pipeline.pipeline.format_report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.2, help="stand-in page latency in seconds")
+    parser.add_argument('--llm-latency', type=float, default=0.3, help="stub LLM latency in seconds")
+    parser.add_argument('--workers', type=int, default=3, help="concurrent page fetches")
+    parser.add_argument('--reviews', type=int, default=20)
+    args = parser.parse_args()
+    run(args.products, args.latency, args.llm_latency, args.workers, args.reviews)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Count the product and review page loads that listing-level pre-ranking saves per query.
+
+Listings come from synthetic search pages. Without pre-ranking, the first
+five listings within budget get a product page and two review pages each.
+The pick of each selection stands in for the recommendation: the analyzed
+listing with the best review-count-adjusted rating. "Same pick" compares it
+with the baseline's, and "as good" also counts picks rated at least as well:
+    python -m benchmarks.bench_prerank --queries 200 --top-k 3 --pool 5
+"""
+import argparse
+import random
+
+from benchmarks.synthetic import make_search_page
+from src.analyzer.prerank import PreRanker
+from src.scraper.html_extractor import extract_search_results, parse_price
+
+QUERY = "wireless noise cancelling headphones"
+# A product page plus the review pages for 20 reviews
+LOADS_PER_PRODUCT = 3
+BASELINE_CANDIDATES = 5
+
+
+def pick(ranker, listings):
+    """The listing with the best adjusted rating"""
+    return max(listings, key=ranker.adjusted_rating)
+
+
+def run(num_queries, top_k, pool_size):
+    """Compare page loads and picks of the baseline, top-k and adaptive selection"""
+    rng = random.Random(0)
+    rankers = {
+        f'top-{top_k}': PreRanker(top_k=top_k, pool_size=pool_size),
+        'adaptive': PreRanker(top_k=top_k, pool_size=pool_size, adaptive=True),
+    }
+    reference = PreRanker()
+    loads = {'baseline': 0, **{name: 0 for name in rankers}}
+    same = dict.fromkeys(loads, 0)
+    as_good = dict.fromkeys(loads, 0)
+    queries = 0
+
+    for seed in range(num_queries):
+        budget = rng.choice((None, 100, 200))
+        listings = [
+            product for product in extract_search_results(make_search_page(48, seed=seed))
+            if not product['sponsored'] and (not budget or (parse_price(product['price']) or budget + 1) <= budget)
+        ][:pool_size]
+        if not listings:
+            continue
+        queries += 1
+
+        selections = {'baseline': listings[:BASELINE_CANDIDATES]}
+        for name, ranker in rankers.items():
+            selections[name] = ranker.select(listings, QUERY, budget)
+        baseline_pick = pick(reference, selections['baseline'])
+        for name, selected in selections.items():
+            loads[name] += LOADS_PER_PRODUCT * len(selected)
+            chosen = pick(reference, selected)
+            same[name] += chosen is baseline_pick
+            as_good[name] += reference.adjusted_rating(chosen) >= reference.adjusted_rating(baseline_pick)
+
+    print(f"{queries} queries, up to {pool_size} listings scored per query\n")
+    print(f"{'selection':<12}{'loads/query':>13}{'saved':>8}{'same pick':>11}{'as good':>9}")
+    for name in loads:
+        print(f"{name:<12}{loads[name] / queries:>13.1f}{1 - loads[name] / loads['baseline']:>8.0%}"
+              f"{same[name] / queries:>11.0%}{as_good[name] / queries:>9.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--pool', type=int, default=5, help="listings scored per query")
+    args = parser.parse_args()
+    run(args.queries, args.top_k, args.pool)
+
+
+if __name__ == "__main__":
+    main()
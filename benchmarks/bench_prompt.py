@@ -0,0 +1,83 @@
+"""Compare the full-JSON recommendation prompt with the compact, token-budgeted one.
+
+Run from the project root:
+    python -m benchmarks.bench_prompt --products 5 --budgets 3000 1200 600
+"""
+import argparse
+import random
+
+from benchmarks.bench_batch_analysis import make_reviews
+from benchmarks.stub_llm import StubLLMClient
+from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.recommender.prompt_builder import PromptBuilder
+
+FEATURES = [
+    "ACTIVE NOISE CANCELLING: Advanced hybrid noise cancellation blocks up to 98% of ambient sound "
+    "so you can focus on your music, calls and work",
+    "LONG BATTERY LIFE: Up to 40 hours of playtime on a single charge, and a 10 minute quick charge "
+    "gives you 4 more hours of listening",
+    "COMFORTABLE FIT: Memory foam ear cushions and an adjustable headband for all-day comfort",
+    "HI-RES AUDIO: 40mm dynamic drivers deliver deep bass and crisp highs",
+    "MULTIPOINT CONNECTION: Connect to two devices at once with Bluetooth 5.3",
+    "Active noise cancelling: advanced hybrid noise cancellation blocks up to 98% of ambient sound "
+    "so you can focus on your music, calls and work",
+]
+
+
+def make_products(count, seed=0):
+    """Synthetic analyzed products shaped like search_and_analyze output"""
+    rng = random.Random(seed)
+    analyzer = ReviewAnalyzer(driver=None)
+    products = []
+    for rank in range(count):
+        asin = ''.join(rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789') for _ in range(10))
+        title = (f"Wireless Over-Ear Headphones Model {rank + 1}, Bluetooth 5.3 Active Noise Cancelling "
+                 f"Headphones with Microphone, 40H Playtime, Deep Bass, Foldable")
+        price = f"{rng.randint(30, 300)}."
+        products.append({
+            'basic_info': {
+                'title': title,
+                'price': price,
+                'rating': f"{rng.uniform(3.5, 4.9):.1f} out of 5 stars",
+                'review_count': f"{rng.randint(100, 40000):,}",
+                'link': f"https://www.amazon.com/Wireless-Headphones-Cancelling-Microphone/dp/{asin}"
+                        f"/ref=sr_1_{rank + 1}?crid=2ABCDEF&keywords=headphones&qid=1700000000&sr=8-{rank + 1}",
+            },
+            'detailed_info': {
+                'title': title,
+                'price': price,
+                'rating': f"{rng.uniform(3.5, 4.9):.1f} out of 5 stars",
+                'features': FEATURES,
+                'availability': "In Stock",
+            },
+            'review_analysis': analyzer.analyze_reviews(make_reviews(20, seed=rank)),
+        })
+    return products
+
+
+def run(num_products, budgets):
+    """Build the prompt at each budget and send it through a stub client"""
+    products = make_products(num_products)
+    client = StubLLMClient()
+    print(f"{'budget':>7}{'tokens':>8}{'full JSON':>11}{'saved':>8}{'level':>7}{'fits':>6}")
+    for budget in budgets:
+        builder = PromptBuilder(budget)
+        prompt = builder.build(products, "wireless headphones")
+        client.complete(prompt.messages)
+        print(f"{budget:>7}{prompt.tokens:>8}{prompt.baseline_tokens:>11}"
+              f"{prompt.saved_tokens / prompt.baseline_tokens:>8.0%}{prompt.level:>7}"
+              f"{'yes' if prompt.within_budget else 'no':>6}")
+    exact = builder.token_counter.exact
+    print(f"\nToken counts {'from tiktoken' if exact else 'estimated (tiktoken not installed)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=5)
+    parser.add_argument('--budgets', type=int, nargs='+', default=[3000, 1200, 600])
+    args = parser.parse_args()
+    run(args.products, args.budgets)
+
+
+if __name__ == "__main__":
+    main()
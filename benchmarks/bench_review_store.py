@@ -0,0 +1,88 @@
+"""Compare statistics from the memory-mapped review store with aggregating review dicts.
+
+Run from the project root:
+    python -m benchmarks.bench_review_store --reviews 1000000 --products 2000 --categories 20
+
+Reviews are written to a temporary store in per-product batches, then one
+product's and one category's statistics are computed from the store and from
+the same reviews loaded as Python dicts. Peak Python allocations are measured
+with tracemalloc, which does not count the memory-mapped pages.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_review_corpus
+from src.analyzer.batch_analysis import ReviewColumns, analyze_review_columns
+from src.storage.review_store import ReviewStore
+
+
+def timed(function):
+    """Result of a call, its seconds and the peak MB Python allocated during it"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def run(total, products, categories):
+    """Fill a store with total reviews and time the aggregations both ways"""
+    per_product = max(1, total // products)
+    corpus = make_review_corpus(per_product)
+    directory = tempfile.mkdtemp(prefix='review_store_')
+    try:
+        store = ReviewStore(directory)
+        started = time.perf_counter()
+        for index in range(products):
+            asin = f"B{index:09d}"
+            # Review ids must differ between products or they would be de-duplicated away
+            reviews = [dict(review, id=f"{asin}-{review['id']}") for review in corpus]
+            store.append(asin, reviews, category=f"category {index % categories}")
+        write_seconds = time.perf_counter() - started
+        stored = store.stats()
+        print(f"Wrote {stored['reviews']} reviews of {stored['products']} products in {write_seconds:.1f}s "
+              f"({stored['reviews'] / write_seconds:.0f} reviews/s)")
+        store.close()
+
+        store = ReviewStore(directory)
+        asin = f"B{0:09d}"
+        in_category = len(range(0, products, categories))
+        cases = [
+            ('product', lambda: store.product_stats(asin),
+             lambda: analyze_review_columns(ReviewColumns.from_reviews(corpus))),
+            ('category', lambda: store.category_stats('category 0'),
+             lambda: analyze_review_columns(ReviewColumns.from_reviews(corpus * in_category))),
+            ('all products', lambda: store.product_ratings(), None),
+        ]
+
+        print(f"{'statistics':<14}{'store ms':>10}{'store MB':>10}{'dicts ms':>10}{'dicts MB':>10}")
+        for name, from_store, from_dicts in cases:
+            # The first call faults the mapped pages in; time the warm path
+            from_store()
+            _, store_seconds, store_peak = timed(from_store)
+            line = f"{name:<14}{store_seconds * 1000:>10.1f}{store_peak:>10.1f}"
+            if from_dicts:
+                _, dict_seconds, dict_peak = timed(from_dicts)
+                line += f"{dict_seconds * 1000:>10.1f}{dict_peak:>10.1f}"
+            print(line)
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--categories', type=int, default=20)
+    args = parser.parse_args()
+    run(args.reviews, args.products, args.categories)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare the substring-scan sentiment baseline with SentimentEngine throughput.
+
+Run from the project root:
+    python -m benchmarks.bench_sentiment --lexicon-sizes 12 1000 5000
+"""
+import argparse
+import random
+import string
+import time
+
+from benchmarks.bench_batch_analysis import make_reviews
+from src.analyzer.sentiment import DEFAULT_LEXICON, SentimentEngine
+
+
+def substring_sentiment(text, positive_words, negative_words):
+    """The original implementation: one substring scan per lexicon word"""
+    text = text.lower()
+    pos_count = sum(1 for word in positive_words if word in text)
+    neg_count = sum(1 for word in negative_words if word in text)
+
+    if pos_count > neg_count:
+        return 'positive'
+    elif neg_count > pos_count:
+        return 'negative'
+    else:
+        return 'neutral'
+
+
+def make_lexicon(size, seed=0):
+    """The default lexicon padded with random words up to size entries"""
+    rng = random.Random(seed)
+    lexicon = dict(DEFAULT_LEXICON)
+    while len(lexicon) < size:
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+        lexicon[word] = rng.choice((-1.0, 1.0))
+    return lexicon
+
+
+def reviews_per_second(function, texts):
+    """Throughput of a per-text classifier"""
+    started = time.perf_counter()
+    function(texts)
+    return len(texts) / (time.perf_counter() - started)
+
+
+def run(lexicon_sizes, num_reviews):
+    """Time both implementations at each lexicon size"""
+    texts = [review['text'] for review in make_reviews(num_reviews)]
+    print(f"{'lexicon':>8}{'substring rev/s':>17}{'engine rev/s':>14}{'speedup':>9}")
+    for size in lexicon_sizes:
+        lexicon = make_lexicon(size)
+        positive = {word for word, score in lexicon.items() if score > 0}
+        negative = {word for word, score in lexicon.items() if score < 0}
+        engine = SentimentEngine(lexicon)
+
+        baseline = reviews_per_second(
+            lambda batch: [substring_sentiment(text, positive, negative) for text in batch], texts
+        )
+        compiled = reviews_per_second(engine.classify_many, texts)
+        print(f"{size:>8}{baseline:>17.0f}{compiled:>14.0f}{compiled / baseline:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lexicon-sizes', type=int, nargs='+', default=[12, 1000, 5000])
+    parser.add_argument('--reviews', type=int, default=5000)
+    args = parser.parse_args()
+    run(args.lexicon_sizes, args.reviews)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Measure the overhead of timing spans and WebDriver command instrumentation.
+
+Run from the project root:
+    python -m benchmarks.bench_tracing --calls 100000
+"""
+import argparse
+import time
+
+from src.instrumentation.tracer import Tracer, instrument_driver
+
+
+class NullDriver:
+    """Driver stand-in whose commands return immediately"""
+
+    def execute(self, driver_command, params=None):
+        return {'value': None}
+
+
+def per_call_us(function, calls):
+    """Average microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def run(calls):
+    """Time bare and instrumented spans and driver commands"""
+    tracer = Tracer()
+
+    def in_span():
+        with tracer.span('analyze_product'):
+            pass
+
+    bare = NullDriver()
+    instrumented = instrument_driver(NullDriver())
+
+    print(f"{'operation':<28}{'us/call':>9}")
+    print(f"{'span':<28}{per_call_us(in_span, calls):>9.2f}")
+    print(f"{'counter':<28}{per_call_us(lambda: tracer.count('webdriver_waits', stage='x'), calls):>9.2f}")
+    print(f"{'driver command':<28}{per_call_us(lambda: bare.execute('findElement'), calls):>9.2f}")
+    print(f"{'instrumented command':<28}{per_call_us(lambda: instrumented.execute('findElement'), calls):>9.2f}")
+    print("\nA real WebDriver command is an HTTP round-trip of roughly 1000-5000 us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+    run(args.calls)
+
+
+if __name__ == "__main__":
+    main()
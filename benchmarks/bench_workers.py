@@ -0,0 +1,100 @@
+"""Measure crawl throughput of the worker processes against the local stand-in site.
+
+Workers fetch over HTTP with a stand-in authenticator, so no browser is
+needed. Pages are served with a fixed latency, and every product gets a
+details job and a reviews job:
+    python -m benchmarks.bench_workers --products 40 --workers 1 2 4 --latency 0.05
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.standin_site import StandInHandler, start_standin_site
+from src.service.workers import WorkerPool, enqueue_product
+from src.storage.job_queue import JobQueue
+from src.storage.product_cache import ProductCache
+
+
+class StandInAuthenticator:
+    """Authenticator without a browser; workers fetch every page over HTTP"""
+
+    def __init__(self, session=None):
+        self.session = session
+        self.driver = None
+
+    def initialize_driver(self):
+        pass
+
+    def login(self, interactive=True):
+        return True
+
+    def close(self):
+        pass
+
+
+def crawl(base_url, num_products, workers, num_reviews):
+    """Seconds for a pool of workers to drain a fresh queue of products"""
+    directory = tempfile.mkdtemp(prefix='bench_workers_')
+    queue_path = os.path.join(directory, 'jobs.db')
+    cache_path = os.path.join(directory, 'cache.db')
+    try:
+        queue = JobQueue(queue_path)
+        for index in range(num_products):
+            enqueue_product(queue, f"{base_url}/dp/B{index:09d}", num_reviews)
+
+        pool = WorkerPool(workers, queue_path, cache_path, authenticator_factory=StandInAuthenticator)
+        started = time.perf_counter()
+        pool.start()
+        pool.wait(poll_interval=0.05)
+        seconds = time.perf_counter() - started
+
+        counts = queue.counts()
+        queue.close()
+        cache = ProductCache(cache_path)
+        cached = cache.stats()['entries']
+        cache.close()
+        return seconds, counts, cached
+    finally:
+        shutil.rmtree(directory)
+
+
+def run(num_products, worker_counts, latency, num_reviews):
+    """Crawl the same products with each pool size"""
+    StandInHandler.latency = latency
+    server = start_standin_site()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    # Inherited by the spawned workers
+    os.environ.update({
+        'AMAZON_BASE_URL': base_url,
+        'SHOPPER_FETCH_BACKEND': 'http',
+        'SHOPPER_REQUEST_RATE': '0',
+    })
+
+    print(f"{num_products} products, {latency:.2f}s page latency, {os.cpu_count()} CPUs")
+    print(f"{'workers':<9}{'seconds':>9}{'jobs/s':>9}{'speedup':>9}{'cached':>8}{'failed':>8}")
+    baseline = None
+    try:
+        for workers in worker_counts:
+            seconds, counts, cached = crawl(base_url, num_products, workers, num_reviews)
+            jobs = counts['done'] + counts['failed']
+            baseline = baseline or seconds
+            print(f"{workers:<9}{seconds:>9.2f}{jobs / seconds:>9.1f}{baseline / seconds:>8.1f}x"
+                  f"{cached:>8}{counts['failed']:>8}")
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=40)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--latency', type=float, default=0.05, help="stand-in page latency in seconds")
+    parser.add_argument('--reviews', type=int, default=20)
+    args = parser.parse_args()
+    run(args.products, args.workers, args.latency, args.reviews)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Local stand-in for amazon.com that serves the saved HTML fixtures.
+
+Point the shopper at it with AMAZON_BASE_URL to exercise the browser,
+service and fetch paths without a network or a real Amazon account:
+    python -m benchmarks.standin_site --port 8000
+    AMAZON_BASE_URL=http://127.0.0.1:8000 python -m src.service.server
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import argparse
+import threading
+import time
+
+from benchmarks.bench_extraction import load_fixture
+
+SIGNIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Amazon Sign-In</title></head><body>
+<form name="signIn" method="get" action="/">
+<input type="email" id="ap_email" name="email">
+<button type="button" id="continue">Continue</button>
+<input type="password" id="ap_password" name="password">
+<input type="submit" id="signInSubmit" value="Sign in">
+</form></body></html>
+"""
+
+EMPTY_REVIEWS_PAGE = """<!DOCTYPE html>
+<html><head><title>Amazon.com: Customer reviews</title></head><body>
+<div id="cm_cr-review_list"><span class="no-reviews-section">No more reviews</span></div>
+</body></html>
+"""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Route amazon.com paths to fixture pages"""
+
+    review_pages = 3
+    # Seconds to wait before answering, to stand in for network and render time
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        if url.path.startswith('/ap/signin'):
+            body = SIGNIN_PAGE
+        elif url.path.startswith('/dp/') or url.path.startswith('/gp/product/'):
+            body = load_fixture('product_page.html')
+        elif url.path.startswith('/product-reviews/'):
+            page = int(parse_qs(url.query).get('pageNumber', ['1'])[0])
+            if page <= self.review_pages:
+                body = load_fixture('reviews_page.html')
+            else:
+                body = EMPTY_REVIEWS_PAGE
+        elif url.path in ('/', '/s'):
+            body = load_fixture('search_results.html')
+        else:
+            self.send_error(404)
+            return
+
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_standin_site(host='127.0.0.1', port=0, handler=StandInHandler):
+    """Serve the stand-in site on a background thread and return the server"""
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for amazon.com")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    print(f"Stand-in site at http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Offline chat client for benchmarks and tests.
+
+Pass it as ``llm_client`` to AmazonAIShopperBot to run the recommendation
+path without the OpenAI API.
+"""
+import asyncio
+import re
+import time
+
+from src.recommender.llm_client import iterate_until
+
+# A word with its trailing whitespace, so streamed pieces join back into the reply
+_WORD_PIECE = re.compile(r"\s*\S+\s*")
+
+
+class StubLLMClient:
+    """Offline client that records the prompts it receives and returns a canned reply"""
+
+    def __init__(self, reply="1. Recommended Product: P1", latency=0.0, token_delay=0.0):
+        self.reply = reply
+        # Seconds to wait per call, to stand in for API round-trips
+        self.latency = latency
+        # Seconds between streamed words after the first one
+        self.token_delay = token_delay
+        self.requests = []
+
+    def params(self):
+        """Model and sampling parameters that affect the reply"""
+        return {'model': 'stub'}
+
+    def complete(self, messages, timeout=None):
+        """Record the messages and return the canned reply, or time out like the API would"""
+        self.requests.append(messages)
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Stub LLM request timed out")
+        if self.latency:
+            time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def astream(self, messages, timeout=None):
+        """Record the messages and yield the canned reply word by word"""
+        self.requests.append(messages)
+        pieces = self._stream(messages)
+        if timeout is not None:
+            pieces = iterate_until(pieces, asyncio.get_running_loop().time() + timeout)
+        async for piece in pieces:
+            yield piece
+
+    async def _stream(self, messages):
+        """The canned reply word by word, after the configured delays"""
+        await asyncio.sleep(self.latency)
+        for index, piece in enumerate(_WORD_PIECE.findall(self._reply(messages))):
+            if index:
+                await asyncio.sleep(self.token_delay)
+            yield piece
+
+    def _reply(self, messages):
+        """The canned reply, or its value for these messages if it is callable"""
+        return self.reply(messages) if callable(self.reply) else self.reply
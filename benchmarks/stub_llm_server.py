@@ -0,0 +1,135 @@
+"""Local stand-in for the OpenAI chat completions API, with streaming support.
+
+Point the shopper at it with OPENAI_API_BASE to exercise the recommendation
+path without network access or API spend:
+    python -m benchmarks.stub_llm_server --port 8001
+    OPENAI_API_BASE=http://127.0.0.1:8001/v1 python -m src.main
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import re
+import threading
+import time
+
+STUB_REPLY = (
+    "1. Recommended Product: P1 Wireless Over-Ear Headphones\n"
+    "2. Reasoning: It has the best balance of price, rating and review sentiment, and most of its "
+    "reviews come from verified purchases.\n"
+    "3. Key Pros: long battery life, effective noise cancelling, comfortable fit\n"
+    "4. Key Cons: bulky case, average microphone\n"
+    "5. Price: $141"
+)
+
+_PIECE = re.compile(r"\s*\S+\s*")
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """Answer POST /v1/chat/completions with a canned reply, streamed as server-sent events on request"""
+
+    reply = STUB_REPLY
+    # Seconds before the first token and between later tokens
+    first_token_delay = 0.5
+    token_delay = 0.02
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        model = request.get('model', 'stub')
+        pieces = _PIECE.findall(self.reply)
+
+        if request.get('stream'):
+            self._stream(model, pieces)
+        else:
+            # A blocking completion returns once every token is generated
+            time.sleep(self.first_token_delay + self.token_delay * (len(pieces) - 1))
+            self._send_json({
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': self.reply},
+                    'finish_reason': 'stop',
+                }],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': len(pieces), 'total_tokens': len(pieces)},
+            })
+
+    def _stream(self, model, pieces):
+        """Send the reply as chat.completion.chunk events followed by [DONE]"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        deltas = [{'role': 'assistant'}] + [{'content': piece} for piece in pieces]
+        try:
+            time.sleep(self.first_token_delay)
+            for index, delta in enumerate(deltas):
+                if index > 1:
+                    time.sleep(self.token_delay)
+                self._send_event(self._chunk(model, delta, None))
+            self._send_event(self._chunk(model, {}, 'stop'))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled or timed out
+            pass
+        self.close_connection = True
+
+    def _chunk(self, model, delta, finish_reason):
+        return {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+        }
+
+    def _send_event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def _send_json(self, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_llm_server(host='127.0.0.1', port=0):
+    """Serve the stub API on a background thread and return the server"""
+    server = ThreadingHTTPServer((host, port), StubLLMHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the OpenAI chat completions API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubLLMHandler)
+    print(f"Stub LLM API at http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
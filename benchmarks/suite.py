@@ -0,0 +1,192 @@
+"""Run the offline benchmark suite on synthetic pages and corpora and check it for regressions.
+
+Run from the project root:
+    python -m benchmarks.suite --output bench-results.json
+    python -m benchmarks.suite --baseline bench-results.json --max-slowdown 1.25
+
+Each case is timed at several scales. The results are written as JSON and
+compared to an earlier results file from the same machine with --baseline,
+which is the regression gate. The per-item ceilings in
+benchmarks/thresholds.json are several times the expected timings, so they
+only catch gross regressions on machines without a baseline. The exit
+status is 1 if any case regressed.
+
+Checking needs at least MIN_GATE_REPEAT timing runs per case, since a
+single run is too noisy to gate on. Pass --thresholds '' without a
+baseline to only record timings with --repeat 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+from benchmarks.bench_prompt import make_products
+from benchmarks.synthetic import make_review_corpus, make_search_page, make_product_page, make_reviews_page
+from src.analyzer.phrases import PhraseExtractor
+from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.analyzer.sentiment import SentimentEngine
+from src.recommender.prompt_builder import PromptBuilder
+from src.scraper.html_extractor import extract_search_results, extract_product_details, extract_reviews
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), 'thresholds.json')
+
+# Fewest timing runs per case whose best is stable enough to check for regressions
+MIN_GATE_REPEAT = 3
+
+
+def _search_results(scale):
+    html = make_search_page(scale)
+    return lambda: extract_search_results(html, 'https://www.amazon.com/s')
+
+
+def _product_details(scale):
+    html = make_product_page(scale)
+    return lambda: extract_product_details(html)
+
+
+def _reviews_page(scale):
+    html = make_reviews_page(scale)
+    return lambda: extract_reviews(html)
+
+
+def _analyze_reviews(scale):
+    analyzer = ReviewAnalyzer(driver=None)
+    reviews = make_review_corpus(scale)
+    return lambda: analyzer.analyze_reviews(reviews)
+
+
+def _sentiment(scale):
+    engine = SentimentEngine()
+    texts = [review['text'] for review in make_review_corpus(scale)]
+    return lambda: engine.classify_many(texts)
+
+
+def _phrases(scale):
+    texts = [review['text'] for review in make_review_corpus(scale)]
+
+    def extract():
+        extractor = PhraseExtractor()
+        extractor.add_many(texts)
+        return extractor.top(5)
+    return extract
+
+
+def _prompt(scale):
+    builder = PromptBuilder()
+    products = make_products(scale)
+    return lambda: builder.build(products, "wireless headphones")
+
+
+# Case name, what one item is, the scales to run, and a setup returning the timed call
+CASES = [
+    ('extract_search_results', 'listing', (16, 48, 200), _search_results),
+    ('extract_product_details', 'feature', (5, 30), _product_details),
+    ('extract_reviews', 'review', (10, 100), _reviews_page),
+    ('analyze_reviews', 'review', (20, 1000, 10000), _analyze_reviews),
+    ('sentiment', 'review', (1000, 10000), _sentiment),
+    ('phrases', 'review', (1000, 10000), _phrases),
+    ('prompt_build', 'product', (5, 20, 50), _prompt),
+]
+
+
+def case_key(name, scale):
+    """Identity of one case at one scale, as used in thresholds and baselines"""
+    return f"{name}@{scale}"
+
+
+def measure(function, repeat=3):
+    """Best seconds per call, looping each timing run for at least 0.2s"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_cases(selected=None, repeat=3):
+    """Time every case at every scale and return one result dict per pair"""
+    results = []
+    for name, unit, scales, setup in CASES:
+        if selected and name not in selected:
+            continue
+        for scale in scales:
+            seconds = measure(setup(scale), repeat)
+            results.append({
+                'case': name,
+                'scale': scale,
+                'unit': unit,
+                'seconds': seconds,
+                'us_per_item': seconds / scale * 1e6,
+            })
+    return results
+
+
+def find_regressions(results, thresholds=None, baseline=None, max_slowdown=1.25):
+    """Messages for results over their threshold or slower than the baseline by more than max_slowdown"""
+    regressions = []
+    previous = {case_key(result['case'], result['scale']): result for result in (baseline or {}).get('results', [])}
+    for result in results:
+        key = case_key(result['case'], result['scale'])
+        limit = (thresholds or {}).get(key)
+        if limit is not None and result['us_per_item'] > limit:
+            regressions.append(f"{key}: {result['us_per_item']:.2f}us per {result['unit']} "
+                               f"is over the {limit}us threshold")
+        before = previous.get(key)
+        if before and result['seconds'] > before['seconds'] * max_slowdown:
+            regressions.append(f"{key}: {result['seconds'] / before['seconds']:.2f}x slower than the baseline")
+    return regressions
+
+
+def load_json(path):
+    """Parsed contents of a JSON file"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--cases', nargs='+', choices=[case[0] for case in CASES], help="run only these cases")
+    parser.add_argument('--repeat', type=int, default=3, help="timing runs per case, the best is kept")
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE,
+                        help="JSON map of case@scale to the maximum microseconds per item")
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--max-slowdown', type=float, default=1.25,
+                        help="allowed ratio to the baseline before a case counts as regressed")
+    args = parser.parse_args()
+    if args.repeat < MIN_GATE_REPEAT and (args.thresholds or args.baseline):
+        parser.error(f"--repeat must be at least {MIN_GATE_REPEAT} to check for regressions; "
+                     f"pass --thresholds '' without --baseline to only record timings")
+
+    thresholds = load_json(args.thresholds) if args.thresholds else None
+    baseline = load_json(args.baseline) if args.baseline else None
+    results = run_cases(args.cases, args.repeat)
+    regressions = find_regressions(results, thresholds, baseline, args.max_slowdown)
+
+    print(f"{'case':<26}{'scale':>7}{'ms/call':>10}{'us/item':>10}{'limit':>9}")
+    for result in results:
+        limit = (thresholds or {}).get(case_key(result['case'], result['scale']), '')
+        print(f"{result['case']:<26}{result['scale']:>7}{result['seconds'] * 1000:>10.3f}"
+              f"{result['us_per_item']:>10.2f}{limit:>9}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+                'regressions': regressions,
+            }, f, indent=2)
+
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
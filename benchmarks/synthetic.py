@@ -0,0 +1,186 @@
+"""Synthetic Amazon pages and review corpora for offline benchmarks.
+
+Pages follow the markup of the saved fixtures, including the inline
+scripts and navigation that make real pages heavy, so the extractors do
+the same work as on live pages. Review text is built from aspect and
+opinion templates with negations and intensifiers, so sentiment and
+phrase extraction see realistic vocabulary instead of random words.
+"""
+from html import escape
+import random
+
+BRANDS = ["Sony", "Bose", "JBL", "Anker", "Sennheiser", "Audio-Technica", "Skullcandy", "Beats"]
+PRODUCT_TYPES = ["Over-Ear Headphones", "Wireless Earbuds", "Noise Cancelling Headphones",
+                 "Sports Earphones", "Gaming Headset", "Bluetooth Headphones"]
+SELLING_POINTS = ["40H Playtime", "Deep Bass", "Comfortable Fit", "Bluetooth 5.3", "Built-in Microphone",
+                  "Hi-Res Audio", "Foldable Design", "Quick Charge", "Multipoint Connection", "IPX5 Water Resistant"]
+
+ASPECTS = ["sound quality", "battery life", "noise cancelling", "the fit", "the microphone",
+           "bluetooth connection", "build quality", "the bass", "the ear cushions", "the charging case",
+           "the app", "call quality", "the price"]
+POSITIVE = ["great", "excellent", "amazing", "good", "solid", "comfortable", "perfect", "impressive"]
+NEGATIVE = ["terrible", "poor", "bad", "disappointing", "awful", "weak", "flimsy", "cheap"]
+INTENSIFIERS = ["", "", "", "very ", "really ", "extremely "]
+TEMPLATES = [
+    "The {aspect} is {intensifier}{opinion}.",
+    "{Aspect} is {intensifier}{opinion} for the price.",
+    "I found {aspect} {intensifier}{opinion}.",
+    "Honestly {aspect} is not {opinion}.",
+    "After two weeks {aspect} is still {intensifier}{opinion}.",
+    "Would buy again, {aspect} is {opinion}.",
+    "Returned them because {aspect} was {intensifier}{opinion}.",
+]
+FILLER = ["I use these every day on my commute.", "Shipping was fast.",
+          "They arrived in nice packaging.", "My wife likes them too.",
+          "I mostly listen to podcasts and music.", "Setup took a minute."]
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+
+HEAD = """<!DOCTYPE html>
+<html lang="en-us"><head><meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="https://m.media-amazon.com/images/I/61.css">
+{scripts}</head>
+<body><header id="navbar"><div id="nav-belt"><a id="nav-logo-sprites" href="/ref=nav_logo">Amazon</a>
+<form id="nav-search-bar-form" action="/s"><input id="twotabsearchtextbox" type="text" name="field-keywords"><input id="nav-search-submit-button" type="submit" value="Go"></form>
+<a id="nav-cart" href="/gp/cart/view.html"><span id="nav-cart-count">0</span></a></div>
+<div id="nav-main"><ul>{departments}</ul></div></header>
+<div id="a-page">"""
+FOOT = "</div></body></html>\n"
+
+
+def _page(title, body, scripts=20):
+    """Wrap a page body in the head, inline scripts and navigation of an Amazon page"""
+    return HEAD.format(
+        title=escape(title),
+        scripts=''.join(
+            f'<script type="text/javascript">P.when("A").execute(function(A){{var d{i}={{"k":"{"x" * 200}"}};}});</script>\n'
+            for i in range(scripts)
+        ),
+        departments=''.join(f'<li><a href="/b?node={1000 + i}" class="nav-a">Department {i}</a></li>'
+                            for i in range(40)),
+    ) + body + FOOT
+
+
+def make_asin(rng):
+    """A random ten-character ASIN"""
+    return 'B0' + ''.join(rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789') for _ in range(8))
+
+
+def make_title(rng):
+    """A listing title in the usual brand, type and selling points form"""
+    return f"{rng.choice(BRANDS)} {rng.choice(PRODUCT_TYPES)} with {', '.join(rng.sample(SELLING_POINTS, 3))}"
+
+
+def make_review_text(rng, sentences=None):
+    """Review text built from aspect and opinion templates"""
+    parts = []
+    for _ in range(sentences or rng.randint(1, 6)):
+        if rng.random() < 0.2:
+            parts.append(rng.choice(FILLER))
+            continue
+        aspect = rng.choice(ASPECTS)
+        opinion = rng.choice(POSITIVE if rng.random() < 0.7 else NEGATIVE)
+        parts.append(rng.choice(TEMPLATES).format(
+            aspect=aspect, Aspect=aspect[0].upper() + aspect[1:],
+            intensifier=rng.choice(INTENSIFIERS), opinion=opinion
+        ))
+    return ' '.join(parts)
+
+
+def make_review_corpus(count, seed=0):
+    """Synthetic review dicts shaped like extract_reviews output"""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': f"R{seed:04d}{i:09d}",
+            'rating': float(rng.choice((1, 2, 3, 4, 4, 5, 5, 5))),
+            'title': make_review_text(rng, 1).rstrip('.'),
+            'text': make_review_text(rng),
+            'date': f"Reviewed in the United States on {rng.choice(MONTHS)} "
+                    f"{rng.randint(1, 28)}, {rng.randint(2019, 2025)}",
+            'verified': rng.random() < 0.8,
+        }
+        for i in range(count)
+    ]
+
+
+def make_search_page(count, seed=0, sponsored=0.2):
+    """Search results page with count listings, some marked as sponsored"""
+    rng = random.Random(seed)
+    results = []
+    for index in range(count):
+        asin = make_asin(rng)
+        title = escape(make_title(rng))
+        price = rng.randint(15, 350)
+        label = '<span class="a-color-secondary">Sponsored</span>' if rng.random() < sponsored else ''
+        results.append(
+            f'<div data-asin="{asin}" data-index="{index + 1}" data-component-type="s-search-result" '
+            f'class="sg-col-4-of-24 s-result-item s-asin"><div class="s-card-container"><div class="a-section">{label}\n'
+            f'<span data-component-type="s-product-image"><a class="a-link-normal s-no-outline" href="/dp/{asin}/ref=sr_1_{index + 1}">'
+            f'<img class="s-image" src="https://m.media-amazon.com/images/I/{asin}.jpg" alt="{title}"></a></span>\n'
+            f'<div class="a-section a-spacing-none"><h2 class="a-size-mini a-spacing-none a-color-base s-line-clamp-2">'
+            f'<a class="a-link-normal s-underline-text s-link-style a-text-normal" href="/dp/{asin}/ref=sr_1_{index + 1}?keywords=headphones">\n'
+            f'<span class="a-size-base-plus a-color-base a-text-normal">{title}</span></a></h2></div>\n'
+            f'<div class="a-row a-size-small"><span aria-label="{rng.uniform(3.0, 5.0):.1f} out of 5 stars">'
+            f'<i class="a-icon a-icon-star-small"><span class="a-icon-alt">{rng.uniform(3.0, 5.0):.1f} out of 5 stars</span></i></span>\n'
+            f'<span><a class="a-link-normal s-underline-text s-link-style" href="/dp/{asin}#customerReviews">'
+            f'<span class="a-size-base s-underline-text">{rng.randint(10, 60000):,}</span></a></span></div>\n'
+            f'<div class="a-row a-size-base a-color-base"><a class="a-link-normal s-no-hover a-text-normal" href="/dp/{asin}">'
+            f'<span class="a-price"><span class="a-offscreen">${price}.99</span><span aria-hidden="true">'
+            f'<span class="a-price-symbol">$</span><span class="a-price-whole">{price}<span class="a-price-decimal">.</span></span>'
+            f'<span class="a-price-fraction">99</span></span></span></a></div>\n'
+            f'<div class="a-row a-size-base a-color-secondary"><span>FREE delivery <span class="a-text-bold">Tue, Oct 2</span></span></div>'
+            f'</div></div></div>\n'
+        )
+    body = ('<div class="s-main-slot s-result-list s-search-results sg-row">'
+            + ''.join(results) + '</div>')
+    return _page("Amazon.com : headphones", body)
+
+
+def make_product_page(features=8, seed=0):
+    """Product page with the given number of feature bullets"""
+    rng = random.Random(seed)
+    rating = rng.uniform(3.0, 5.0)
+    bullets = ''.join(
+        f'<li><span class="a-list-item"> {escape(rng.choice(SELLING_POINTS).upper())}: '
+        f'{make_review_text(rng, 3)} </span></li>'
+        for _ in range(features)
+    )
+    body = (
+        '<div id="dp-container"><div id="centerCol">\n'
+        f'<div id="titleSection"><h1 id="title"><span id="productTitle">  {escape(make_title(rng))}  </span></h1></div>\n'
+        f'<div id="averageCustomerReviews"><span id="acrPopover" title="{rating:.1f} out of 5 stars">'
+        f'<i class="a-icon a-icon-star"><span class="a-icon-alt">{rating:.1f} out of 5 stars</span></i></span></div>\n'
+        f'<div id="corePrice_feature_div"><span class="a-price"><span class="a-price-whole">{rng.randint(15, 350)}'
+        '<span class="a-price-decimal">.</span></span><span class="a-price-fraction">99</span></span></div>\n'
+        f'<div id="feature-bullets" class="a-section"><ul class="a-unordered-list a-vertical">{bullets}</ul></div>\n'
+        '<div id="availability"><span class="a-size-medium a-color-success"> In Stock </span></div>\n'
+        '</div></div>'
+    )
+    return _page("Amazon.com: product", body)
+
+
+def make_reviews_page(count=10, seed=0):
+    """Review page with count reviews from the synthetic corpus"""
+    reviews = []
+    for review in make_review_corpus(count, seed):
+        badge = ('<span data-hook="avp-badge" class="a-size-mini a-color-state a-text-bold">Verified Purchase</span>'
+                 if review['verified'] else '')
+        stars = int(review['rating'])
+        reviews.append(
+            f'<div id="{review["id"]}" data-hook="review" class="a-section review aok-relative">'
+            f'<div id="customer_review-{review["id"]}" class="a-section celwidget">\n'
+            f'<div class="a-row"><a class="a-link-normal" href="/gp/customer-reviews/{review["id"]}">'
+            f'<i data-hook="review-star-rating" class="a-icon a-icon-star a-star-{stars} review-rating">'
+            f'<span class="a-icon-alt">{review["rating"]:.1f} out of 5 stars</span></i></a>\n'
+            f'<a data-hook="review-title" class="a-size-base a-link-normal review-title" '
+            f'href="/gp/customer-reviews/{review["id"]}"><span>{escape(review["title"])}</span></a></div>\n'
+            f'<span data-hook="review-date" class="a-size-base a-color-secondary review-date">{review["date"]}</span>\n'
+            f'<div class="a-row a-spacing-mini review-data">{badge}</div>\n'
+            f'<div class="a-row a-spacing-small review-data"><span data-hook="review-body" class="a-size-base review-text">'
+            f'<span>{escape(review["text"])}</span></span></div>\n'
+            '</div></div>\n'
+        )
+    body = ('<div id="cm_cr-review_list" class="a-section a-spacing-none review-views celwidget">'
+            + ''.join(reviews) + '</div>')
+    return _page("Amazon.com: Customer reviews", body)
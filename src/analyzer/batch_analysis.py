@@ -0,0 +1,95 @@
+import numpy as np
+from src.scraper.html_extractor import parse_review_date
+
+SENTIMENT_LABELS = ('positive', 'negative', 'neutral')
+SENTIMENT_CODES = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+
+
+class ReviewColumns:
+    """Review fields held as NumPy arrays for vectorized aggregation"""
+
+    def __init__(self, ratings, verified, dates, sentiments=None):
+        self.ratings = np.asarray(ratings, dtype=np.float64)
+        self.verified = np.asarray(verified, dtype=bool)
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.sentiments = None if sentiments is None else np.asarray(sentiments, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.ratings)
+
+    @classmethod
+    def from_reviews(cls, reviews, sentiment=None):
+        """Build columns from review dicts, classifying text with sentiment() if given"""
+        count = len(reviews)
+        ratings = np.fromiter((float(review['rating']) for review in reviews), np.float64, count)
+        verified = np.fromiter((bool(review['verified']) for review in reviews), bool, count)
+        dates = _parse_dates((review.get('date') for review in reviews), count)
+
+        sentiments = None
+        if sentiment is not None:
+            sentiments = np.fromiter(
+                (SENTIMENT_CODES[sentiment(review['text'])] for review in reviews), np.int8, count
+            )
+        return cls(ratings, verified, dates, sentiments)
+
+
+def analyze_review_columns(columns, common_phrases=None):
+    """Aggregate review columns in one vectorized pass.
+
+    Returns the same shape as ReviewAnalyzer.analyze_reviews, plus the
+    verified purchase ratio and a monthly rating trend.
+    """
+    total = len(columns)
+    if not total:
+        return None
+
+    values, counts = np.unique(columns.ratings, return_counts=True)
+    verified = int(np.count_nonzero(columns.verified))
+
+    sentiment_counts = np.zeros(len(SENTIMENT_LABELS), dtype=np.int64)
+    if columns.sentiments is not None:
+        sentiment_counts = np.bincount(columns.sentiments, minlength=len(SENTIMENT_LABELS))
+
+    return {
+        'total_reviews': total,
+        'average_rating': float(columns.ratings.mean()),
+        'verified_purchases': verified,
+        'verified_ratio': verified / total,
+        'rating_distribution': {float(value): int(count) for value, count in zip(values, counts)},
+        'common_phrases': common_phrases or {},
+        'sentiment_summary': {
+            label: int(sentiment_counts[code]) for code, label in enumerate(SENTIMENT_LABELS)
+        },
+        'rating_trend': _monthly_trend(columns.dates, columns.ratings),
+    }
+
+
+def _monthly_trend(dates, ratings):
+    """Review count and average rating per calendar month, oldest first"""
+    dated = ~np.isnat(dates)
+    if not dated.any():
+        return []
+
+    months, bucket = np.unique(dates[dated].astype('datetime64[M]'), return_inverse=True)
+    counts = np.bincount(bucket)
+    sums = np.bincount(bucket, weights=ratings[dated])
+    return [
+        {'month': str(month), 'reviews': int(count), 'average_rating': float(total / count)}
+        for month, count, total in zip(months, counts, sums)
+    ]
+
+
+def _parse_dates(date_texts, count=-1):
+    """Parse review date strings into datetime64[D], NaT where unparseable"""
+    # Reviews share few distinct dates, so parse each string once into a day number
+    nat = np.datetime64('NaT', 'D').astype(np.int64)
+    days = {}
+
+    def day_number(text):
+        value = days.get(text)
+        if value is None:
+            reviewed_on = parse_review_date(text)
+            value = days[text] = np.datetime64(reviewed_on, 'D').astype(np.int64) if reviewed_on else nat
+        return value
+
+    return np.fromiter(map(day_number, date_texts), np.int64, count).view('datetime64[D]')
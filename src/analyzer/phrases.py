@@ -0,0 +1,131 @@
+import heapq
+import re
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves also got get one im ive
+it's i'm i've don't
+""".split())
+
+_SEGMENT = re.compile(r"[.!?,;:()\[\]\"\n]+")
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+class SpaceSaving:
+    """Approximate top-k counter holding at most ``capacity`` items (Space-Saving algorithm).
+
+    Any item whose true count exceeds total / capacity is guaranteed to be
+    tracked, and each tracked count overestimates the true count by at most
+    the recorded error.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # One (count, item) entry per tracked item; counts may be stale but never too high
+        self._heap = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, item, count=1):
+        """Count one occurrence of an item"""
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+            return
+
+        if len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+            return
+
+        # Replace the item with the smallest count, inheriting it as error
+        min_count, min_item = self._pop_min()
+        del counts[min_item]
+        del self.errors[min_item]
+        counts[item] = min_count + count
+        self.errors[item] = min_count
+        heapq.heappush(self._heap, (counts[item], item))
+
+    def update(self, items):
+        """Count every item in an iterable"""
+        for item in items:
+            self.add(item)
+
+    def most_common(self, k):
+        """The k items with the highest estimated counts"""
+        return heapq.nlargest(k, self.counts.items(), key=lambda entry: entry[1])
+
+    def to_dict(self):
+        """JSON-serializable form for storage"""
+        return {'capacity': self.capacity, 'counts': self.counts, 'errors': self.errors}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a counter saved with to_dict"""
+        counter = cls(data['capacity'])
+        counter.counts = dict(data['counts'])
+        counter.errors = dict(data['errors'])
+        counter._heap = [(count, item) for item, count in counter.counts.items()]
+        heapq.heapify(counter._heap)
+        return counter
+
+    def _pop_min(self):
+        """Remove and return the tracked item with the smallest current count"""
+        heap = self._heap
+        while True:
+            count, item = heapq.heappop(heap)
+            current = self.counts[item]
+            if current == count:
+                return count, item
+            heapq.heappush(heap, (current, item))
+
+
+class PhraseExtractor:
+    """Streaming n-gram extractor with a fixed memory cap.
+
+    Reviews are consumed one at a time. Phrases never span punctuation, and
+    phrases that start or end with a stopword are skipped. Pass an existing
+    ``counter`` to keep counting into it.
+    """
+
+    def __init__(self, n=2, capacity=1000, stopwords=STOPWORDS, counter=None):
+        if not 1 <= n <= 4:
+            raise ValueError(f"Phrase length must be between 1 and 4, got {n}")
+        self.n = n
+        self.stopwords = stopwords
+        self.counter = counter if counter is not None else SpaceSaving(capacity)
+
+    def phrases(self, text):
+        """The n-grams of a single text after punctuation and stopword filtering"""
+        n = self.n
+        stopwords = self.stopwords
+        found = []
+        for segment in _SEGMENT.split(text.lower()):
+            words = _WORD.findall(segment)
+            for i in range(len(words) - n + 1):
+                if words[i] in stopwords or words[i + n - 1] in stopwords:
+                    continue
+                found.append(' '.join(words[i:i + n]))
+        return found
+
+    def add(self, text):
+        """Count the phrases of one text"""
+        self.counter.update(self.phrases(text))
+
+    def add_many(self, texts):
+        """Count the phrases of every text in an iterable"""
+        for text in texts:
+            self.add(text)
+
+    def top(self, k=5):
+        """Most common phrases and their estimated counts"""
+        return dict(self.counter.most_common(k))
@@ -0,0 +1,122 @@
+import math
+import re
+
+from src.analyzer.phrases import STOPWORDS
+from src.scraper.html_extractor import parse_count, parse_price, parse_rating
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Relative weight of each listing signal in the pre-rank score
+DEFAULT_WEIGHTS = {
+    'rating': 0.5,
+    'popularity': 0.2,
+    'relevance': 0.2,
+    'price': 0.1,
+}
+
+# Review counts at or above this get the full popularity score
+POPULAR_REVIEWS = 10000
+
+
+def query_terms(text):
+    """Lowercase content words with a trailing plural 's' removed"""
+    terms = set()
+    for word in _WORD.findall((text or '').lower()):
+        if word in STOPWORDS:
+            continue
+        terms.add(word[:-1] if len(word) > 3 and word.endswith('s') else word)
+    return terms
+
+
+class PreRanker:
+    """Scores search listings so only the most promising ones get a full product and review analysis.
+
+    The score mixes the listing's star rating, its review count, its price
+    against the budget and how many query terms its title contains. The star
+    rating is shrunk toward ``prior_rating`` by ``prior_reviews`` pseudo-reviews,
+    so a 5.0 from three reviews does not outrank a 4.6 from ten thousand.
+
+    In adaptive mode the top-k are cut down further. Only the leader and the
+    listings whose rating could still be the best are kept. A listing's rating
+    could still be the best if the top of its confidence interval reaches the
+    bottom of the highest interval among the top-k. The interval uses the
+    largest variance a 1-5 star rating with that mean can have, so listings
+    with many reviews have tight intervals, and clear losers drop out early.
+    """
+
+    def __init__(self, top_k=3, adaptive=False, pool_size=5, min_k=1, confidence_z=1.96,
+                 prior_rating=4.0, prior_reviews=20, weights=None):
+        self.top_k = top_k
+        self.adaptive = adaptive
+        # Listings read from the search results before ranking
+        self.pool_size = pool_size
+        self.min_k = min_k
+        self.confidence_z = confidence_z
+        self.prior_rating = prior_rating
+        self.prior_reviews = prior_reviews
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+
+    def rank(self, products, query, budget=None):
+        """Score every listing and return the scores from best to worst"""
+        terms = query_terms(query)
+        scored = [self.score(product, terms, budget) for product in products]
+        # Ties keep search order, which is Amazon's own relevance ranking
+        return sorted(scored, key=lambda listing: -listing['score'])
+
+    def select(self, products, query, budget=None):
+        """The listings worth a deep analysis, best first"""
+        ranked = self.rank(products, query, budget)
+        if not ranked:
+            return []
+
+        selected = ranked[:self.top_k]
+        if self.adaptive:
+            floor = max(listing['rating_low'] for listing in selected)
+            selected = [
+                listing for index, listing in enumerate(selected)
+                if index < self.min_k or listing['rating_high'] >= floor
+            ]
+        return [listing['product'] for listing in selected]
+
+    def score(self, product, terms, budget=None):
+        """Pre-rank score of one listing, with the confidence interval of its rating"""
+        rating = parse_rating(product.get('rating'))
+        reviews = parse_count(product.get('review_count')) or 0
+        price = parse_price(product.get('price'))
+
+        mean, spread = self._rating_estimate(rating, reviews)
+        popularity = min(1.0, math.log10(1 + reviews) / math.log10(1 + POPULAR_REVIEWS))
+        relevance = len(terms & query_terms(product.get('title'))) / len(terms) if terms else 1.0
+        if price is None:
+            value = 0.0
+        elif budget:
+            value = max(0.0, 1 - price / budget)
+        else:
+            value = 0.5
+
+        return {
+            'product': product,
+            'score': (self.weights['rating'] * mean / 5 + self.weights['popularity'] * popularity
+                      + self.weights['relevance'] * relevance + self.weights['price'] * value),
+            'rating_low': mean - spread,
+            'rating_high': mean + spread,
+            'rating': rating,
+            'reviews': reviews,
+            'relevance': relevance,
+        }
+
+    def adjusted_rating(self, product):
+        """Listing star rating shrunk toward the prior by its review count"""
+        rating = parse_rating(product.get('rating'))
+        return self._rating_estimate(rating, parse_count(product.get('review_count')) or 0)[0]
+
+    def _rating_estimate(self, rating, reviews):
+        """Shrunk mean star rating and the half-width of its confidence interval"""
+        if rating is None:
+            reviews = 0
+            rating = self.prior_rating
+        total = reviews + self.prior_reviews
+        mean = (rating * reviews + self.prior_rating * self.prior_reviews) / total
+        # Bhatia-Davis: ratings bounded by 1 and 5 with this mean vary at most (mean - 1)(5 - mean)
+        variance = max((mean - 1) * (5 - mean), 0.0)
+        return mean, self.confidence_z * math.sqrt(variance / total)
@@ -1,61 +1,219 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import logging
 from collections import defaultdict
 import re
+import math
+from itertools import takewhile
+from src.scraper.amazon_urls import extract_asin, review_page_url
+from src.scraper.fetchers import TabPoolFetcher
+from src.scraper.html_extractor import extract_reviews
+from src.analyzer.batch_analysis import ReviewColumns, analyze_review_columns
+from src.analyzer.sentiment import SentimentEngine
+from src.analyzer.phrases import PhraseExtractor
+from src.scraper.product_scraper import EXTRACTION_MODES
+from src.scraper.rate_limiter import get_rate_limiter
+from src.scraper.circuit_breaker import get_circuit_breaker
+from src.scraper.deadline import is_expired, wait_timeout, load_page
+from src.instrumentation.tracer import TimedWait, traced
+
+REVIEWS_PER_PAGE = 10
+
+# Seconds to wait for the reviews of a loaded page
+REVIEWS_TIMEOUT = 10
 
 class ReviewAnalyzer:
-    def __init__(self, driver):
+    def __init__(self, driver, extraction_mode='snapshot', concurrency=3, rate_limiter=None,
+                 fetcher=None, sentiment_engine=None, phrase_length=2, phrase_capacity=1000,
+                 review_store=None, circuit_breaker=None):
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
         self.driver = driver
+        self.extraction_mode = extraction_mode
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
+        # Optional page fetch backend; defaults to background tabs of the driver
+        self.fetcher = fetcher
+        self.sentiment_engine = sentiment_engine or SentimentEngine()
+        self.phrase_length = phrase_length
+        self.phrase_capacity = phrase_capacity
+        # Optional ReviewStore that keeps every fetched review for cross-product statistics
+        self.review_store = review_store
         self.logger = logging.getLogger(__name__)
 
-    def get_reviews(self, product_url, num_reviews=20):
-        """Fetch and analyze product reviews"""
+    @traced('get_reviews')
+    def get_reviews(self, product_url, num_reviews=20, deadline=None):
+        """Fetch and analyze product reviews, returning those read by the deadline"""
         try:
-            # Navigate to reviews page
-            reviews_url = product_url.replace('/dp/', '/product-reviews/')
-            self.driver.get(reviews_url)
-            time.sleep(2)  # Respectful delay
-
+            max_pages = math.ceil(num_reviews / REVIEWS_PER_PAGE)
             reviews = []
-            pages_scraped = 0
-            reviews_collected = 0
+            for review in self.iter_reviews(product_url, max_pages=max_pages, deadline=deadline):
+                reviews.append(review)
+                if len(reviews) >= num_reviews:
+                    break
 
-            while reviews_collected < num_reviews and pages_scraped < 3:
-                # Get reviews on current page
-                page_reviews = self._extract_page_reviews()
-                reviews.extend(page_reviews)
-                reviews_collected += len(page_reviews)
-                pages_scraped += 1
-
-                # Try to go to next page if we need more reviews
-                if reviews_collected < num_reviews:
-                    if not self._go_to_next_page():
-                        break
-
-            return reviews[:num_reviews]
+            return reviews
 
         except Exception as e:
             self.logger.error(f"Error fetching reviews: {str(e)}")
             return []
 
-    def _extract_page_reviews(self):
+    def iter_reviews(self, product_url, max_pages=10, sort_by='helpful', filter_by_star=None,
+                     deadline=None):
+        """Yield reviews page by page, fetching several review pages at once.
+
+        Page URLs are built directly from the product's ASIN rather than by
+        clicking through pagination. Reviews are yielded as soon as their page
+        is parsed, so pages may arrive out of order.
+        """
+        pages = self.iter_review_pages(product_url, max_pages, sort_by, filter_by_star,
+                                       deadline=deadline)
+        try:
+            for _, page_reviews in pages:
+                yield from page_reviews
+        finally:
+            pages.close()
+
+    def iter_review_pages(self, product_url, max_pages=10, sort_by='helpful', filter_by_star=None,
+                          is_last_page=None, deadline=None):
+        """Yield (page_number, reviews) for each review page as soon as it is parsed.
+
+        ``is_last_page(page_number, reviews)`` decides where pagination ends;
+        by default a page with fewer than a full page of reviews is the last.
+        No pages after the last one are requested or yielded, and no pages
+        are requested once the deadline has passed.
+        """
+        asin = extract_asin(product_url)
+        if not asin:
+            self.logger.error(f"Could not find ASIN in product URL: {product_url}")
+            return
+
+        if is_last_page is None:
+            is_last_page = lambda page, page_reviews: len(page_reviews) < REVIEWS_PER_PAGE
+
+        page_numbers = {}
+        last_page = max_pages
+
+        def page_urls():
+            page = 1
+            while page <= last_page and not is_expired(deadline):
+                url = review_page_url(asin, page, sort_by, filter_by_star)
+                page_numbers[url] = page
+                yield url
+                page += 1
+
+        pages = self._iter_review_pages(page_urls(), deadline)
+        try:
+            for url, page_reviews in pages:
+                page = page_numbers[url]
+                if page_reviews is None or page > last_page:
+                    continue
+
+                # Stop requesting pages after the last one
+                if is_last_page(page, page_reviews):
+                    last_page = page
+
+                yield page, page_reviews
+        finally:
+            pages.close()
+
+    def refresh_reviews(self, product_url, state, max_pages=20):
+        """Fetch only reviews newer than those already in state and merge them in.
+
+        Pages are read newest first and pagination stops at the first page
+        containing a review the state has already seen. Returns the new reviews.
+
+        Nothing is merged if a page before that one failed to load: merging
+        the pages around the gap would mark the missing reviews as seen.
+        """
+        def is_last_page(page, page_reviews):
+            if len(page_reviews) < REVIEWS_PER_PAGE:
+                return True
+            return any(state.is_known(review) for review in page_reviews)
+
+        pages = {}
+        for page, page_reviews in self.iter_review_pages(
+                product_url, max_pages, sort_by='recent', is_last_page=is_last_page):
+            pages[page] = page_reviews
+
+        # Failed pages are missing; every page up to the last one has to be there
+        page = 1
+        while page in pages and page < max_pages and not is_last_page(page, pages[page]):
+            page += 1
+        if page not in pages:
+            self.logger.warning(f"Review page {page} of {product_url} failed to load; "
+                                f"keeping the previous review aggregates")
+            return []
+
+        # Newest first, up to the first review that is already known
+        newest_first = (review for page in sorted(pages) for review in pages[page])
+        new_reviews = []
+        seen_ids = set()
+        for review in takewhile(lambda review: not state.is_known(review), newest_first):
+            # Reviews can shift between pages while paginating; count each once
+            if review.get('id') and review['id'] in seen_ids:
+                continue
+            seen_ids.add(review.get('id'))
+            new_reviews.append(review)
+
+        state.merge(new_reviews, self.sentiment_engine, self.phrase_length, self.phrase_capacity)
+        return new_reviews
+
+    def _iter_review_pages(self, urls, deadline=None):
+        """Yield (url, reviews) for each review page URL, or None if it failed to load"""
+        if self.extraction_mode == 'webdriver':
+            for url in urls:
+                if not self.circuit_breaker.allow(url):
+                    yield url, None
+                    continue
+                ok = None
+                page_reviews = None
+                try:
+                    self.rate_limiter.acquire(url)
+                    load_page(self.driver, url, deadline)
+                    page_reviews = self._extract_page_reviews(deadline)
+                    ok = bool(page_reviews)
+                except WebDriverException as e:
+                    self.logger.error(f"Error loading {url}: {str(e)}")
+                    ok = False
+                finally:
+                    # An exception leaves the trial open for the next request
+                    self.circuit_breaker.record(url, ok, deadline)
+                yield url, page_reviews
+            return
+
+        fetcher = self.fetcher or TabPoolFetcher(
+            self.driver, max_tabs=self.concurrency, rate_limiter=self.rate_limiter,
+            circuit_breaker=self.circuit_breaker
+        )
+        pages = fetcher.fetch_many(urls, deadline)
+        try:
+            for url, page_source in pages:
+                yield url, extract_reviews(page_source) if page_source is not None else None
+        finally:
+            pages.close()
+
+    def _extract_page_reviews(self, deadline=None):
         """Extract reviews from current page"""
         reviews = []
         try:
-            review_elements = WebDriverWait(self.driver, 10).until(
+            review_elements = TimedWait(self.driver, wait_timeout(REVIEWS_TIMEOUT, deadline)).until(
                 EC.presence_of_all_elements_located(
                     (By.CSS_SELECTOR, "div[data-hook='review']")
                 )
             )
 
+            if self.extraction_mode == 'snapshot':
+                # One page_source round-trip instead of five per review
+                return extract_reviews(self.driver.page_source)
+
             for review in review_elements:
                 try:
                     # Extract review details
                     review_data = {
+                        'id': review.get_attribute('id') or '',
                         'rating': self._extract_rating(review),
                         'title': self._get_element_text(review, "a[data-hook='review-title']"),
                         'text': self._get_element_text(review, "span[data-hook='review-body']"),
@@ -112,6 +270,25 @@ class ReviewAnalyzer:
 
         return analysis
 
+    def analyze_reviews_batch(self, reviews):
+        """Analyze a large review corpus with vectorized NumPy aggregation"""
+        if not reviews:
+            return None
+
+        columns = ReviewColumns.from_reviews(reviews, sentiment=self.sentiment_engine.classify)
+        return analyze_review_columns(columns, self._extract_common_phrases(reviews))
+
+    def record_reviews(self, product_url, reviews, category=None):
+        """Append fetched reviews to the review store, if there is one"""
+        asin = extract_asin(product_url)
+        if not self.review_store or not asin or not reviews:
+            return 0
+        try:
+            return self.review_store.append(asin, reviews, category, sentiment=self.sentiment_engine.classify)
+        except Exception as e:
+            self.logger.error(f"Error recording reviews: {str(e)}")
+            return 0
+
     def _extract_rating(self, review_element):
         """Extract rating from review"""
         try:
@@ -119,7 +296,7 @@ class ReviewAnalyzer:
                 By.CSS_SELECTOR, "i[data-hook='review-star-rating']"
             ).get_attribute("innerHTML")
             return float(re.search(r'(\d+(\.\d+)?)', rating_string).group(1))
-        except:
+        except (WebDriverException, AttributeError, TypeError):
             return 0.0
 
     def _is_verified_purchase(self, review_element):
@@ -129,7 +306,7 @@ class ReviewAnalyzer:
                 By.CSS_SELECTOR, "span[data-hook='avp-badge']"
             ).text
             return "Verified Purchase" in verified_text
-        except:
+        except WebDriverException:
             return False
 
     def _get_element_text(self, parent_element, selector):
@@ -137,47 +314,20 @@ class ReviewAnalyzer:
         try:
             element = parent_element.find_element(By.CSS_SELECTOR, selector)
             return element.text.strip()
-        except:
+        except WebDriverException:
             return ""
 
-    def _go_to_next_page(self):
-        """Attempt to navigate to next page of reviews"""
-        try:
-            next_button = self.driver.find_element(
-                By.CSS_SELECTOR, "li.a-last a"
-            )
-            next_button.click()
-            time.sleep(2)  # Respectful delay
-            return True
-        except:
-            return False
+    def _phrase_extractor(self):
+        """Streaming phrase extractor with this analyzer's settings"""
+        return PhraseExtractor(n=self.phrase_length, capacity=self.phrase_capacity)
 
     def _extract_common_phrases(self, reviews):
-        """Extract commonly mentioned phrases from reviews"""
-        text = ' '.join(review['text'].lower() for review in reviews)
-        # This is a simple implementation - could be enhanced with NLP
-        words = text.split()
-        phrases = defaultdict(int)
-        
-        for i in range(len(words) - 1):
-            phrase = f"{words[i]} {words[i+1]}"
-            phrases[phrase] += 1
-
-        return dict(sorted(phrases.items(), key=lambda x: x[1], reverse=True)[:5])
+        """Extract commonly mentioned phrases from reviews in bounded memory"""
+        extractor = self._phrase_extractor()
+        for review in reviews:
+            extractor.add(review['text'])
+        return extractor.top(5)
 
     def _analyze_sentiment(self, text):
-        """Basic sentiment analysis"""
-        # This is a simple implementation - could be enhanced with ML
-        positive_words = {'great', 'good', 'excellent', 'amazing', 'love', 'perfect'}
-        negative_words = {'bad', 'poor', 'terrible', 'horrible', 'hate', 'worst'}
-        
-        text = text.lower()
-        pos_count = sum(1 for word in positive_words if word in text)
-        neg_count = sum(1 for word in negative_words if word in text)
-        
-        if pos_count > neg_count:
-            return 'positive'
-        elif neg_count > pos_count:
-            return 'negative'
-        else:
-            return 'neutral'
+        """Lexicon sentiment analysis with negation and intensity handling"""
+        return self.sentiment_engine.classify(text)
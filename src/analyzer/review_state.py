@@ -0,0 +1,101 @@
+from collections import Counter
+from datetime import date
+from src.scraper.html_extractor import parse_review_date
+from src.analyzer.phrases import PhraseExtractor, SpaceSaving
+
+# Ids of the most recent reviews kept to recognize already-seen reviews
+KNOWN_IDS_LIMIT = 100
+
+
+class ReviewState:
+    """Running review aggregates for one product, updated with new reviews only"""
+
+    def __init__(self, asin):
+        self.asin = asin
+        self.newest_date = None
+        self.known_ids = []
+        self.total_reviews = 0
+        self.rating_sum = 0.0
+        self.verified_purchases = 0
+        self.rating_distribution = Counter()
+        self.sentiment_summary = Counter({'positive': 0, 'negative': 0, 'neutral': 0})
+        self.phrase_counts = None
+
+    def is_known(self, review):
+        """Whether a review was already merged, by id or by being older than the newest one"""
+        if review.get('id') and review['id'] in self.known_ids:
+            return True
+        reviewed_on = parse_review_date(review.get('date'))
+        return bool(reviewed_on and self.newest_date and reviewed_on < self.newest_date)
+
+    def merge(self, reviews, sentiment_engine, phrase_length=2, phrase_capacity=1000):
+        """Add new reviews (newest first) to the running aggregates.
+
+        ``phrase_length`` and ``phrase_capacity`` only apply to the first
+        merge; later ones keep counting into the saved phrase counter.
+        """
+        extractor = PhraseExtractor(n=phrase_length, capacity=phrase_capacity, counter=self.phrase_counts)
+        self.phrase_counts = extractor.counter
+
+        for review in reviews:
+            rating = float(review['rating'])
+            self.total_reviews += 1
+            self.rating_sum += rating
+            self.rating_distribution[rating] += 1
+            if review['verified']:
+                self.verified_purchases += 1
+            self.sentiment_summary[sentiment_engine.classify(review['text'])] += 1
+            extractor.add(review['text'])
+
+            reviewed_on = parse_review_date(review.get('date'))
+            if reviewed_on and (self.newest_date is None or reviewed_on > self.newest_date):
+                self.newest_date = reviewed_on
+
+        new_ids = [review['id'] for review in reviews if review.get('id')]
+        self.known_ids = (new_ids + self.known_ids)[:KNOWN_IDS_LIMIT]
+
+    def to_analysis(self):
+        """Aggregates in the same shape as ReviewAnalyzer.analyze_reviews"""
+        if not self.total_reviews:
+            return None
+
+        return {
+            'total_reviews': self.total_reviews,
+            'average_rating': self.rating_sum / self.total_reviews,
+            'verified_purchases': self.verified_purchases,
+            'rating_distribution': dict(self.rating_distribution),
+            'common_phrases': dict(self.phrase_counts.most_common(5)) if self.phrase_counts else {},
+            'sentiment_summary': dict(self.sentiment_summary),
+        }
+
+    def to_dict(self):
+        """JSON-serializable form for storage"""
+        return {
+            'asin': self.asin,
+            'newest_date': self.newest_date.isoformat() if self.newest_date else None,
+            'known_ids': self.known_ids,
+            'total_reviews': self.total_reviews,
+            'rating_sum': self.rating_sum,
+            'verified_purchases': self.verified_purchases,
+            'rating_distribution': {str(rating): count for rating, count in self.rating_distribution.items()},
+            'sentiment_summary': dict(self.sentiment_summary),
+            'phrase_counts': self.phrase_counts.to_dict() if self.phrase_counts else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a state saved with to_dict"""
+        state = cls(data['asin'])
+        if data['newest_date']:
+            state.newest_date = date.fromisoformat(data['newest_date'])
+        state.known_ids = data['known_ids']
+        state.total_reviews = data['total_reviews']
+        state.rating_sum = data['rating_sum']
+        state.verified_purchases = data['verified_purchases']
+        state.rating_distribution = Counter(
+            {float(rating): count for rating, count in data['rating_distribution'].items()}
+        )
+        state.sentiment_summary = Counter(data['sentiment_summary'])
+        if data['phrase_counts']:
+            state.phrase_counts = SpaceSaving.from_dict(data['phrase_counts'])
+        return state
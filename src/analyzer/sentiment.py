@@ -0,0 +1,140 @@
+import re
+
+DEFAULT_LEXICON = {
+    'great': 1.0, 'good': 1.0, 'excellent': 1.0, 'amazing': 1.0, 'love': 1.0, 'perfect': 1.0,
+    'bad': -1.0, 'poor': -1.0, 'terrible': -1.0, 'horrible': -1.0, 'hate': -1.0, 'worst': -1.0,
+}
+
+NEGATIONS = frozenset({
+    'not', 'no', 'never', 'none', 'nothing', 'neither', 'nor', 'without', 'hardly', 'cannot',
+    "don't", "doesn't", "didn't", "isn't", "wasn't", "aren't", "weren't", "won't", "can't",
+    "couldn't", "shouldn't", "wouldn't", 'dont', 'doesnt', 'didnt', 'isnt', 'wasnt', 'cant',
+})
+
+INTENSIFIERS = {
+    'very': 1.5, 'really': 1.5, 'extremely': 2.0, 'super': 1.5, 'so': 1.3, 'incredibly': 2.0,
+    'absolutely': 1.8, 'totally': 1.5, 'quite': 1.2, 'slightly': 0.5, 'somewhat': 0.7,
+    'barely': 0.4, 'kinda': 0.7,
+}
+
+# Negations do not reach past these: "no complaints, great value" stays positive
+SCOPE_BREAKS = frozenset({'.', ',', ';', '!', '?', 'but'})
+
+# Words, plus the punctuation that ends a negation's scope
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|[.,;!?]")
+# Typographic apostrophes, as in "don’t", read as plain ones
+_APOSTROPHES = str.maketrans({'\u2019': "'", '\u2018': "'"})
+
+
+def tokenize(text):
+    """Lowercased word and clause-punctuation tokens of a text"""
+    return _TOKEN.findall(text.lower().translate(_APOSTROPHES))
+
+
+class SentimentEngine:
+    """Lexicon sentiment scorer built on a single hash lookup per token.
+
+    Cost is linear in the length of the text and independent of lexicon size.
+    Words match on token boundaries ("good" does not match "goods"), negations
+    flip the polarity of the next few tokens up to the end of their clause,
+    and intensifiers scale the score of the word that follows them.
+    Multi-word lexicon entries are supported.
+    """
+
+    def __init__(self, lexicon=None, negations=NEGATIONS, intensifiers=INTENSIFIERS,
+                 negation_window=3):
+        lexicon = DEFAULT_LEXICON if lexicon is None else lexicon
+        self.words = {}
+        self.phrases = {}
+        for entry, score in lexicon.items():
+            tokens = tuple(tokenize(entry))
+            if len(tokens) == 1:
+                self.words[tokens[0]] = float(score)
+            elif tokens:
+                self.phrases[tokens] = float(score)
+
+        self.phrase_starts = frozenset(tokens[0] for tokens in self.phrases)
+        # Tokens worth a closer look; everything else is skipped in one pass
+        self._lookup = frozenset(self.words) | self.phrase_starts
+        self.max_phrase_length = max((len(tokens) for tokens in self.phrases), default=1)
+        self.negations = frozenset(negations)
+        self.intensifiers = dict(intensifiers)
+        self.negation_window = negation_window
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load a lexicon of 'word-or-phrase<TAB>score' lines"""
+        lexicon = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                entry, score = line.rsplit('\t', 1)
+                lexicon[entry] = float(score)
+        return cls(lexicon, **kwargs)
+
+    def score(self, text):
+        """Signed sentiment score of a text"""
+        tokens = tokenize(text)
+        hits = [i for i, token in enumerate(tokens) if token in self._lookup]
+        if not hits:
+            return 0.0
+
+        total = 0.0
+        next_free = 0
+        for i in hits:
+            if i < next_free:
+                continue  # Already consumed by a multi-word entry
+
+            token = tokens[i]
+            value = None
+            length = 1
+            if token in self.phrase_starts:
+                value, length = self._match_phrase(tokens, i)
+            if value is None:
+                value = self.words.get(token)
+                length = 1
+            if value is None:
+                continue
+            next_free = i + length
+
+            if i > 0:
+                value *= self.intensifiers.get(tokens[i - 1], 1.0)
+            if self._negated(tokens, i):
+                value = -value
+            total += value
+
+        return total
+
+    def classify(self, text):
+        """Label a text 'positive', 'negative' or 'neutral'"""
+        score = self.score(text)
+        if score > 0:
+            return 'positive'
+        elif score < 0:
+            return 'negative'
+        else:
+            return 'neutral'
+
+    def classify_many(self, texts):
+        """Label a batch of texts"""
+        classify = self.classify
+        return [classify(text) for text in texts]
+
+    def _negated(self, tokens, i):
+        """Whether a negation earlier in the same clause reaches tokens[i]"""
+        for token in reversed(tokens[max(0, i - self.negation_window):i]):
+            if token in self.negations:
+                return True
+            if token in SCOPE_BREAKS:
+                return False
+        return False
+
+    def _match_phrase(self, tokens, start):
+        """Longest multi-word lexicon entry starting at tokens[start]"""
+        for length in range(min(self.max_phrase_length, len(tokens) - start), 1, -1):
+            value = self.phrases.get(tuple(tokens[start:start + length]))
+            if value is not None:
+                return value, length
+        return None, 1
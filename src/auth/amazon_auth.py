@@ -1,17 +1,47 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import os
 import time
 import random
 from dotenv import load_dotenv
+from src.auth.session_store import SessionStore, DEFAULT_SESSION
+from src.scraper.amazon_urls import get_base_url
+from src.scraper.rate_limiter import get_rate_limiter
+from src.instrumentation.tracer import TimedWait, instrument_driver, traced
+
+BROWSER_PROFILES = ('full', 'lean')
+
+# Requests the lean profile never lets through: images, media, fonts and third-party trackers
+LEAN_BLOCKED_URLS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*doubleclick.net*', '*googlesyndication.com*', '*google-analytics.com*', '*googletagmanager.com*',
+    '*amazon-adsystem.com*', '*fls-na.amazon.com*',
+    '*unagi.amazon.com*', '*facebook.net*',
+]
+
+SIGNIN_PATH = '/ap/signin?openid.pape.max_auth_age=0&openid.return_to=https%3A%2F%2Fwww.amazon.com%2F%3Fref_%3Dnav_signin&openid.identity=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.assoc_handle=usflex&openid.mode=checkid_setup&openid.claimed_id=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.ns=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0&'
 
 class AmazonAuthenticator:
-    def __init__(self):
+    def __init__(self, profile=None, session=None, session_store=None):
         load_dotenv('config/config.env')
         self.email = os.getenv('AMAZON_EMAIL')
         self.password = os.getenv('AMAZON_PASSWORD')
+        self.base_url = get_base_url()
+        self.rate_limiter = get_rate_limiter()
+        # 'full' is a visible, maximized browser; 'lean' is headless and skips everything but the page text
+        self.profile = profile or os.getenv('SHOPPER_BROWSER_PROFILE', 'full')
+        if self.profile not in BROWSER_PROFILES:
+            raise ValueError(f"Unknown browser profile {self.profile!r}, expected one of {BROWSER_PROFILES}")
+        self.renderer_process_limit = int(os.getenv('SHOPPER_RENDERER_PROCESS_LIMIT', '2'))
+        # Seconds before a navigation gives up, instead of WebDriver's default of five minutes
+        self.page_load_timeout = float(os.getenv('SHOPPER_PAGE_LOAD_TIMEOUT', '30'))
+        # Named sessions let pooled drivers keep separate cookies; new ones start from the default session
+        self.session = session or os.getenv('SHOPPER_SESSION', DEFAULT_SESSION)
+        self.session_store = session_store or SessionStore()
         self.driver = None
 
     def initialize_driver(self):
@@ -19,7 +49,10 @@ class AmazonAuthenticator:
         options = webdriver.ChromeOptions()
         
         # Add options to make detection harder
-        options.add_argument('--start-maximized')
+        if self.profile == 'lean':
+            self._apply_lean_options(options)
+        else:
+            options.add_argument('--start-maximized')
         options.add_argument('--disable-blink-features=AutomationControlled')
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
@@ -27,90 +60,115 @@ class AmazonAuthenticator:
         # Add a user agent to appear more like a regular browser
         options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
-        # Create the driver
-        self.driver = webdriver.Chrome(options=options)
+        # Create the driver, counting and timing every command it sends
+        self.driver = instrument_driver(webdriver.Chrome(options=options))
+        self.driver.set_page_load_timeout(self.page_load_timeout)
         
         # Execute CDP commands to prevent detection
         self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'})
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        
+        if self.profile == 'lean':
+            # Blocked in the network layer so the requests are never made
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+
+    def _apply_lean_options(self, options):
+        """Headless Chrome that returns pages at DOMContentLoaded and loads nothing but HTML, CSS and scripts"""
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1366,768')
+        # find_element and page snapshots only need the DOM, not every subresource
+        options.page_load_strategy = 'eager'
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+        options.add_argument('--autoplay-policy=user-gesture-required')
+        options.add_argument('--mute-audio')
+        # Fewer renderer processes and no disk cache keep each driver's memory and I/O down
+        options.add_argument(f'--renderer-process-limit={self.renderer_process_limit}')
+        options.add_argument('--disk-cache-size=1')
+        options.add_argument('--media-cache-size=1')
+        options.add_argument('--disable-application-cache')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-background-networking')
+        options.add_argument('--disable-component-update')
+        options.add_argument('--disable-default-apps')
+        options.add_argument('--disable-sync')
+        options.add_argument('--no-first-run')
+        options.add_argument('--disable-dev-shm-usage')
 
-    def login(self):
-        """Handle Amazon login process"""
+    @traced('login')
+    def login(self, interactive=True):
+        """Handle Amazon login process, falling back to manual login if interactive"""
         try:
             print("Attempting to log in to Amazon...")
             
-            # First try to use cookies if available
-            cookies_file = 'amazon_cookies.json'
-            if os.path.exists(cookies_file):
-                print("Found cookies file, attempting to use saved session...")
-                self._load_cookies(cookies_file)
-                
-                # Go to Amazon homepage to check if cookies worked
-                self.driver.get('https://www.amazon.com')
-                time.sleep(3)
+            # First try a saved session, checking its cookie expiry before loading any page
+            cookies = self.session_store.load_valid(self.session)
+            if cookies:
+                print("Found a saved session, attempting to use it...")
+                self._load_cookies(cookies)
                 
-                # Check if we're logged in
-                try:
-                    account_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.ID, "nav-link-accountList"))
-                    )
+                # A single homepage load both applies the cookies and shows whether they worked
+                self.rate_limiter.acquire(self.base_url)
+                self.driver.get(self.base_url)
+                if self._is_logged_in(5):
                     print("Login from cookies successful!")
+                    self._save_session()
                     return True
-                except:
-                    print("Cookies expired or invalid, will try manual login...")
+                print("Saved session was rejected, will try manual login...")
+            elif self.session_store.load(self.session) is not None:
+                print("Saved session expired, will try manual login...")
             
             # Regular login process as before
             # First visit Amazon homepage to get cookies
-            self.driver.get('https://www.amazon.com')
-            time.sleep(random.uniform(2, 4))  # Random delay to appear more human-like
+            self.rate_limiter.acquire(self.base_url)
+            self.driver.get(self.base_url)
             
             # Now go to the signin page
-            self.driver.get('https://www.amazon.com/ap/signin?openid.pape.max_auth_age=0&openid.return_to=https%3A%2F%2Fwww.amazon.com%2F%3Fref_%3Dnav_signin&openid.identity=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.assoc_handle=usflex&openid.mode=checkid_setup&openid.claimed_id=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.ns=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0&')
-            time.sleep(random.uniform(2, 4))
+            self.rate_limiter.acquire(self.base_url)
+            self.driver.get(self.base_url + SIGNIN_PATH)
             
             # Wait for email field and enter email with human-like typing
-            email_field = WebDriverWait(self.driver, 10).until(
+            email_field = TimedWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.ID, "ap_email"))
             )
             self._human_like_typing(email_field, self.email)
             
-            # Click continue with a slight delay
-            time.sleep(random.uniform(0.5, 1.5))
-            continue_button = self.driver.find_element(By.ID, "continue")
-            continue_button.click()
+            # Click continue as soon as it is clickable
+            TimedWait(self.driver, 10).until(
+                EC.element_to_be_clickable((By.ID, "continue"))
+            ).click()
             
             # Wait for password field and enter password with human-like typing
-            password_field = WebDriverWait(self.driver, 10).until(
+            password_field = TimedWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.ID, "ap_password"))
             )
             self._human_like_typing(password_field, self.password)
             
-            # Click sign-in with a slight delay
-            time.sleep(random.uniform(0.5, 1.5))
-            self.driver.find_element(By.ID, "signInSubmit").click()
-            
-            # Wait for login to complete
-            time.sleep(5)
+            # Click sign-in as soon as it is clickable
+            self.rate_limiter.acquire(self.base_url)
+            TimedWait(self.driver, 10).until(
+                EC.element_to_be_clickable((By.ID, "signInSubmit"))
+            ).click()
             
-            # Check if we're successfully logged in
-            try:
-                # Look for elements only present when logged in
-                account_element = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.ID, "nav-link-accountList"))
-                )
+            # Check if we're successfully logged in, and save the session for next time
+            if self._is_logged_in(15):
                 print("Login successful!")
+                self._save_session()
                 return True
-            except:
-                print("Login verification failed - Amazon might be requiring additional verification")
-                return False
             
-            # After successful login, save cookies for next time
-            self._save_cookies(cookies_file)
-            
-            return True
+            print("Login verification failed - Amazon might be requiring additional verification")
+            return False
             
         except Exception as e:
             print(f"Login failed: {str(e)}")
+            # A headless browser has no window to log in through
+            if not interactive or self.profile == 'lean':
+                return False
+
             # Allow manual login intervention
             print("\n=== MANUAL LOGIN REQUIRED ===")
             print("1. Complete the login process manually in the browser window")
@@ -118,20 +176,24 @@ class AmazonAuthenticator:
             print("3. Once you're logged in, press Enter to continue...")
             input()
             
-            # Save cookies after manual login
-            cookies_file = 'amazon_cookies.json'
-            self._save_cookies(cookies_file)
-            
-            # Verify login was successful
-            try:
-                account_element = WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_element_located((By.ID, "nav-link-accountList"))
-                )
+            # Verify login was successful, then save the session
+            if self._is_logged_in(5):
                 print("Manual login successful!")
+                self._save_session()
                 return True
-            except:
-                print("Could not verify login even after manual intervention")
-                return False
+            print("Could not verify login even after manual intervention")
+            return False
+
+    def _is_logged_in(self, timeout):
+        """Wait for the account menu and check that it greets a signed-in user"""
+        try:
+            account_element = TimedWait(self.driver, timeout).until(
+                EC.presence_of_element_located((By.ID, "nav-link-accountList"))
+            )
+        except TimeoutException:
+            return False
+        # Signed-out pages show the same menu as "Hello, sign in"
+        return 'sign in' not in account_element.text.lower()
 
     def _human_like_typing(self, element, text):
         """Type text in a human-like manner with random delays between keystrokes"""
@@ -144,30 +206,50 @@ class AmazonAuthenticator:
         if self.driver:
             self.driver.quit()
 
-    def _save_cookies(self, file_path):
-        """Save browser cookies to file"""
-        import json
+    def _save_session(self):
+        """Save the browser's cookies as this authenticator's session"""
         try:
-            cookies = self.driver.get_cookies()
-            with open(file_path, 'w') as f:
-                json.dump(cookies, f)
-            print(f"Cookies saved to {file_path}")
+            if self.session_store.save(self.driver.get_cookies(), self.session):
+                print(f"Session saved to {self.session_store.file_for(self.session)}")
         except Exception as e:
-            print(f"Error saving cookies: {str(e)}")
+            print(f"Error saving session: {str(e)}")
 
-    def _load_cookies(self, file_path):
-        """Load cookies from file into browser"""
-        import json
+    def _load_cookies(self, cookies):
+        """Load saved cookies into the browser before the first page load"""
         try:
-            self.driver.get('https://www.amazon.com')  # Need to be on amazon domain to add cookies
-            with open(file_path, 'r') as f:
-                cookies = json.load(f)
-                for cookie in cookies:
-                    # Some cookies can't be loaded directly, so handle exceptions
-                    try:
-                        self.driver.add_cookie(cookie)
-                    except:
-                        pass
-            print(f"Cookies loaded from {file_path}")
+            # CDP sets cookies for any domain without first navigating to it
+            self.driver.execute_cdp_cmd('Network.setCookies', {
+                'cookies': [self._cdp_cookie(cookie) for cookie in cookies]
+            })
+            return
+        except Exception as e:
+            print(f"Could not set cookies through CDP, loading them per page: {str(e)}")
+
+        try:
+            self.rate_limiter.acquire(self.base_url)
+            self.driver.get(self.base_url)  # Need to be on amazon domain to add cookies
+            for cookie in cookies:
+                # Some cookies can't be loaded directly, so handle exceptions
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException:
+                    pass
         except Exception as e:
             print(f"Error loading cookies: {str(e)}")
+
+    @staticmethod
+    def _cdp_cookie(cookie):
+        """Convert a WebDriver cookie dict into CDP Network.CookieParam"""
+        param = {
+            'name': cookie['name'],
+            'value': cookie['value'],
+            'domain': cookie.get('domain'),
+            'path': cookie.get('path', '/'),
+            'secure': cookie.get('secure', False),
+            'httpOnly': cookie.get('httpOnly', False),
+        }
+        if cookie.get('expiry') is not None:
+            param['expires'] = cookie['expiry']
+        if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+            param['sameSite'] = cookie['sameSite']
+        return param
@@ -0,0 +1,87 @@
+import json
+import os
+import time
+import logging
+
+DEFAULT_SESSION = 'default'
+
+# Cookies that carry the signed-in state; without one of them the session is anonymous
+AUTH_COOKIES = ('at-main', 'sess-at-main', 'x-main', 'session-token')
+
+
+class SessionStore:
+    """Saved browser sessions, one cookie file per session name.
+
+    The default session lives at ``path`` (amazon_cookies.json, which the
+    HTTP fetcher also reads) and named sessions sit next to it, e.g.
+    amazon_cookies.worker-1.json, so each pooled driver keeps its own.
+    """
+
+    def __init__(self, path='amazon_cookies.json', min_lifetime=300):
+        self.path = path
+        # Sessions whose auth cookies expire sooner than this many seconds count as expired
+        self.min_lifetime = min_lifetime
+        self.logger = logging.getLogger(__name__)
+
+    def file_for(self, name=None):
+        """Cookie file of a named session"""
+        if not name or name == DEFAULT_SESSION:
+            return self.path
+        root, ext = os.path.splitext(self.path)
+        return f"{root}.{name}{ext or '.json'}"
+
+    def load(self, name=None):
+        """Saved cookies of a session, or None if there are none or the file is unreadable"""
+        path = self.file_for(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error reading session {path}: {str(e)}")
+            return None
+        return cookies if isinstance(cookies, list) else None
+
+    def load_valid(self, name=None):
+        """Cookies of a session if it is still valid, else those of the default session, else None"""
+        for candidate in dict.fromkeys((name or DEFAULT_SESSION, DEFAULT_SESSION)):
+            cookies = self.load(candidate)
+            if cookies and self.is_valid(cookies):
+                return cookies
+        return None
+
+    def is_valid(self, cookies, now=None):
+        """Whether the cookies hold a signed-in session that is not about to expire, checked without a browser"""
+        deadline = (now or time.time()) + self.min_lifetime
+        auth = [cookie for cookie in cookies if cookie.get('name') in AUTH_COOKIES]
+        if not auth:
+            return False
+        # Cookies without an expiry last for the browser session and never expire on disk
+        return all(cookie.get('expiry') is None or cookie['expiry'] > deadline for cookie in auth)
+
+    def save(self, cookies, name=None):
+        """Write a session's cookies atomically, readable only by the current user"""
+        path = self.file_for(name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cookies, f)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.error(f"Error saving session {path}: {str(e)}")
+            # The previous session file is untouched; drop the half-written copy
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def delete(self, name=None):
+        """Forget a saved session"""
+        try:
+            os.remove(self.file_for(name))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,261 @@
+"""Run many shopping queries from a JSONL file, resuming where a previous run stopped.
+
+Run from the project root:
+    python -m src.batch jobs.jsonl results.jsonl --parallel 4
+
+Each input line is a job such as {"id": "tv-1", "query": "55 inch tv", "budget": 500}.
+The "id" is optional. Results are appended to the output file as each job
+finishes, and that file doubles as the checkpoint: jobs that already have a
+successful result there are skipped when the batch is run again. A job that
+ran out of time answers from partial results with status "partial" and runs
+again on the next invocation.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+import argparse
+import json
+import os
+import threading
+import time
+import logging
+from src.service.driver_pool import DriverPool
+from src.service.server import ShopperService
+from src.scraper.deadline import is_expired
+from src.storage.llm_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+class SharedProducts:
+    """Loads each product at most once per batch, even when several queries want it at the same time.
+
+    Only complete loads are shared. A load that raised, returned None or ran
+    past its caller's deadline is dropped, and the next caller loads the
+    product again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        self.loads = 0
+        self.reuses = 0
+
+    def get_or_load(self, key, load, deadline=None):
+        """Result of load() for a key, computed by the first caller and shared with the rest.
+
+        Waits for another caller's load only until the deadline, then
+        returns None.
+        """
+        while True:
+            with self._lock:
+                future = self._futures.get(key)
+                owner = future is None
+                if owner:
+                    future = self._futures[key] = Future()
+                    self.loads += 1
+                else:
+                    self.reuses += 1
+
+            if owner:
+                return self._load(key, future, load, deadline)
+
+            try:
+                result, shared = future.result(timeout=deadline.remaining() if deadline is not None else None)
+            except FutureTimeoutError:
+                return None
+            if shared:
+                return result
+            # The first load failed or was cut short; try again with this caller's time
+
+    def _load(self, key, future, load, deadline):
+        """Run load() for waiting callers, sharing the result only if it is complete"""
+        result = None
+        try:
+            result = load()
+        finally:
+            shared = result is not None and not is_expired(deadline)
+            if not shared:
+                with self._lock:
+                    del self._futures[key]
+            future.set_result((result, shared))
+        return result
+
+
+def job_key(job):
+    """Identity of a job: its id, or its normalized query and budget"""
+    if job.get('id') is not None:
+        return str(job['id'])
+    return f"{normalize_query(job['query'])}|{job.get('budget') or ''}"
+
+
+def read_jobs(path):
+    """Valid jobs from a JSONL file, skipping blank and malformed lines"""
+    jobs = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                if not job.get('query'):
+                    raise ValueError("missing query")
+                if job.get('budget'):
+                    job['budget'] = float(job['budget'])
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.error(f"Skipping line {number} of {path}: {str(e)}")
+                continue
+            jobs.append(job)
+    return jobs
+
+
+def completed_keys(path):
+    """Keys of the jobs with a complete, successful result in an output file.
+
+    Jobs whose last result is "partial" or "failed" are not included, so
+    they run again.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; the job runs again
+                continue
+            if result.get('status') == 'ok' and not result.get('partial'):
+                done.add(result['key'])
+    return done
+
+
+class ResultWriter:
+    """Appends results to a JSONL file, one durable line per finished job"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+', encoding='utf-8')
+        # Start on a fresh line if a crash cut the last result short
+        if self._file.tell():
+            self._file.seek(self._file.tell() - 1)
+            if self._file.read(1) != '\n':
+                self._file.write('\n')
+
+    def write(self, result):
+        """Append a result and flush it to disk"""
+        line = json.dumps(result, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Close the output file"""
+        with self._lock:
+            self._file.close()
+
+
+class BatchRunner:
+    """Runs jobs on a pool of logged-in drivers and records each result as it completes"""
+
+    def __init__(self, service, writer, parallel=2):
+        self.service = service
+        self.writer = writer
+        self.parallel = parallel
+
+    def run(self, jobs):
+        """Run every job and return (succeeded, partial, failed) counts"""
+        succeeded = partial = failed = 0
+        with ThreadPoolExecutor(max_workers=self.parallel) as executor:
+            futures = [executor.submit(self._run_job, job) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    status = future.result()['status']
+                    if status == 'ok':
+                        succeeded += 1
+                    elif status == 'partial':
+                        partial += 1
+                    else:
+                        failed += 1
+            except KeyboardInterrupt:
+                # Jobs already written stay done; the rest run on the next invocation
+                for future in futures:
+                    future.cancel()
+                raise
+        return succeeded, partial, failed
+
+    def _run_job(self, job):
+        """Run one job and write its result"""
+        started = time.monotonic()
+        result = {
+            'key': job_key(job),
+            'id': job.get('id'),
+            'query': job['query'],
+            'budget': job.get('budget'),
+        }
+        try:
+            outcome = self.service.run_query(job['query'], job.get('budget'))
+            result['recommendation'] = outcome['recommendation']
+            result['partial'] = outcome.get('partial', False)
+            if not outcome['recommendation']:
+                result['status'] = 'failed'
+            else:
+                # Answered from what was loaded in time; not a checkpoint, so the job runs again
+                result['status'] = 'partial' if result['partial'] else 'ok'
+        except Exception as e:
+            logger.error(f"Job {result['key']} failed: {str(e)}")
+            result['recommendation'] = None
+            result['status'] = 'failed'
+            result['error'] = str(e)
+
+        result['elapsed'] = round(time.monotonic() - started, 3)
+        result['completed_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.writer.write(result)
+        logger.info(f"Job {result['key']}: {result['status']} in {result['elapsed']}s")
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('jobs', help="input JSONL file of {query, budget} jobs")
+    parser.add_argument('output', help="output JSONL file, also used as the checkpoint")
+    parser.add_argument('--parallel', type=int, default=2, help="queries run at once, one browser each")
+    parser.add_argument('--acquire-timeout', type=int, default=300,
+                        help="seconds a job waits for a free browser")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    jobs = read_jobs(args.jobs)
+    done = completed_keys(args.output)
+    pending = []
+    seen = set(done)
+    for job in jobs:
+        key = job_key(job)
+        if key not in seen:
+            seen.add(key)
+            pending.append(job)
+    logger.info(f"{len(jobs)} jobs, {len(jobs) - len(pending)} already done or duplicated, {len(pending)} to run")
+    if not pending:
+        return
+
+    shared = SharedProducts()
+    pool = DriverPool(size=min(args.parallel, len(pending)), health_check_interval=60)
+    writer = ResultWriter(args.output)
+    try:
+        pool.start()
+        service = ShopperService(pool, args.acquire_timeout, shared_products=shared)
+        succeeded, partial, failed = BatchRunner(service, writer, args.parallel).run(pending)
+        logger.info(
+            f"Batch finished: {succeeded} succeeded, {partial} partial, {failed} failed; "
+            f"{shared.loads} products loaded, {shared.reuses} reused across queries"
+        )
+    except KeyboardInterrupt:
+        logger.info("Batch interrupted; run the same command again to resume")
+    finally:
+        writer.close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+from collections import deque
+from contextlib import contextmanager
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import logging
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Stage label for work done outside any span
+NO_STAGE = 'none'
+
+
+class Tracer:
+    """Process-wide timing spans and counters, exportable as a JSON trace or Prometheus text.
+
+    Spans nest per thread, and counters recorded inside a span are labelled
+    with its name, so WebDriver commands and waits can be attributed to the
+    stage that issued them. Stages named in ``profile_stages`` (or all of
+    them, with '*') are also run under cProfile.
+    """
+
+    def __init__(self, max_spans=10000, profile_stages=(), profile_dir=None):
+        self.profile_stages = frozenset(profile_stages)
+        self.profile_dir = profile_dir
+        self.logger = logging.getLogger(__name__)
+        self._spans = deque(maxlen=max_spans)
+        self._span_totals = {}
+        self._counters = {}
+        self._profiles = {}
+        self._lock = threading.Lock()
+        # cProfile cannot profile two threads at once on every Python version
+        self._profiler_lock = threading.Lock()
+        self._local = threading.local()
+        self._epoch = time.perf_counter()
+
+    def current_stage(self):
+        """Name of the innermost open span on this thread"""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else NO_STAGE
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time a block of work; yields a dict whose 'attributes' can be extended"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        record = {
+            'name': name,
+            'parent': stack[-1] if stack else None,
+            'thread': threading.get_ident(),
+            'attributes': dict(attributes),
+        }
+        stack.append(name)
+        profiler = self._start_profiler(name)
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield record
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            stack.pop()
+            if profiler is not None:
+                self._stop_profiler(name, profiler)
+            record['start'] = started - self._epoch
+            record['duration'] = duration
+            record['error'] = failed
+            with self._lock:
+                self._spans.append(record)
+                totals = self._span_totals.setdefault(name, [0, 0.0, 0])
+                totals[0] += 1
+                totals[1] += duration
+                totals[2] += failed
+
+    def count(self, metric, value=1, **labels):
+        """Add to a counter identified by its metric name and labels"""
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counters(self):
+        """Current counter values as a list of {metric, labels, value}"""
+        with self._lock:
+            return [
+                {'metric': metric, 'labels': dict(labels), 'value': value}
+                for (metric, labels), value in sorted(self._counters.items())
+            ]
+
+    def span_totals(self):
+        """Count, total seconds and errors per span name"""
+        with self._lock:
+            return {
+                name: {'count': count, 'seconds': round(seconds, 6), 'errors': errors}
+                for name, (count, seconds, errors) in sorted(self._span_totals.items())
+            }
+
+    def to_trace(self):
+        """Recent spans in Chrome trace event format, viewable in chrome://tracing or Perfetto"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+        events = [
+            {
+                'name': span['name'],
+                'cat': 'shopper',
+                'ph': 'X',
+                'ts': round(span['start'] * 1e6),
+                'dur': round(span['duration'] * 1e6),
+                'pid': pid,
+                'tid': span['thread'],
+                'args': dict(span['attributes'], parent=span['parent'], error=span['error']),
+            }
+            for span in spans
+        ]
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'spans': self.span_totals(), 'counters': self.counters()},
+        }
+
+    def write_trace(self, path):
+        """Save the JSON trace to a file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_trace(), f)
+
+    def to_prometheus(self):
+        """Span totals and counters in the Prometheus text exposition format"""
+        lines = [
+            '# TYPE shopper_span_seconds summary',
+        ]
+        totals = self.span_totals()
+        for name, total in totals.items():
+            lines.append(f'shopper_span_seconds_sum{{span="{_escape(name)}"}} {total["seconds"]}')
+            lines.append(f'shopper_span_seconds_count{{span="{_escape(name)}"}} {total["count"]}')
+        lines.append('# TYPE shopper_span_errors_total counter')
+        for name, total in totals.items():
+            lines.append(f'shopper_span_errors_total{{span="{_escape(name)}"}} {total["errors"]}')
+
+        typed = set()
+        for counter in self.counters():
+            metric = f"shopper_{counter['metric']}_total"
+            if metric not in typed:
+                lines.append(f'# TYPE {metric} counter')
+                typed.add(metric)
+            labels = ','.join(f'{key}="{_escape(value)}"' for key, value in counter['labels'].items())
+            value = counter['value']
+            value = round(value, 6) if isinstance(value, float) else value
+            lines.append(f'{metric}{{{labels}}} {value}' if labels else f'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def profile_report(self, name, limit=20):
+        """Top functions by cumulative time for a profiled stage, or None"""
+        with self._lock:
+            stats = self._profiles.get(name)
+            if stats is None:
+                return None
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def reset(self):
+        """Drop every span, counter and profile"""
+        with self._lock:
+            self._spans.clear()
+            self._span_totals.clear()
+            self._counters.clear()
+            self._profiles.clear()
+
+    def _start_profiler(self, name):
+        """A running profiler if this stage should be profiled and none is active"""
+        if not self.profile_stages or not ('*' in self.profile_stages or name in self.profile_stages):
+            return None
+        if not self._profiler_lock.acquire(blocking=False):
+            return None
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running on this interpreter
+            self._profiler_lock.release()
+            return None
+        return profiler
+
+    def _stop_profiler(self, name, profiler):
+        """Merge a finished profile into the stage's totals and optionally save them"""
+        profiler.disable()
+        self._profiler_lock.release()
+        with self._lock:
+            stats = self._profiles.get(name)
+            if stats is None:
+                stats = self._profiles[name] = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+            if self.profile_dir:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                stats.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+
+
+def _escape(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_default_tracer = None
+_default_lock = threading.Lock()
+
+
+def get_tracer():
+    """Process-wide tracer, profiling the stages listed in SHOPPER_PROFILE into SHOPPER_PROFILE_DIR"""
+    global _default_tracer
+    with _default_lock:
+        if _default_tracer is None:
+            stages = [stage.strip() for stage in os.getenv('SHOPPER_PROFILE', '').split(',') if stage.strip()]
+            _default_tracer = Tracer(
+                profile_stages=stages,
+                profile_dir=os.getenv('SHOPPER_PROFILE_DIR', 'profiles') if stages else None
+            )
+        return _default_tracer
+
+
+def traced(name):
+    """Decorator running a function inside a span of the process-wide tracer"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_driver(driver):
+    """Count and time every command a WebDriver sends, by command and stage"""
+    if getattr(driver, '_shopper_instrumented', False):
+        return driver
+
+    execute = driver.execute
+
+    def timed_execute(driver_command, params=None):
+        tracer = get_tracer()
+        stage = tracer.current_stage()
+        started = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            tracer.count('webdriver_commands', command=driver_command, stage=stage)
+            tracer.count('webdriver_command_seconds', time.perf_counter() - started,
+                         command=driver_command, stage=stage)
+
+    # WebElement commands go through the driver's execute too
+    driver.execute = timed_execute
+    driver._shopper_instrumented = True
+    return driver
+
+
+class TimedWait(WebDriverWait):
+    """WebDriverWait that records how long each wait took and whether it timed out"""
+
+    def until(self, method, message=''):
+        return self._timed(super().until, method, message)
+
+    def until_not(self, method, message=''):
+        return self._timed(super().until_not, method, message)
+
+    def _timed(self, wait, method, message):
+        tracer = get_tracer()
+        stage = tracer.current_stage()
+        started = time.perf_counter()
+        try:
+            return wait(method, message)
+        except TimeoutException:
+            tracer.count('webdriver_wait_timeouts', stage=stage)
+            raise
+        finally:
+            tracer.count('webdriver_waits', stage=stage)
+            tracer.count('webdriver_wait_seconds', time.perf_counter() - started, stage=stage)
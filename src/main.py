@@ -1,12 +1,27 @@
+import asyncio
 import logging
 import os
-import json
-import time
+import math
+from collections import defaultdict
 from dotenv import load_dotenv
 import openai
 from src.auth.amazon_auth import AmazonAuthenticator
 from src.scraper.product_scraper import ProductScraper
-from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.scraper.amazon_urls import extract_asin, review_page_url
+from src.scraper.fetchers import TabPoolFetcher, HttpFetcher, FallbackFetcher
+from src.scraper.html_extractor import extract_product_details, extract_reviews
+from src.scraper.deadline import Deadline, is_expired
+from src.analyzer.review_analyzer import ReviewAnalyzer, REVIEWS_PER_PAGE
+from src.analyzer.review_state import ReviewState
+from src.analyzer.sentiment import SentimentEngine
+from src.analyzer.prerank import PreRanker
+from src.storage.product_cache import ProductCache
+from src.storage.llm_cache import LLMCache, normalize_query
+from src.storage.review_store import get_review_store
+from src.recommender.prompt_builder import PromptBuilder, fallback_recommendation
+from src.recommender.llm_client import OpenAIChatClient
+from src.pipeline.product_pipeline import ProductPipeline
+from src.instrumentation.tracer import get_tracer, instrument_driver, traced
 
 # Configure logging
 logging.basicConfig(
@@ -15,17 +30,77 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Share of a query's deadline that each stage has to finish within, in order
+STAGE_BUDGETS = (('search', 0.2), ('analyze', 0.5), ('recommend', 0.3))
+
+# Seconds the model needs at least; with less left the fallback recommendation is used
+MIN_LLM_SECONDS = 1.0
+
+# Sent after a streamed recommendation that broke off part way
+STREAM_BREAK = "\n\n(The recommendation was cut off here.)"
+
 class AmazonAIShopperBot:
-    def __init__(self):
+    def __init__(self, workers=None, llm_client=None):
         # Load environment variables
         load_dotenv('config/config.env')
         
         # Initialize OpenAI
         openai.api_key = os.getenv('OPENAI_API_KEY')
         
+        # Number of browser tabs used to analyze candidates in parallel (1 = sequential)
+        self.workers = workers or int(os.getenv('SHOPPER_WORKERS', '1'))
+        # Listings rated below this many stars are skipped while reading search results
+        self.min_rating = float(os.getenv('SHOPPER_MIN_RATING', '0')) or None
+        # Listing-level pre-ranking picks which candidates get product and review page loads (0 = off).
+        # Off by default: it saves page loads but can change which product is recommended
+        prerank_top_k = int(os.getenv('SHOPPER_PRERANK_TOP_K', '0'))
+        self.preranker = PreRanker(
+            top_k=prerank_top_k,
+            adaptive=os.getenv('SHOPPER_PRERANK_ADAPTIVE', 'false').lower() in ('1', 'true', 'yes'),
+            pool_size=int(os.getenv('SHOPPER_PRERANK_POOL', '5'))
+        ) if prerank_top_k > 0 else None
+        # 'browser' renders every page in Chrome; 'http' fetches static pages without it
+        self.fetch_backend = os.getenv('SHOPPER_FETCH_BACKEND', 'browser')
+        # Overlap fetching, parsing, analysis and per-product summaries in a staged pipeline
+        self.pipelined = os.getenv('SHOPPER_PIPELINE', 'false').lower() in ('1', 'true', 'yes')
+        self.presummarize = os.getenv('SHOPPER_PRESUMMARIZE', 'false').lower() in ('1', 'true', 'yes')
+        self.pipeline_report = []
+        # Batch runs share loaded products between queries, see src/batch.py
+        self.shared_products = None
+        # JSON trace of spans and counters written when the bot closes
+        self.trace_file = os.getenv('SHOPPER_TRACE_FILE')
+        # Seconds a query may take before it answers with what it has (0 = no limit)
+        self.query_deadline = float(os.getenv('SHOPPER_QUERY_DEADLINE', '0')) or None
+        # Whether the last query ran out of time and answered from partial results
+        self.partial = False
+        
+        # Product details and reviews persist between runs unless the cache path is empty
+        cache_path = os.getenv('SHOPPER_CACHE_PATH', 'shopper_cache.db')
+        self.cache = ProductCache(cache_path) if cache_path else None
+        llm_cache_ttl = int(os.getenv('SHOPPER_LLM_CACHE_TTL', str(24 * 3600)))
+        self.llm_cache = LLMCache(cache_path, ttl=llm_cache_ttl) if cache_path and llm_cache_ttl > 0 else None
+        # Every fetched review is also appended to a memory-mapped columnar store when a directory is set
+        review_store_dir = os.getenv('SHOPPER_REVIEW_STORE')
+        self.review_store = get_review_store(review_store_dir) if review_store_dir else None
+        
+        # Optional custom sentiment lexicon of 'word<TAB>score' lines
+        lexicon_path = os.getenv('SHOPPER_SENTIMENT_LEXICON')
+        self.sentiment_engine = SentimentEngine.from_file(lexicon_path) if lexicon_path else SentimentEngine()
+        
+        # Products are compacted until the recommendation prompt fits this many tokens
+        self.prompt_builder = PromptBuilder(int(os.getenv('SHOPPER_PROMPT_TOKEN_BUDGET', '1200')))
+        # Cached recommendations can be sampled at temperature 0 so they are reproducible
+        deterministic = os.getenv('SHOPPER_LLM_DETERMINISTIC', 'false').lower() in ('1', 'true', 'yes')
+        self.llm_client = llm_client or OpenAIChatClient(
+            temperature=0.0 if deterministic and self.llm_cache else 0.7,
+            api_base=os.getenv('OPENAI_API_BASE') or None,
+            timeout=float(os.getenv('SHOPPER_LLM_TIMEOUT', '60'))
+        )
+        
         # Initialize components
         self.auth = AmazonAuthenticator()
         self.driver = None
+        self.fetcher = None
         self.scraper = None
         self.analyzer = None
 
@@ -38,8 +113,7 @@ class AmazonAIShopperBot:
             if not self.auth.login():
                 raise Exception("Failed to login to Amazon")
 
-            self.scraper = ProductScraper(self.driver)
-            self.analyzer = ReviewAnalyzer(self.driver)
+            self.attach_driver(self.driver)
             
             logger.info("Bot initialized successfully")
             return True
@@ -48,42 +122,98 @@ class AmazonAIShopperBot:
             logger.error(f"Failed to initialize bot: {str(e)}")
             return False
 
-    def search_and_analyze(self, product_query, budget=None):
-        """Search for products and analyze them"""
+    def attach_driver(self, driver):
+        """Run queries on an already initialized and logged-in driver"""
+        self.driver = instrument_driver(driver)
+        if self.fetch_backend == 'http':
+            # Plain HTTP first, the browser only for pages that need JavaScript
+            self.fetcher = FallbackFetcher(
+                HttpFetcher(max_workers=max(self.workers, 4)),
+                TabPoolFetcher(driver, max_tabs=self.workers)
+            )
+        self.scraper = ProductScraper(driver, fetcher=self.fetcher)
+        self.analyzer = ReviewAnalyzer(
+            driver, fetcher=self.fetcher, sentiment_engine=self.sentiment_engine,
+            review_store=self.review_store
+        )
+
+    @traced('search_and_analyze')
+    def search_and_analyze(self, product_query, budget=None, on_text=None, deadline=None):
+        """Search for products and analyze them, streaming the recommendation to on_text if given.
+
+        The query has to finish by the deadline, SHOPPER_QUERY_DEADLINE seconds
+        from now unless one is given. Search, analysis and the recommendation
+        each get a share of it; a stage that runs out stops where it is, and the
+        recommendation is made from the products analyzed so far, with
+        ``self.partial`` set.
+        """
+        self.partial = False
+        deadline = deadline or Deadline(self.query_deadline)
+        stages = deadline.split(STAGE_BUDGETS)
         try:
-            # Search for the product
-            if not self.scraper.search_product(product_query):
-                raise Exception("Failed to search for product")
+            # Stored reviews are grouped into categories by their normalized search query
+            category = normalize_query(product_query)
+            if self.preranker:
+                # Score a pool of listings and deep-analyze only the most promising ones
+                listings = list(self.scraper.get_top_products(
+                    product_query, num_products=self.preranker.pool_size, max_price=budget,
+                    min_rating=self.min_rating, deadline=stages['search']
+                ))
+                if stages['search'].expired():
+                    self._deadline_exceeded('search', f"{len(listings)} listings found")
+                candidates = self.preranker.select(listings, product_query, budget)
+                get_tracer().count('prerank_listings', len(listings), kind='scored')
+                get_tracer().count('prerank_listings', len(candidates), kind='selected')
+                logger.info(f"Pre-ranking kept {len(candidates)} of {len(listings)} listings for analysis")
+            else:
+                # Matching listings are read lazily, one results page at a time, so
+                # analysis starts on the first candidates while later pages are pending.
+                # Searching overlaps analysis here, so both share the analysis deadline
+                candidates = self.scraper.get_top_products(
+                    product_query, num_products=5, max_price=budget, min_rating=self.min_rating,
+                    deadline=stages['analyze']
+                )
 
-            # Get top products
-            products = self.scraper.get_top_products(num_products=5)
-            if not products:
-                raise Exception("No products found")
+            analyze_deadline = stages['analyze']
+            listed = []
+            candidates = self._recording(candidates, listed)
+            if self.shared_products is not None:
+                analyzed_products = self._analyze_candidates(candidates, category=category,
+                                                             deadline=analyze_deadline)
+            elif self.pipelined:
+                analyzed_products = self._analyze_candidates_pipelined(candidates, product_query,
+                                                                       deadline=analyze_deadline)
+            elif self.workers > 1:
+                analyzed_products = self._analyze_candidates_parallel(list(candidates), category=category,
+                                                                      deadline=analyze_deadline)
+            else:
+                analyzed_products = self._analyze_candidates(candidates, category=category,
+                                                             deadline=analyze_deadline)
 
-            analyzed_products = []
-            
-            for product in products:
-                # Skip if price is above budget
-                if budget and self._extract_price(product['price']) > budget:
-                    continue
-
-                # Get detailed product info
-                product_info = self.scraper.analyze_product(product['link'])
-                if not product_info:
-                    continue
-
-                # Get and analyze reviews
-                reviews = self.analyzer.get_reviews(product['link'], num_reviews=20)
-                review_analysis = self.analyzer.analyze_reviews(reviews)
-
-                analyzed_products.append({
-                    'basic_info': product,
-                    'detailed_info': product_info,
-                    'review_analysis': review_analysis
-                })
+            if not analyzed_products and self.partial:
+                # No product page finished in time: answer from the search listings alone
+                analyzed_products = [
+                    {'basic_info': product, 'detailed_info': None, 'review_analysis': None}
+                    for product in listed
+                ]
+
+            if not analyzed_products:
+                raise Exception("No products found")
 
             # Use AI to make a recommendation
-            recommendation = self._get_ai_recommendation(analyzed_products, product_query)
+            if on_text:
+                recommendation = self.stream_recommendation(analyzed_products, product_query, on_text,
+                                                            deadline=stages['recommend'])
+            else:
+                recommendation = self._get_ai_recommendation(analyzed_products, product_query,
+                                                             deadline=stages['recommend'])
+
+            if recommendation is None and deadline.expires_at is not None:
+                # Out of time for the model before any text went out: still answer, from the ratings alone
+                self._deadline_exceeded('recommend', "using the rating-based recommendation")
+                recommendation = fallback_recommendation(analyzed_products)
+                if on_text:
+                    on_text(recommendation)
             
             return recommendation
 
@@ -91,52 +221,297 @@ class AmazonAIShopperBot:
             logger.error(f"Error in search and analysis: {str(e)}")
             return None
 
-    def _extract_price(self, price_str):
-        """Extract numerical price from string"""
-        try:
-            return float(''.join(filter(str.isdigit, price_str)))
-        except:
-            return float('inf')
+    @staticmethod
+    def _recording(candidates, listed):
+        """Pass candidates through, appending each one to listed as it is read"""
+        for product in candidates:
+            listed.append(product)
+            yield product
+
+    def _deadline_exceeded(self, stage, detail):
+        """Mark the query's result as partial after a stage ran out of time"""
+        self.partial = True
+        get_tracer().count('deadline_exceeded', stage=stage)
+        logger.warning(f"Deadline reached in the {stage} stage, {detail}")
+
+    def _analyze_candidates(self, candidates, num_reviews=20, category=None, deadline=None):
+        """Analyze candidate products one after another on the shared driver"""
+        analyzed_products = []
+
+        for product in candidates:
+            if is_expired(deadline):
+                self._deadline_exceeded('analyze', f"{len(analyzed_products)} products analyzed")
+                break
+            if self.shared_products is not None:
+                key = extract_asin(product['link']) or product['link']
+                loaded = self.shared_products.get_or_load(
+                    key, lambda: self._load_candidate(product, num_reviews, category, deadline), deadline
+                )
+            else:
+                loaded = self._load_candidate(product, num_reviews, category, deadline)
+            if loaded is None:
+                continue
+
+            product_info, reviews = loaded
+            review_analysis = self.analyzer.analyze_reviews(reviews)
+
+            analyzed_products.append({
+                'basic_info': product,
+                'detailed_info': product_info,
+                'review_analysis': review_analysis
+            })
+
+        return analyzed_products
+
+    def _load_candidate(self, product, num_reviews, category=None, deadline=None):
+        """Product details and raw reviews from the cache or the site, or None on failure"""
+        product_info, reviews = self._lookup_cache(product, num_reviews)
+
+        # Get detailed product info
+        if product_info is None:
+            product_info = self.scraper.analyze_product(product['link'], deadline)
+            if not product_info:
+                return None
+            self._store_details(product, product_info)
+
+        # Get reviews
+        if reviews is None:
+            reviews = self.analyzer.get_reviews(product['link'], num_reviews=num_reviews, deadline=deadline)
+            # Reviews cut short by the deadline are used but not cached as a full set
+            if not is_expired(deadline):
+                self._store_reviews(product, reviews, num_reviews, category)
+
+        return product_info, reviews
+
+    def _analyze_candidates_parallel(self, candidates, num_reviews=20, category=None, deadline=None):
+        """Analyze candidate products at once in browser tabs sharing the session"""
+        details = {}
+        reviews = {}
+        for rank, product in enumerate(candidates):
+            details[rank], reviews[rank] = self._lookup_cache(product, num_reviews)
+
+        # Map every uncached product and review page to (rank, page); page 0 is the product page
+        pages = {}
+        for rank, product in enumerate(candidates):
+            if product['link'] in pages:
+                continue
+            if details[rank] is None:
+                pages[product['link']] = (rank, 0)
+            asin = extract_asin(product['link'])
+            if not asin or reviews[rank] is not None:
+                continue
+            for page in range(1, math.ceil(num_reviews / REVIEWS_PER_PAGE) + 1):
+                pages[review_page_url(asin, page)] = (rank, page)
+
+        review_pages = defaultdict(dict)
+        fetcher = self.fetcher or TabPoolFetcher(self.driver, max_tabs=self.workers)
+        for url, page_source in fetcher.fetch_many(pages, deadline):
+            if page_source is None:
+                continue
+            rank, page = pages[url]
+            if page == 0:
+                details[rank] = extract_product_details(page_source)
+                self._store_details(candidates[rank], details[rank])
+            else:
+                review_pages[rank][page] = extract_reviews(page_source)
+
+        # Pages left unfetched at the deadline leave partial reviews, which are not cached
+        complete = not is_expired(deadline)
+        if not complete:
+            self._deadline_exceeded('analyze', f"{sum(1 for rank in details if details[rank])} "
+                                               f"of {len(candidates)} product pages loaded")
+
+        for rank in review_pages:
+            reviews[rank] = [
+                review
+                for page in sorted(review_pages[rank])
+                for review in review_pages[rank][page]
+            ][:num_reviews]
+            if complete:
+                self._store_reviews(candidates[rank], reviews[rank], num_reviews, category)
+
+        # Merge results back in search rank order
+        analyzed_products = []
+        for rank, product in enumerate(candidates):
+            if not details[rank]:
+                continue
+
+            analyzed_products.append({
+                'basic_info': product,
+                'detailed_info': details[rank],
+                'review_analysis': self.analyzer.analyze_reviews(reviews[rank] or [])
+            })
 
-    def _get_ai_recommendation(self, products, query):
+        return analyzed_products
+
+    def _analyze_candidates_pipelined(self, candidates, query, num_reviews=20, deadline=None):
+        """Analyze candidate products in overlapping fetch, parse, analyze and summarize stages"""
+        pipeline = ProductPipeline(
+            self.fetcher or TabPoolFetcher(self.driver, max_tabs=self.workers),
+            self.analyzer,
+            cache=self.cache,
+            prompt_builder=self.prompt_builder if self.presummarize else None,
+            llm_client=self.llm_client if self.presummarize else None,
+            llm_cache=self.llm_cache,
+            num_reviews=num_reviews
+        )
+        analyzed_products = pipeline.run(candidates, query, deadline)
+        self.pipeline_report = pipeline.report()
+        if is_expired(deadline):
+            self._deadline_exceeded('analyze', f"{len(analyzed_products)} products analyzed")
+        return analyzed_products
+
+    def refresh_review_analysis(self, product_link, max_pages=20):
+        """Update a product's review aggregates with only the reviews posted since last time"""
+        asin = extract_asin(product_link)
+        if not asin:
+            logger.error(f"Could not find ASIN in product URL: {product_link}")
+            return None
+
+        saved = self.cache.get_review_state(asin) if self.cache else None
+        state = ReviewState.from_dict(saved) if saved else ReviewState(asin)
+
+        new_reviews = self.analyzer.refresh_reviews(product_link, state, max_pages=max_pages)
+        logger.info(f"Merged {len(new_reviews)} new reviews for {asin}")
+
+        if self.cache:
+            self.cache.put_review_state(asin, state.to_dict())
+        return state.to_analysis()
+
+    def _lookup_cache(self, product, num_reviews):
+        """Cached (details, reviews) for a product; either is None on a miss"""
+        asin = extract_asin(product['link'])
+        if not self.cache or not asin:
+            return None, None
+        return self.cache.get_details(asin), self.cache.get_reviews(asin, num_reviews)
+
+    def _store_details(self, product, product_info):
+        """Cache analyze_product output under the product's ASIN"""
+        asin = extract_asin(product['link'])
+        if self.cache and asin and product_info:
+            self.cache.put_details(asin, product_info)
+
+    def _store_reviews(self, product, reviews, num_reviews, category=None):
+        """Cache raw reviews under the product's ASIN and add them to the review store"""
+        asin = extract_asin(product['link'])
+        if self.cache and asin and reviews:
+            self.cache.put_reviews(asin, reviews, num_reviews)
+        self.analyzer.record_reviews(product['link'], reviews, category)
+
+    @traced('ai_recommendation')
+    def _get_ai_recommendation(self, products, query, deadline=None):
         """Get AI recommendation using OpenAI"""
         try:
-            # Prepare the prompt
-            prompt = f"""
-            I'm looking to buy {query}. Based on the following product data, please recommend the best option:
-            
-            {json.dumps(products, indent=2)}
-            
-            Please consider:
-            1. Price-to-quality ratio
-            2. Review sentiment and verified purchase ratio
-            3. Average rating and number of reviews
-            4. Key features and their relevance
-            
-            Provide your recommendation in this format:
-            1. Recommended Product: [product name]
-            2. Reasoning: [detailed explanation]
-            3. Key Pros: [list of main advantages]
-            4. Key Cons: [list of main disadvantages]
-            5. Price: [price]
-            """
-
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI shopping assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
+            prompt = self._build_prompt(products, query)
+            cached = self._cached_recommendation(prompt)
+            if cached is not None:
+                return cached
 
-            return response.choices[0].message.content
+            recommendation = self.llm_client.complete(prompt.messages, timeout=self._llm_timeout(deadline))
+            self._store_recommendation(prompt, recommendation)
+            return recommendation
 
         except Exception as e:
             logger.error(f"Error getting AI recommendation: {str(e)}")
             return None
 
+    async def astream_recommendation(self, products, query, deadline=None):
+        """Yield the AI recommendation in pieces as the model generates it"""
+        prompt = self._build_prompt(products, query)
+        cached = self._cached_recommendation(prompt)
+        if cached is not None:
+            yield cached
+            return
+
+        timeout = self._llm_timeout(deadline)
+        get_tracer().count('llm_tokens', prompt.tokens, kind='prompt', model=self.llm_client.params()['model'])
+        pieces = []
+        stream = self.llm_client.astream(prompt.messages, timeout=timeout)
+        try:
+            async for piece in stream:
+                pieces.append(piece)
+                yield piece
+        finally:
+            # Closing the stream on timeout, cancellation or early exit frees the connection
+            await stream.aclose()
+
+        # Only complete replies are cached
+        self._store_recommendation(prompt, ''.join(pieces))
+
+    def stream_recommendation(self, products, query, on_text, deadline=None):
+        """Get AI recommendation, passing each piece of text to on_text as it arrives.
+
+        Returns exactly the text passed to on_text. A stream that breaks off
+        after some text went out ends with STREAM_BREAK, so the reader sees
+        where it stopped; one that fails before any text sends nothing and
+        returns None.
+        """
+        pieces = []
+
+        async def consume():
+            stream = self.astream_recommendation(products, query, deadline)
+            try:
+                async for piece in stream:
+                    on_text(piece)
+                    pieces.append(piece)
+            finally:
+                await stream.aclose()
+
+        try:
+            with get_tracer().span('ai_recommendation', streamed=True):
+                asyncio.run(consume())
+            return ''.join(pieces)
+        except asyncio.TimeoutError:
+            logger.error("AI recommendation timed out")
+            if pieces and deadline is not None and deadline.remaining() is not None:
+                self._deadline_exceeded('recommend', "the streamed recommendation was cut off")
+        except Exception as e:
+            logger.error(f"Error streaming AI recommendation: {str(e)}")
+
+        if not pieces:
+            return None
+        try:
+            on_text(STREAM_BREAK)
+        except Exception as e:
+            # The reader is gone, e.g. a disconnected client
+            logger.error(f"Error marking the end of the streamed recommendation: {str(e)}")
+            return ''.join(pieces)
+        return ''.join(pieces) + STREAM_BREAK
+
+    def _llm_timeout(self, deadline):
+        """Seconds the model may take before the deadline, or None without one"""
+        if deadline is None or deadline.remaining() is None:
+            return None
+        if deadline.remaining() < MIN_LLM_SECONDS:
+            raise asyncio.TimeoutError("Too little time left for an AI recommendation")
+        return deadline.remaining()
+
+    def _build_prompt(self, products, query):
+        """Compact recommendation prompt, with its token accounting logged"""
+        prompt = self.prompt_builder.build(products, query)
+        logger.info(
+            f"Recommendation prompt: {prompt.tokens} tokens, "
+            f"{prompt.saved_tokens} saved of {prompt.baseline_tokens}"
+        )
+        if not prompt.within_budget:
+            logger.warning(f"Prompt exceeds the {self.prompt_builder.token_budget} token budget")
+        return prompt
+
+    def _cached_recommendation(self, prompt):
+        """Cached reply to an identical earlier prompt, or None"""
+        if not self.llm_cache:
+            return None
+        cached = self.llm_cache.get_response(prompt.query, prompt.records, self.llm_client.params())
+        if cached is not None:
+            get_tracer().count('llm_cache_hits')
+            logger.info("Recommendation served from the LLM cache")
+        return cached
+
+    def _store_recommendation(self, prompt, recommendation):
+        """Cache a reply under its prompt's content hash"""
+        if self.llm_cache and recommendation:
+            self.llm_cache.put_response(prompt.query, prompt.records, self.llm_client.params(), recommendation)
+
     def purchase_product(self, product_url):
         """Purchase the recommended product"""
         # TODO: Implement purchase functionality
@@ -152,8 +527,30 @@ class AmazonAIShopperBot:
         
         return False
 
+    def release(self):
+        """Release fetchers and caches but leave the driver running"""
+        if self.fetcher:
+            self.fetcher.close()
+            self.fetcher = None
+        if self.cache:
+            logger.info(f"Product cache stats: {self.cache.stats()}")
+            self.cache.close()
+            self.cache = None
+        if self.llm_cache:
+            logger.info(f"LLM cache stats: {self.llm_cache.stats()}")
+            self.llm_cache.close()
+            self.llm_cache = None
+        if self.review_store:
+            logger.info(f"Review store stats: {self.review_store.stats()}")
+            self.review_store.close()
+            self.review_store = None
+
     def close(self):
         """Clean up resources"""
+        self.release()
+        if self.trace_file:
+            get_tracer().write_trace(self.trace_file)
+            logger.info(f"Trace written to {self.trace_file}")
         if self.auth:
             self.auth.close()
             logger.info("Browser closed")
@@ -170,13 +567,22 @@ def main():
             budget_input = input("What's your budget? (Enter 0 for no budget) ")
             budget = float(budget_input) if budget_input and float(budget_input) > 0 else None
             
-            # Search and analyze
+            # Search and analyze, printing the recommendation as it is generated
             print(f"\nSearching for '{query}'...")
-            recommendation = bot.search_and_analyze(query, budget)
+            started = []
+
+            def show(text):
+                if not started:
+                    print("\nAI Recommendation:")
+                    started.append(True)
+                print(text, end='', flush=True)
+
+            recommendation = bot.search_and_analyze(query, budget, on_text=show)
             
             if recommendation:
-                print("\nAI Recommendation:")
-                print(recommendation)
+                print()
+                if bot.partial:
+                    print("(Time ran out, so this is based on the products analyzed so far.)")
                 
                 # Ask if user wants to purchase
                 purchase = input("\nWould you like to purchase this item? (yes/no) ").lower()
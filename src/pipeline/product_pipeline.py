@@ -0,0 +1,187 @@
+from collections import defaultdict
+import math
+import logging
+from src.scraper.amazon_urls import extract_asin, review_page_url
+from src.scraper.html_extractor import extract_product_details, extract_reviews
+from src.analyzer.review_analyzer import REVIEWS_PER_PAGE
+from src.storage.llm_cache import normalize_query
+from src.scraper.deadline import is_expired
+from src.pipeline.stages import Pipeline, Stage
+
+# Page number of the product page in a product's plan; review pages count from 1
+PRODUCT_PAGE = 0
+
+
+class ProductPipeline:
+    """Fetch, parse, analyze and pre-summarize candidate products as overlapping stages.
+
+    Pages of every candidate stream out of the fetcher in completion order.
+    Parsing, review analysis and the optional per-product LLM summary of one
+    product then run while the pages of the next ones are still loading.
+    """
+
+    def __init__(self, fetcher, analyzer, cache=None, prompt_builder=None, llm_client=None,
+                 llm_cache=None, num_reviews=20, parse_workers=2, summarize_workers=2, queue_size=8):
+        self.fetcher = fetcher
+        self.analyzer = analyzer
+        self.cache = cache
+        # A prompt builder and LLM client enable per-product summaries
+        self.prompt_builder = prompt_builder
+        self.llm_client = llm_client
+        self.llm_cache = llm_cache
+        self.num_reviews = num_reviews
+        self.parse_workers = parse_workers
+        self.summarize_workers = summarize_workers
+        self.queue_size = queue_size
+        self.logger = logging.getLogger(__name__)
+        self.pipeline = None
+
+    def run(self, candidates, query, deadline=None):
+        """Analyzed products in search rank order, with a 'summary' when summaries are enabled.
+
+        ``candidates`` may be a lazy iterator; it is read from the fetch stage,
+        so products found early are analyzed while later ones are still loading.
+        Once the deadline passes no more pages are requested, products are
+        completed from the pages loaded so far and summaries are skipped.
+        """
+        products = []
+        plan = {}
+        received = defaultdict(dict)
+        # Reviews recorded in the review store are grouped by the normalized query
+        category = normalize_query(query)
+
+        stages = [
+            Stage('parse', self._parse, workers=self.parse_workers),
+            Stage('analyze', lambda item: self._analyze(item, products, plan, received, category, deadline)),
+        ]
+        if self.prompt_builder and self.llm_client:
+            stages.append(Stage('summarize', lambda item: self._summarize(item, query, deadline),
+                                workers=self.summarize_workers))
+
+        self.pipeline = Pipeline('fetch', self._fetch(candidates, products, plan, deadline), stages,
+                                 self.queue_size)
+        results = self.pipeline.run()
+        self.logger.info(f"Pipeline stage utilization:\n{self.pipeline.format_report()}")
+        return [product for rank, product in sorted(results, key=lambda result: result[0])]
+
+    def report(self):
+        """Per-stage utilization of the last run"""
+        return self.pipeline.report() if self.pipeline else []
+
+    def _plan(self, product):
+        """Pages a candidate needs, mapped to the parts already in the product cache"""
+        asin = extract_asin(product['link'])
+        details = reviews = None
+        if self.cache and asin:
+            details = self.cache.get_details(asin)
+            reviews = self.cache.get_reviews(asin, self.num_reviews)
+
+        pages = {PRODUCT_PAGE: details}
+        if reviews is not None:
+            # Cached reviews stand in for all review pages
+            pages[1] = reviews
+        elif asin:
+            for page in range(1, math.ceil(self.num_reviews / REVIEWS_PER_PAGE) + 1):
+                pages[page] = None
+        return pages
+
+    def _fetch(self, candidates, products, plan, deadline=None):
+        """Source stage: yield (rank, page, html, value) as cache hits and page loads complete"""
+        cached = []
+        # Pages requested but not loaded yet; duplicate listings share their page loads
+        pending = {}
+
+        def urls():
+            for rank, product in enumerate(candidates):
+                if is_expired(deadline):
+                    return
+                pages = self._plan(product)
+                products.append(product)
+                plan[rank] = set(pages)
+                for page, value in pages.items():
+                    if value is not None:
+                        cached.append((rank, page, None, value))
+                        continue
+                    link = product['link']
+                    url = link if page == PRODUCT_PAGE else review_page_url(extract_asin(link), page)
+                    # Registered before the URL is handed out, since it may finish before we resume
+                    requested = url in pending
+                    pending.setdefault(url, []).append((rank, page))
+                    if not requested:
+                        yield url
+
+        for url, page_source in self.fetcher.fetch_many(urls(), deadline):
+            while cached:
+                yield cached.pop()
+            for rank, page in pending.pop(url):
+                # Failed pages are still passed on so the product can complete
+                yield rank, page, page_source or '', None
+        while cached:
+            yield cached.pop()
+        # Pages the fetcher gave up on at the deadline count as failed too
+        for waiting in pending.values():
+            for rank, page in waiting:
+                yield rank, page, '', None
+
+    def _parse(self, item):
+        """Parse stage: turn a page snapshot into product details or reviews"""
+        rank, page, page_source, value = item
+        if page_source:
+            value = extract_product_details(page_source) if page == PRODUCT_PAGE else extract_reviews(page_source)
+        # Only freshly fetched pages are written back to the cache
+        yield rank, page, value, page_source is not None
+
+    def _analyze(self, item, products, plan, received, category=None, deadline=None):
+        """Analyze stage: once all pages of a product are in, cache them and analyze its reviews"""
+        rank, page, value, fetched = item
+        received[rank][page] = (value, fetched)
+        if len(received[rank]) < len(plan[rank]):
+            return
+
+        pages = received.pop(rank)
+        product = products[rank]
+        details, details_fetched = pages.pop(PRODUCT_PAGE)
+        if not details:
+            return
+
+        reviews = [review for page in sorted(pages) for review in (pages[page][0] or [])][:self.num_reviews]
+        reviews_fetched = any(fetched for value, fetched in pages.values())
+        asin = extract_asin(product['link'])
+        if self.cache and asin:
+            if details_fetched:
+                self.cache.put_details(asin, details)
+            # Review pages missed at the deadline leave a partial set, which is not cached
+            if reviews_fetched and reviews and not is_expired(deadline):
+                self.cache.put_reviews(asin, reviews, self.num_reviews)
+        if reviews_fetched:
+            self.analyzer.record_reviews(product['link'], reviews, category)
+
+        yield rank, {
+            'basic_info': product,
+            'detailed_info': details,
+            'review_analysis': self.analyzer.analyze_reviews(reviews)
+        }
+
+    def _summarize(self, item, query, deadline=None):
+        """Summarize stage: ask the LLM for a short summary of one product"""
+        rank, product = item
+        if is_expired(deadline):
+            yield rank, product
+            return
+        prompt = self.prompt_builder.build_summary(product, query)
+        params = dict(self.llm_client.params(), task='summary')
+
+        summary = self.llm_cache.get_response(query, prompt.records, params) if self.llm_cache else None
+        if summary is None:
+            try:
+                summary = self.llm_client.complete(prompt.messages,
+                                                   timeout=deadline.remaining() if deadline else None)
+            except Exception as e:
+                self.logger.error(f"Error summarizing product {rank + 1}: {str(e)}")
+                summary = None
+            if self.llm_cache and summary:
+                self.llm_cache.put_response(query, prompt.records, params, summary)
+
+        if summary:
+            product = dict(product, summary=summary)
+        yield rank, product
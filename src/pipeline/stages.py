@@ -0,0 +1,170 @@
+import queue
+import threading
+import time
+import logging
+
+# Sentinel passed down the queues once a stage has no more output
+_DONE = object()
+
+
+class StageStats:
+    """Time accounting for one pipeline stage, summed over its workers"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.outputs = 0
+        self.errors = 0
+        # Seconds spent working, waiting for input, and waiting for room downstream
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **amounts):
+        """Add to counters from a worker thread"""
+        with self._lock:
+            for field, amount in amounts.items():
+                setattr(self, field, getattr(self, field) + amount)
+
+    def to_dict(self, wall):
+        """Counters plus the share of the workers' wall time spent busy"""
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'items': self.items,
+            'outputs': self.outputs,
+            'errors': self.errors,
+            'busy': round(self.busy, 3),
+            'idle': round(self.idle, 3),
+            'blocked': round(self.blocked, 3),
+            'utilization': round(self.busy / (wall * self.workers), 3) if wall else 0.0,
+        }
+
+
+class Stage:
+    """A pipeline step: ``function(item)`` returns an iterable of zero or more outputs"""
+
+    def __init__(self, name, function, workers=1):
+        self.name = name
+        self.function = function
+        self.workers = workers
+
+
+class Pipeline:
+    """Runs a source and a chain of stages on threads joined by bounded queues.
+
+    Each stage starts on an item as soon as the previous stage emits it, so
+    I/O-bound and CPU-bound stages overlap. A full queue blocks its producer,
+    which bounds memory and keeps a fast stage from running far ahead. An item
+    whose stage raises is logged and dropped.
+    """
+
+    def __init__(self, source_name, source, stages, queue_size=8):
+        self.source_name = source_name
+        self.source = source
+        self.stages = stages
+        self.queue_size = queue_size
+        self.logger = logging.getLogger(__name__)
+        self.stats = [StageStats(source_name, 1)] + [StageStats(stage.name, stage.workers) for stage in stages]
+        self.wall = 0.0
+
+    def run(self):
+        """Run to completion and return the last stage's outputs in completion order"""
+        queues = [queue.Queue(self.queue_size) for _ in self.stages] + [queue.Queue()]
+        threads = [threading.Thread(target=self._run_source, args=(queues[0],), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._run_worker,
+                    args=(stage, self.stats[index + 1], queues[index], queues[index + 1], remaining, lock),
+                    daemon=True
+                ))
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        results = []
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            results.append(item)
+
+        for thread in threads:
+            thread.join()
+        self.wall = time.perf_counter() - started
+        return results
+
+    def report(self):
+        """Per-stage utilization of the last run"""
+        return [stats.to_dict(self.wall) for stats in self.stats]
+
+    def format_report(self):
+        """Utilization report as an aligned text table"""
+        lines = [f"{'stage':<12}{'workers':>8}{'in':>6}{'out':>6}{'busy s':>9}{'idle s':>9}{'blocked s':>11}{'util':>7}"]
+        for row in self.report():
+            lines.append(
+                f"{row['stage']:<12}{row['workers']:>8}{row['items']:>6}{row['outputs']:>6}{row['busy']:>9.3f}"
+                f"{row['idle']:>9.3f}{row['blocked']:>11.3f}{row['utilization']:>7.0%}"
+            )
+        lines.append(f"wall time {self.wall:.3f}s")
+        return '\n'.join(lines)
+
+    def _run_source(self, out_queue):
+        """Feed the first stage from the source iterable"""
+        stats = self.stats[0]
+        try:
+            self._emit(self.source, stats, out_queue)
+        except Exception as e:
+            stats.add(errors=1)
+            self.logger.error(f"Pipeline stage {self.source_name} failed: {str(e)}")
+        finally:
+            out_queue.put(_DONE)
+
+    def _run_worker(self, stage, stats, in_queue, out_queue, remaining, lock):
+        """Process items until the upstream stage is done"""
+        while True:
+            waited = time.perf_counter()
+            item = in_queue.get()
+            stats.add(idle=time.perf_counter() - waited)
+
+            if item is _DONE:
+                # Let sibling workers see the sentinel; the last one passes it on
+                in_queue.put(_DONE)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    out_queue.put(_DONE)
+                return
+
+            stats.add(items=1)
+            try:
+                started = time.perf_counter()
+                outputs = stage.function(item)
+                stats.add(busy=time.perf_counter() - started)
+                self._emit(outputs, stats, out_queue)
+            except Exception as e:
+                stats.add(errors=1)
+                self.logger.error(f"Pipeline stage {stage.name} failed on an item: {str(e)}")
+
+    def _emit(self, outputs, stats, out_queue):
+        """Pass outputs downstream, timing production and waits for queue space separately"""
+        iterator = iter(outputs or ())
+        while True:
+            started = time.perf_counter()
+            try:
+                output = next(iterator)
+            except StopIteration:
+                stats.add(busy=time.perf_counter() - started)
+                return
+            stats.add(busy=time.perf_counter() - started)
+
+            waited = time.perf_counter()
+            out_queue.put(output)
+            stats.add(blocked=time.perf_counter() - waited, outputs=1)
@@ -0,0 +1,94 @@
+import asyncio
+
+import openai
+
+from src.instrumentation.tracer import get_tracer
+
+SYSTEM_PROMPT = "You are a helpful AI shopping assistant."
+
+
+class OpenAIChatClient:
+    """Chat completion client backed by the OpenAI API"""
+
+    def __init__(self, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000, api_base=None,
+                 timeout=60):
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        # Alternative endpoint speaking the same protocol, e.g. a local stub server
+        self.api_base = api_base
+        # Seconds allowed for a whole completion, streamed or not
+        self.timeout = timeout
+
+    def params(self):
+        """Model and sampling parameters that affect the reply"""
+        return {'model': self.model, 'temperature': self.temperature, 'max_tokens': self.max_tokens}
+
+    def complete(self, messages, timeout=None):
+        """Reply text for a list of chat messages, within timeout seconds if it is shorter than the client's"""
+        response = openai.ChatCompletion.create(
+            messages=messages,
+            request_timeout=self._timeout(timeout),
+            **self._request_params()
+        )
+        usage = response.get('usage')
+        if usage:
+            tracer = get_tracer()
+            tracer.count('llm_tokens', usage.get('prompt_tokens', 0), kind='prompt', model=self.model)
+            tracer.count('llm_tokens', usage.get('completion_tokens', 0), kind='completion', model=self.model)
+        return response.choices[0].message.content
+
+    async def astream(self, messages, timeout=None):
+        """Yield the reply text in pieces as the model generates it"""
+        timeout = self._timeout(timeout)
+        deadline = asyncio.get_running_loop().time() + timeout
+        response = await asyncio.wait_for(
+            openai.ChatCompletion.acreate(
+                messages=messages,
+                stream=True,
+                request_timeout=timeout,
+                **self._request_params()
+            ),
+            timeout
+        )
+        async for chunk in iterate_until(response, deadline):
+            text = chunk['choices'][0]['delta'].get('content')
+            if text:
+                # Streamed replies carry no usage; each content delta is one token
+                get_tracer().count('llm_tokens', kind='completion', model=self.model)
+                yield text
+
+    def _timeout(self, timeout):
+        """The client's timeout, or a shorter one given for a single call"""
+        return self.timeout if timeout is None else min(timeout, self.timeout)
+
+    def _request_params(self):
+        """Keyword arguments shared by every completion request"""
+        params = self.params()
+        if self.api_base:
+            params['api_base'] = self.api_base
+        return params
+
+
+async def iterate_until(chunks, deadline):
+    """Iterate an async stream, raising asyncio.TimeoutError once the loop time passes deadline.
+
+    The stream is closed on timeout, cancellation or early exit, which
+    releases the underlying HTTP connection.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError("LLM stream deadline exceeded")
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), remaining)
+            except StopAsyncIteration:
+                return
+            yield chunk
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            await aclose()
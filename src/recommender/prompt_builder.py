@@ -0,0 +1,243 @@
+import json
+import math
+import re
+
+from src.recommender.llm_client import SYSTEM_PROMPT
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokens added by the chat format around each message
+MESSAGE_OVERHEAD = 4
+
+INSTRUCTIONS = """Please consider:
+1. Price-to-quality ratio
+2. Review sentiment and verified purchase ratio
+3. Average rating and number of reviews
+4. Key features and their relevance
+
+Provide your recommendation in this format:
+1. Recommended Product: [product id and name]
+2. Reasoning: [detailed explanation]
+3. Key Pros: [list of main advantages]
+4. Key Cons: [list of main disadvantages]
+5. Price: [price]"""
+
+LEGEND = ("One JSON object per product. price in USD, rating out of 5, reviews = review count, "
+          "avg = average rating of sampled reviews, verified = verified purchase ratio, "
+          "sentiment = [positive, negative, neutral] review counts, phrases = common review phrases, "
+          "summary = short per-product review summary.")
+
+SUMMARY_INSTRUCTIONS = ("In at most two sentences, summarize this product's main strengths and weaknesses "
+                        "for this shopper, using its ratings, review sentiment and features.")
+
+# Field limits from richest to leanest; the least important fields go first
+LEVELS = (
+    {'name_chars': 80, 'summary_chars': 300, 'features': 5, 'feature_chars': 80, 'phrases': 5, 'availability': True, 'sentiment': True},
+    {'name_chars': 80, 'summary_chars': 300, 'features': 3, 'feature_chars': 50, 'phrases': 5, 'availability': True, 'sentiment': True},
+    {'name_chars': 80, 'summary_chars': 300, 'features': 3, 'feature_chars': 50, 'phrases': 0, 'availability': True, 'sentiment': True},
+    {'name_chars': 80, 'summary_chars': 200, 'features': 3, 'feature_chars': 50, 'phrases': 0, 'availability': False, 'sentiment': True},
+    {'name_chars': 80, 'summary_chars': 200, 'features': 1, 'feature_chars': 40, 'phrases': 0, 'availability': False, 'sentiment': True},
+    {'name_chars': 80, 'summary_chars': 150, 'features': 0, 'feature_chars': 0, 'phrases': 0, 'availability': False, 'sentiment': True},
+    {'name_chars': 80, 'summary_chars': 100, 'features': 0, 'feature_chars': 0, 'phrases': 0, 'availability': False, 'sentiment': False},
+    {'name_chars': 40, 'summary_chars': 0, 'features': 0, 'feature_chars': 0, 'phrases': 0, 'availability': False, 'sentiment': False},
+)
+
+_NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+_WORD_OR_SYMBOL = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """Counts prompt tokens with tiktoken, or estimates them when it is not installed"""
+
+    def __init__(self, model="gpt-3.5-turbo"):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except Exception:
+                self.encoding = None
+
+    @property
+    def exact(self):
+        """Whether counts come from the model's tokenizer"""
+        return self.encoding is not None
+
+    def count(self, text):
+        """Number of tokens in a text"""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        # Roughly one token per four characters of a word, one per symbol
+        return sum(math.ceil(len(piece) / 4) for piece in _WORD_OR_SYMBOL.findall(text))
+
+    def count_messages(self, messages):
+        """Number of tokens in a list of chat messages"""
+        return sum(self.count(message['content']) + MESSAGE_OVERHEAD for message in messages)
+
+
+class Prompt:
+    """Chat messages ready to send, with their token accounting"""
+
+    def __init__(self, query, records, messages, ids, tokens, baseline_tokens, level, within_budget):
+        self.query = query
+        # Compact product records embedded in the prompt
+        self.records = records
+        self.messages = messages
+        # Short product ids used in the prompt mapped back to product links
+        self.ids = ids
+        self.tokens = tokens
+        self.baseline_tokens = baseline_tokens
+        self.level = level
+        self.within_budget = within_budget
+
+    @property
+    def saved_tokens(self):
+        """Tokens saved compared with embedding the full product JSON"""
+        return self.baseline_tokens - self.tokens
+
+
+class PromptBuilder:
+    """Builds the recommendation prompt from compact, fixed-schema product records.
+
+    Each product becomes one JSON line with a short id instead of its URL,
+    numeric price and rating, deduplicated and truncated features, and its
+    top review phrases. If the prompt exceeds ``token_budget``, fields are
+    trimmed or dropped from least to most important until it fits.
+    """
+
+    def __init__(self, token_budget=1200, token_counter=None):
+        self.token_budget = token_budget
+        self.token_counter = token_counter or TokenCounter()
+
+    def build(self, products, query):
+        """Prompt for the analyzed products, as small as needed to fit the budget"""
+        ids = {f"P{rank}": product['basic_info'].get('link') for rank, product in enumerate(products, 1)}
+
+        for level, limits in enumerate(LEVELS):
+            records = [compact_product(product, product_id, limits)
+                       for product_id, product in zip(ids, products)]
+            messages = self._messages(query, '\n'.join(
+                json.dumps(record, separators=(',', ':'), ensure_ascii=False) for record in records
+            ), LEGEND)
+            tokens = self.token_counter.count_messages(messages)
+            if tokens <= self.token_budget:
+                break
+
+        baseline = self.token_counter.count_messages(
+            self._messages(query, json.dumps(products, indent=2))
+        )
+        return Prompt(query, records, messages, ids, tokens, baseline, level, tokens <= self.token_budget)
+
+    def build_summary(self, product, query):
+        """Prompt asking for a short summary of a single analyzed product"""
+        record = compact_product(product, 'P1', LEVELS[1])
+        record.pop('summary', None)
+        data = json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"I'm looking to buy {query}.\n\n{LEGEND}\n\n{data}\n\n{SUMMARY_INSTRUCTIONS}"}
+        ]
+        tokens = self.token_counter.count_messages(messages)
+        return Prompt(query, [record], messages, {'P1': (product.get('basic_info') or {}).get('link')},
+                      tokens, tokens, 1, tokens <= self.token_budget)
+
+    def _messages(self, query, product_data, legend=None):
+        """System and user messages around a block of product data"""
+        header = f"I'm looking to buy {query}. Based on the following product data, please recommend the best option:"
+        parts = [header, legend, product_data, INSTRUCTIONS]
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": '\n\n'.join(part for part in parts if part)}
+        ]
+
+
+def compact_product(product, product_id, limits=LEVELS[0]):
+    """Fixed-schema record of an analyzed product within the given field limits"""
+    basic = product.get('basic_info') or {}
+    details = product.get('detailed_info') or {}
+    reviews = product.get('review_analysis') or {}
+
+    record = {
+        'id': product_id,
+        'name': _truncate(details.get('title') or basic.get('title') or '', limits['name_chars']),
+        'price': _number(details.get('price') or basic.get('price')),
+        'rating': _number(details.get('rating') or basic.get('rating')),
+        'reviews': _integer(basic.get('review_count')),
+    }
+
+    total = reviews.get('total_reviews')
+    if total:
+        record['avg'] = round(reviews['average_rating'], 2)
+        record['verified'] = round(reviews['verified_purchases'] / total, 2)
+        if limits['sentiment']:
+            sentiment = reviews.get('sentiment_summary') or {}
+            record['sentiment'] = [sentiment.get(label, 0) for label in ('positive', 'negative', 'neutral')]
+
+    if limits['summary_chars'] and product.get('summary'):
+        record['summary'] = _truncate(product['summary'], limits['summary_chars'])
+
+    if limits['availability'] and details.get('availability'):
+        record['avail'] = _truncate(details['availability'], 30)
+
+    if limits['features']:
+        features = _dedupe(details.get('features') or [])
+        record['features'] = [_truncate(feature, limits['feature_chars'])
+                              for feature in features[:limits['features']]]
+
+    if limits['phrases'] and reviews.get('common_phrases'):
+        record['phrases'] = list(reviews['common_phrases'])[:limits['phrases']]
+
+    return record
+
+
+def fallback_recommendation(products):
+    """Recommendation picked by rating alone, for when there is no time left to ask the model"""
+    records = [compact_product(product, f"P{rank}") for rank, product in enumerate(products, 1)]
+    if not records:
+        return None
+    # Sampled review average first, then the listing rating, then how many reviews back it
+    best = max(records, key=lambda record: (record.get('avg') or record['rating'] or 0,
+                                            record['reviews'] or 0))
+    rating = best.get('avg') or best['rating']
+    lines = [f"1. Recommended Product: {best['id']} {best['name']}"]
+    lines.append(f"2. Reasoning: Highest rated of the {len(records)} products compared before the time limit"
+                 + (f", {rating} out of 5" if rating else "")
+                 + "; chosen without an AI review.")
+    if best['price'] is not None:
+        lines.append(f"3. Price: ${best['price']:.2f}")
+    return '\n'.join(lines)
+
+
+def _number(text):
+    """First number in a text like '1,299.99' or '4.5 out of 5 stars', or None"""
+    match = _NUMBER.search(str(text or ''))
+    return float(match.group().replace(',', '')) if match else None
+
+
+def _integer(text):
+    """Integer form of a count like '1,234', or None"""
+    value = _number(text)
+    return None if value is None else int(value)
+
+
+def _truncate(text, limit):
+    """Text cut to at most limit characters on a word boundary"""
+    text = ' '.join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:-') + '…'
+
+
+def _dedupe(features):
+    """Non-empty features in order, skipping case- and whitespace-insensitive repeats"""
+    seen = set()
+    unique = []
+    for feature in features:
+        key = ' '.join(feature.lower().split())
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(feature)
+    return unique
@@ -0,0 +1,67 @@
+from urllib.parse import urlencode, urlparse
+import os
+import re
+
+DEFAULT_BASE_URL = 'https://www.amazon.com'
+
+REVIEW_SORT_ORDERS = ('helpful', 'recent')
+REVIEW_STAR_FILTERS = (
+    'all_stars', 'five_star', 'four_star', 'three_star', 'two_star', 'one_star',
+    'positive', 'critical'
+)
+
+_ASIN_PATTERN = re.compile(r'/(?:dp|gp/product|product-reviews)/([A-Z0-9]{10})(?:[/?#]|$)')
+
+
+def get_base_url():
+    """Amazon base URL, overridable with AMAZON_BASE_URL for local stand-in sites"""
+    return os.getenv('AMAZON_BASE_URL', DEFAULT_BASE_URL).rstrip('/')
+
+
+def extract_asin(url):
+    """Extract the ASIN from a product or review page URL"""
+    match = _ASIN_PATTERN.search(url or '')
+    return match.group(1) if match else None
+
+
+def page_type(url):
+    """Kind of page a URL points to: 'search', 'product', 'reviews' or 'other'"""
+    path = urlparse(url).path
+    if path.startswith('/product-reviews/'):
+        return 'reviews'
+    if extract_asin(url):
+        return 'product'
+    if path == '/s' or path.startswith('/s/'):
+        return 'search'
+    return 'other'
+
+
+def review_page_url(asin, page=1, sort_by='helpful', filter_by_star=None):
+    """Build the URL of one page of a product's reviews"""
+    if sort_by not in REVIEW_SORT_ORDERS:
+        raise ValueError(f"Unknown review sort order: {sort_by}")
+    if filter_by_star is not None and filter_by_star not in REVIEW_STAR_FILTERS:
+        raise ValueError(f"Unknown review star filter: {filter_by_star}")
+
+    params = {
+        'reviewerType': 'all_reviews',
+        'pageNumber': page,
+        'sortBy': sort_by,
+    }
+    if filter_by_star:
+        params['filterByStar'] = filter_by_star
+
+    return f"{get_base_url()}/product-reviews/{asin}/?{urlencode(params)}"
+
+
+def search_url(query, page=1, min_price=None, max_price=None):
+    """Build the URL of one page of search results, narrowed to a price range in dollars"""
+    params = {'k': query}
+    if page > 1:
+        params['page'] = page
+    # Amazon applies these as the "Price" refinement on the results
+    if min_price:
+        params['low-price'] = f"{min_price:g}"
+    if max_price:
+        params['high-price'] = f"{max_price:g}"
+    return f"{get_base_url()}/s?{urlencode(params)}"
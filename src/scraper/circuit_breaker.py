@@ -0,0 +1,152 @@
+from urllib.parse import urlparse
+import os
+import time
+import threading
+import logging
+from src.scraper.amazon_urls import page_type
+from src.scraper.deadline import is_expired
+from src.instrumentation.tracer import get_tracer
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of requesting a page whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Stops requesting pages from a host and page type that keep failing.
+
+    Failures are counted per (host, page type). After ``failure_threshold``
+    failures in a row the circuit opens, and those pages are refused without
+    a request for ``reset_timeout`` seconds. Then one trial request is let
+    through. If it succeeds the circuit closes again, and if it fails the
+    circuit stays open for another ``reset_timeout``.
+
+    Every request that ``allow`` let through has to be resolved with
+    ``record_success``, ``record_failure`` or ``release``, or a half-open
+    circuit keeps waiting for its trial forever.
+
+    Each fetch backend has its own breaker, named by ``backend``, so pages
+    blocked over plain HTTP can still be retried in the browser.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, backend='browser'):
+        self.backend = backend
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.logger = logging.getLogger(__name__)
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def allow(self, url):
+        """Whether a request to the URL may go out now"""
+        if self.failure_threshold <= 0:
+            return True
+        key = self._key(url)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit['state'] == CLOSED:
+                return True
+            if circuit['state'] == OPEN and time.monotonic() - circuit['opened_at'] >= self.reset_timeout:
+                # Let one trial request through
+                circuit['state'] = HALF_OPEN
+                return True
+            circuit['rejected'] += 1
+        get_tracer().count('circuit_rejections', host=key[0], page=key[1], backend=self.backend)
+        return False
+
+    def check(self, url):
+        """Raise CircuitOpenError if a request to the URL is not allowed"""
+        if not self.allow(url):
+            host, kind = self._key(url)
+            raise CircuitOpenError(f"Circuit open for {kind} pages on {host} ({self.backend})")
+
+    def record_success(self, url):
+        """Close the URL's circuit after a page loaded"""
+        key = self._key(url)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                return
+            if circuit['state'] != CLOSED:
+                self.logger.info(f"Circuit closed for {key[1]} pages on {key[0]} ({self.backend})")
+            circuit['state'] = CLOSED
+            circuit['failures'] = 0
+
+    def record_failure(self, url):
+        """Count a failed page load, opening the circuit past the threshold"""
+        key = self._key(url)
+        with self._lock:
+            circuit = self._circuits.setdefault(
+                key, {'state': CLOSED, 'failures': 0, 'opened_at': 0.0, 'rejected': 0}
+            )
+            circuit['failures'] += 1
+            if circuit['state'] == HALF_OPEN or (
+                    circuit['state'] == CLOSED and circuit['failures'] >= self.failure_threshold > 0):
+                circuit['state'] = OPEN
+                circuit['opened_at'] = time.monotonic()
+                self.logger.warning(f"Circuit open for {key[1]} pages on {key[0]} ({self.backend}) "
+                                    f"after {circuit['failures']} failures")
+                get_tracer().count('circuit_opened', host=key[0], page=key[1], backend=self.backend)
+
+    def release(self, url):
+        """Give up an allowed request without an outcome, e.g. one cut off by a deadline.
+
+        A half-open circuit goes back to open with its reset timeout already
+        elapsed, so the next request becomes the trial instead.
+        """
+        key = self._key(url)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None and circuit['state'] == HALF_OPEN:
+                circuit['state'] = OPEN
+
+    def record(self, url, ok, deadline=None):
+        """Record the outcome of a page load; None releases it without one.
+
+        A failure after the deadline has passed is released instead, since a
+        wait cut short by the caller says nothing about the page.
+        """
+        if ok is None or (not ok and is_expired(deadline)):
+            self.release(url)
+        elif ok:
+            self.record_success(url)
+        else:
+            self.record_failure(url)
+
+    def stats(self):
+        """State, consecutive failures and rejected requests per host and page type"""
+        with self._lock:
+            return {
+                f"{host} {kind}": {key: circuit[key] for key in ('state', 'failures', 'rejected')}
+                for (host, kind), circuit in self._circuits.items()
+            }
+
+    def _key(self, url):
+        return urlparse(url).netloc or url, page_type(url)
+
+
+_default_breakers = {}
+_default_lock = threading.Lock()
+
+
+def get_circuit_breaker(backend='browser'):
+    """Process-wide breaker of a fetch backend, configured by SHOPPER_BREAKER_FAILURES and SHOPPER_BREAKER_RESET"""
+    with _default_lock:
+        if backend not in _default_breakers:
+            _default_breakers[backend] = CircuitBreaker(
+                failure_threshold=int(os.getenv('SHOPPER_BREAKER_FAILURES', '5')),
+                reset_timeout=float(os.getenv('SHOPPER_BREAKER_RESET', '30')),
+                backend=backend
+            )
+        return _default_breakers[backend]
+
+
+def circuit_stats():
+    """stats() of every process-wide breaker, by backend"""
+    with _default_lock:
+        breakers = dict(_default_breakers)
+    return {backend: breaker.stats() for backend, breaker in breakers.items()}
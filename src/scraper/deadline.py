@@ -0,0 +1,78 @@
+import os
+import time
+
+
+class Deadline:
+    """Point in time by which a piece of work has to finish; None means no limit.
+
+    Waits ask ``timeout(default)`` for how long they may block, so no single
+    wait runs past the deadline.
+    """
+
+    def __init__(self, seconds=None, expires_at=None):
+        if expires_at is None and seconds:
+            expires_at = time.monotonic() + seconds
+        self.expires_at = expires_at
+
+    def remaining(self):
+        """Seconds left, or None without a limit"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        """Whether the deadline has passed"""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def timeout(self, default):
+        """A wait's timeout, shortened so it ends by the deadline"""
+        remaining = self.remaining()
+        return default if remaining is None else min(default, remaining)
+
+    def split(self, shares):
+        """Deadline of each stage from (name, share) pairs run in order.
+
+        Each stage has to finish by the end of its cumulative share of the
+        time left now. A stage that finishes early leaves its time to the
+        stages after it.
+        """
+        remaining = self.remaining()
+        total = sum(share for _, share in shares)
+        started = time.monotonic()
+        stages = {}
+        elapsed_share = 0.0
+        for name, share in shares:
+            elapsed_share += share
+            stages[name] = Deadline(expires_at=None if remaining is None
+                                    else started + remaining * elapsed_share / total)
+        return stages
+
+
+def wait_timeout(default, deadline=None):
+    """default, or less if the deadline is nearer"""
+    return deadline.timeout(default) if deadline is not None else default
+
+
+def is_expired(deadline):
+    """Whether an optional deadline has passed"""
+    return deadline is not None and deadline.expired()
+
+
+def load_page(driver, url, deadline=None):
+    """driver.get(url), giving up on the page load by the deadline.
+
+    The browser's page load timeout (SHOPPER_PAGE_LOAD_TIMEOUT) is shortened
+    for this one load and restored afterwards, so other loads on the same
+    driver keep the full timeout.
+    """
+    if deadline is None:
+        driver.get(url)
+        return
+
+    default = float(os.getenv('SHOPPER_PAGE_LOAD_TIMEOUT', '30'))
+    # WebDriver takes whole milliseconds, and 0 would mean no page load at all
+    driver.set_page_load_timeout(max(0.001, deadline.timeout(default)))
+    try:
+        driver.get(url)
+    finally:
+        driver.set_page_load_timeout(default)
@@ -0,0 +1,303 @@
+from selenium.common.exceptions import WebDriverException
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from requests.adapters import HTTPAdapter
+import requests
+import json
+import os
+import time
+import logging
+from src.scraper.rate_limiter import get_rate_limiter
+from src.scraper.circuit_breaker import get_circuit_breaker
+from src.scraper.deadline import is_expired, wait_timeout
+from src.instrumentation.tracer import traced
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Markers of pages that only work in a real browser (bot checks, JS-only shells)
+BROWSER_ONLY_MARKERS = (
+    '/errors/validateCaptcha',
+    'Type the characters you see in this image',
+    'api-services-support@amazon.com',
+)
+
+
+def needs_browser(page_source):
+    """Whether a page fetched over plain HTTP has to be loaded in the browser instead"""
+    return page_source is None or any(marker in page_source for marker in BROWSER_ONLY_MARKERS)
+
+
+class TabPoolFetcher:
+    """Load several pages at once in background tabs of a single WebDriver.
+
+    ``window.open`` returns as soon as navigation starts, so every open tab
+    loads concurrently while the driver session itself stays single-threaded.
+    Pages are yielded in completion order, not request order.
+    """
+
+    def __init__(self, driver, max_tabs=3, rate_limiter=None, page_timeout=20,
+                 poll_interval=0.1, circuit_breaker=None):
+        self.driver = driver
+        self.max_tabs = max(1, max_tabs)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
+        self.page_timeout = page_timeout
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+
+    def fetch(self, url, deadline=None):
+        """Fetch a single page and return its HTML"""
+        for _, page_source in self.fetch_many([url], deadline):
+            return page_source
+        return None
+
+    def fetch_many(self, urls, deadline=None):
+        """Yield (url, page_source) pairs as each page finishes loading.
+
+        ``urls`` is consumed lazily, one URL per free tab, so a caller can stop
+        producing URLs once it has seen the last page. ``page_source`` is None
+        for pages that did not finish within ``page_timeout`` or by the
+        deadline, and for pages whose circuit is open. No new tabs are opened
+        once the deadline has passed.
+        """
+        urls = iter(urls)
+        home = self.driver.current_window_handle
+        open_tabs = {}
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(open_tabs) < self.max_tabs:
+                    url = None if is_expired(deadline) else next(urls, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    if not self.circuit_breaker.allow(url):
+                        yield url, None
+                        continue
+                    try:
+                        open_tabs[self._open_tab(url)] = (url, time.monotonic())
+                    except Exception:
+                        self.circuit_breaker.release(url)
+                        raise
+
+                if not open_tabs:
+                    return
+
+                finished = self._collect_finished(open_tabs, home, deadline)
+                if not finished:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                for url, page_source in finished:
+                    yield url, page_source
+        finally:
+            self._close_tabs(open_tabs, home)
+
+    def _open_tab(self, url):
+        """Start loading a URL in a new background tab and return its handle"""
+        self.rate_limiter.acquire(url)
+        before = set(self.driver.window_handles)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+        new_handles = set(self.driver.window_handles) - before
+        return new_handles.pop()
+
+    def _collect_finished(self, open_tabs, home, deadline=None):
+        """Close and return the (url, page_source) of every tab that is done"""
+        finished = []
+        for handle, (url, started) in list(open_tabs.items()):
+            page_source = None
+            switched = False
+            try:
+                self.driver.switch_to.window(handle)
+                switched = True
+                # A new tab starts on about:blank, which is already 'complete' before navigation begins
+                ready = (self.driver.current_url != 'about:blank'
+                         and self.driver.execute_script("return document.readyState") == 'complete')
+                timed_out = time.monotonic() - started >= self.page_timeout
+                if not ready and not timed_out and not is_expired(deadline):
+                    continue
+                if ready:
+                    page_source = self.driver.page_source
+                    self.circuit_breaker.record_success(url)
+                elif timed_out:
+                    self.logger.error(f"Timeout loading {url}")
+                    self.circuit_breaker.record_failure(url)
+                else:
+                    # Cut off by the caller's deadline, which says nothing about the page
+                    self.logger.warning(f"Deadline reached while loading {url}")
+                    self.circuit_breaker.release(url)
+            except WebDriverException as e:
+                self.logger.error(f"Error loading {url}: {str(e)}")
+                page_source = None
+                self.circuit_breaker.record_failure(url)
+
+            if switched:
+                # Closes the tab even when reading it failed, so handles do not pile up
+                try:
+                    self.driver.close()
+                except WebDriverException:
+                    pass
+            del open_tabs[handle]
+            finished.append((url, page_source))
+
+        self.driver.switch_to.window(home)
+        return finished
+
+    def _close_tabs(self, open_tabs, home):
+        """Close any tabs still open and return to the original window"""
+        for handle, (url, _) in open_tabs.items():
+            # Abandoned before it finished, so the page gets no verdict
+            self.circuit_breaker.release(url)
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except WebDriverException:
+                pass
+        open_tabs.clear()
+        try:
+            self.driver.switch_to.window(home)
+        except WebDriverException:
+            pass
+
+
+class HttpFetcher:
+    """Fetch pages over pooled keep-alive HTTP connections without a browser.
+
+    Reuses the session cookies saved by AmazonAuthenticator, so pages are
+    fetched as the logged-in user.
+    """
+
+    def __init__(self, cookies_file='amazon_cookies.json', max_workers=4, timeout=15,
+                 rate_limiter=None, circuit_breaker=None):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Separate from the browser's breaker, which is the fallback when HTTP gets blocked
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker('http')
+        self.logger = logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        self._load_cookies(cookies_file)
+
+    @traced('http_fetch')
+    def fetch(self, url, deadline=None):
+        """Fetch a page and return its HTML, or None if it failed, needs a browser or is out of time"""
+        if is_expired(deadline) or not self.circuit_breaker.allow(url):
+            return None
+        # Every allowed request is resolved below: None leaves the outcome open
+        ok = None
+        try:
+            self.rate_limiter.acquire(url)
+            if is_expired(deadline):
+                return None
+            try:
+                response = self.session.get(url, timeout=wait_timeout(self.timeout, deadline))
+            except requests.RequestException as e:
+                self.logger.error(f"Error fetching {url}: {str(e)}")
+                if not is_expired(deadline):
+                    # A request cut short by the deadline says nothing about the page
+                    ok = False
+                return None
+
+            ok = response.status_code == 200
+            if not ok:
+                self.logger.error(f"Unexpected status {response.status_code} fetching {url}")
+                return None
+
+            page_source = response.text
+            return None if needs_browser(page_source) else page_source
+        finally:
+            self.circuit_breaker.record(url, ok)
+
+    def fetch_many(self, urls, deadline=None):
+        """Yield (url, page_source) pairs as requests complete, up to max_workers at once.
+
+        No new requests are started once the deadline has passed.
+        """
+        urls = iter(urls)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < self.max_workers:
+                    url = None if is_expired(deadline) else next(urls, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    pending[executor.submit(self.fetch, url, deadline)] = url
+
+                if not pending:
+                    return
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def _load_cookies(self, file_path):
+        """Load cookies saved from the browser session into the HTTP session"""
+        if not os.path.exists(file_path):
+            return
+        try:
+            with open(file_path, 'r') as f:
+                for cookie in json.load(f):
+                    self.session.cookies.set(
+                        cookie['name'],
+                        cookie['value'],
+                        domain=cookie.get('domain'),
+                        path=cookie.get('path', '/'),
+                        secure=cookie.get('secure', False),
+                        expires=cookie.get('expiry')
+                    )
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.error(f"Error loading cookies: {str(e)}")
+
+
+class FallbackFetcher:
+    """Try a fast fetcher first and retry failed pages with a fallback (e.g. the browser)"""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+
+    def fetch(self, url, deadline=None):
+        """Fetch a page with the primary fetcher, falling back if needed"""
+        page_source = self.primary.fetch(url, deadline)
+        if page_source is None and not is_expired(deadline):
+            page_source = self.fallback.fetch(url, deadline)
+        return page_source
+
+    def fetch_many(self, urls, deadline=None):
+        """Yield pages from the primary fetcher, then retry its failures with the fallback"""
+        failed = []
+        for url, page_source in self.primary.fetch_many(urls, deadline):
+            if page_source is None:
+                failed.append(url)
+            else:
+                yield url, page_source
+
+        if failed and not is_expired(deadline):
+            yield from self.fallback.fetch_many(failed, deadline)
+        else:
+            # Out of time: report the failures instead of dropping them
+            for url in failed:
+                yield url, None
+
+    def close(self):
+        """Close both fetchers where they hold resources"""
+        for fetcher in (self.primary, self.fallback):
+            if hasattr(fetcher, 'close'):
+                fetcher.close()
@@ -0,0 +1,178 @@
+from urllib.parse import urljoin
+from datetime import datetime
+import re
+
+from lxml import etree, html as lxml_html
+
+from src.scraper.amazon_urls import extract_asin
+
+
+def _has_class(name):
+    """XPath predicate matching a single CSS class"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Selectors are compiled once at import time so that parsing a page is a
+# single in-process pass instead of one WebDriver round-trip per field.
+_SEARCH_RESULTS = etree.XPath("//div[@data-component-type='s-search-result']")
+_RESULT_TITLE = etree.XPath(".//h2//a//span")
+_RESULT_LINK = etree.XPath(".//h2//a[@href]")
+_RESULT_PRICE = etree.XPath(f".//span[{_has_class('a-price-whole')}]")
+_RESULT_RATING = etree.XPath(f".//span[{_has_class('a-icon-alt')}]")
+_RESULT_REVIEW_COUNT = etree.XPath(
+    f".//span[{_has_class('a-size-base')} and {_has_class('s-underline-text')}]"
+)
+# Ads carry a "Sponsored" label, or the AdHolder class on the result itself
+_RESULT_SPONSORED = etree.XPath(
+    f"boolean(self::*[{_has_class('AdHolder')}]"
+    " or .//span[text()='Sponsored' or contains(@class, 'sponsored-label')])"
+)
+_NEXT_PAGE = etree.XPath(
+    f"//a[{_has_class('s-pagination-next')}] | //ul[{_has_class('a-pagination')}]//li[{_has_class('a-last')}]/a"
+)
+
+_PRODUCT_TITLE = etree.XPath("//*[@id='productTitle']")
+_PRODUCT_PRICE = etree.XPath(f"//span[{_has_class('a-price-whole')}]")
+_PRODUCT_RATING = etree.XPath(f"//span[{_has_class('a-icon-alt')}]")
+_PRODUCT_FEATURES = etree.XPath("//*[@id='feature-bullets']//ul//li//span")
+_PRODUCT_AVAILABILITY = etree.XPath("//*[@id='availability']")
+
+_REVIEWS = etree.XPath("//div[@data-hook='review']")
+_REVIEW_STARS = etree.XPath(".//i[@data-hook='review-star-rating']")
+_REVIEW_TITLE = etree.XPath(".//a[@data-hook='review-title']")
+_REVIEW_BODY = etree.XPath(".//span[@data-hook='review-body']")
+_REVIEW_DATE = etree.XPath(".//span[@data-hook='review-date']")
+_REVIEW_BADGE = etree.XPath(".//span[@data-hook='avp-badge']")
+
+_NUMBER = re.compile(r'(\d+(\.\d+)?)')
+_PRICE = re.compile(r'\d+(\.\d*)?')
+_COUNT = re.compile(r'(\d+(?:\.\d+)?)\s*([Kk])?')
+_REVIEW_DATE_TEXT = re.compile(r'([A-Z][a-z]+ \d{1,2}, \d{4})')
+
+
+def parse_html(page_source):
+    """Parse a page snapshot into an lxml document"""
+    return lxml_html.fromstring(page_source)
+
+
+def _text(element):
+    """Whitespace-normalized text of an element, like WebElement.text"""
+    return ' '.join(element.text_content().split())
+
+
+def _first_text(xpath, node, default=None):
+    """Text of the first node matched by a compiled selector"""
+    matches = xpath(node)
+    if not matches:
+        return default
+    return _text(matches[0])
+
+
+def extract_search_results(page_source, base_url=None, limit=None):
+    """Extract product listings from a search results page snapshot"""
+    return _extract_listings(parse_html(page_source), base_url, limit)
+
+
+def extract_search_page(page_source, base_url=None):
+    """Listings of a search results page and whether it links to a next page"""
+    document = parse_html(page_source)
+    return _extract_listings(document, base_url), bool(_NEXT_PAGE(document))
+
+
+def _extract_listings(document, base_url=None, limit=None):
+    """Product listings of a parsed search results page"""
+    products = []
+
+    for result in _SEARCH_RESULTS(document):
+        if limit is not None and len(products) >= limit:
+            break
+
+        titles = _RESULT_TITLE(result)
+        links = _RESULT_LINK(result)
+        if not titles or not links:
+            continue
+
+        link = links[0].get('href')
+        if base_url:
+            link = urljoin(base_url, link)
+
+        products.append({
+            'title': _text(titles[0]),
+            'price': _first_text(_RESULT_PRICE, result, "Price not found"),
+            'rating': _first_text(_RESULT_RATING, result, "No rating"),
+            'review_count': _first_text(_RESULT_REVIEW_COUNT, result, "0"),
+            'link': link,
+            'asin': result.get('data-asin') or extract_asin(link),
+            'sponsored': _RESULT_SPONSORED(result)
+        })
+
+    return products
+
+
+def extract_product_details(page_source):
+    """Extract product details from a product page snapshot"""
+    document = parse_html(page_source)
+    return {
+        'title': _first_text(_PRODUCT_TITLE, document),
+        'price': _first_text(_PRODUCT_PRICE, document),
+        'rating': _first_text(_PRODUCT_RATING, document),
+        'features': [_text(feature) for feature in _PRODUCT_FEATURES(document)],
+        'availability': _first_text(_PRODUCT_AVAILABILITY, document),
+    }
+
+
+def extract_reviews(page_source):
+    """Extract reviews from a review page snapshot"""
+    document = parse_html(page_source)
+    reviews = []
+
+    for review in _REVIEWS(document):
+        reviews.append({
+            'id': review.get('id', ''),
+            'rating': _extract_rating(review),
+            'title': _first_text(_REVIEW_TITLE, review, ""),
+            'text': _first_text(_REVIEW_BODY, review, ""),
+            'date': _first_text(_REVIEW_DATE, review, ""),
+            'verified': "Verified Purchase" in _first_text(_REVIEW_BADGE, review, "")
+        })
+
+    return reviews
+
+
+def _extract_rating(review):
+    """Extract the star rating of a single review node"""
+    rating_string = _first_text(_REVIEW_STARS, review, "")
+    match = _NUMBER.search(rating_string)
+    return float(match.group(1)) if match else 0.0
+
+
+def parse_price(price_text):
+    """Dollar amount of a listing price such as '1,299.' or '$56.99', or None"""
+    match = _PRICE.search((price_text or '').replace(',', ''))
+    return float(match.group(0).rstrip('.')) if match else None
+
+
+def parse_rating(rating_text):
+    """Star rating of a '4.6 out of 5 stars' label, or None"""
+    match = _NUMBER.search(rating_text or '')
+    return float(match.group(1)) if match else None
+
+
+def parse_count(count_text):
+    """Number in a review count label such as '12,387' or '(1.2K)', or None"""
+    match = _COUNT.search((count_text or '').replace(',', ''))
+    if not match:
+        return None
+    value = float(match.group(1))
+    return int(value * 1000 if match.group(2) else value)
+
+
+def parse_review_date(date_text):
+    """Parse 'Reviewed in the United States on January 5, 2024' into a date"""
+    match = _REVIEW_DATE_TEXT.search(date_text or '')
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), '%B %d, %Y').date()
+    except ValueError:
+        return None
@@ -1,134 +1,211 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from itertools import islice
 import logging
+from src.scraper.amazon_urls import extract_asin, search_url
+from src.scraper.html_extractor import extract_search_page, extract_product_details, parse_price, parse_rating
+from src.scraper.rate_limiter import get_rate_limiter
+from src.scraper.circuit_breaker import get_circuit_breaker
+from src.scraper.deadline import is_expired, wait_timeout, load_page
+from src.instrumentation.tracer import TimedWait, traced
+
+EXTRACTION_MODES = ('snapshot', 'webdriver')
+
+# Results pages read at most per search
+MAX_SEARCH_PAGES = 5
+
+# Seconds to wait for search listings and for the product title of a loaded page
+LISTINGS_TIMEOUT = 10
+TITLE_TIMEOUT = 5
 
 class ProductScraper:
-    def __init__(self, driver):
+    def __init__(self, driver, extraction_mode='snapshot', rate_limiter=None, fetcher=None,
+                 circuit_breaker=None):
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
         self.driver = driver
+        self.extraction_mode = extraction_mode
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
+        # Optional page fetch backend used instead of a full browser render
+        self.fetcher = fetcher
         self.logger = logging.getLogger(__name__)
 
-    def search_product(self, query):
-        """Search for a product on Amazon"""
-        try:
-            # Find and fill the search box
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "twotabsearchtextbox"))
-            )
-            search_box.clear()
-            search_box.send_keys(query)
-            
-            # Click search button
-            search_button = self.driver.find_element(By.ID, "nav-search-submit-button")
-            search_button.click()
-            
-            # Wait for results to load
-            time.sleep(2)  # Adding a small delay to be respectful to Amazon's servers
-            
-            return True
-        except Exception as e:
-            self.logger.error(f"Error searching for product: {str(e)}")
-            return False
+    def search_product(self, query, min_price=None, max_price=None, min_rating=None,
+                       max_pages=MAX_SEARCH_PAGES, deadline=None):
+        """Lazily yield matching listings, loading each results page only when the previous one runs out.
 
-    def get_top_products(self, num_products=5):
-        """Get details of top products from search results"""
-        products = []
+        The price range is pushed into the search URL and checked again on
+        every listing, along with the minimum rating. Sponsored listings and
+        ASINs already yielded are skipped. No further pages are loaded once
+        the deadline has passed.
+        """
+        seen = set()
+        for page in range(1, max_pages + 1):
+            if is_expired(deadline):
+                self.logger.warning(f"Deadline reached after {page - 1} search results pages")
+                return
+            listings, has_next = self._load_results_page(search_url(query, page, min_price, max_price), deadline)
+            new_listings = 0
+            for product in listings:
+                key = product.get('asin') or product['link']
+                if product.get('sponsored') or key in seen:
+                    continue
+                seen.add(key)
+                new_listings += 1
+                if self._matches(product, min_price, max_price, min_rating):
+                    yield product
+
+            # Stop at the last page, or when a page only repeats earlier results
+            if not has_next or not new_listings:
+                return
+
+    def get_top_products(self, query, num_products=5, **filters):
+        """Lazy iterator over the first num_products matching listings of a search"""
+        return islice(self.search_product(query, **filters), num_products)
+
+    @traced('search_page')
+    def _load_results_page(self, url, deadline=None):
+        """Listings of one search results page and whether there is a next page"""
         try:
+            if self.fetcher is not None and self.extraction_mode == 'snapshot':
+                # The fetcher has its own fallbacks; loading the page again in the driver would repeat them
+                page_source = self.fetcher.fetch(url, deadline)
+                if page_source is None:
+                    return [], False
+                return extract_search_page(page_source, base_url=url)
+
+            if is_expired(deadline) or not self.circuit_breaker.allow(url):
+                return [], False
+            self.rate_limiter.acquire(url)
+            load_page(self.driver, url, deadline)
+
             # Wait for product listings
-            product_list = WebDriverWait(self.driver, 10).until(
+            TimedWait(self.driver, wait_timeout(LISTINGS_TIMEOUT, deadline)).until(
                 EC.presence_of_all_elements_located(
                     (By.CSS_SELECTOR, "div[data-component-type='s-search-result']")
                 )
             )
+            self.circuit_breaker.record_success(url)
 
-            for product in product_list[:num_products]:
-                try:
-                    # Extract product details
-                    title = product.find_element(
-                        By.CSS_SELECTOR, "h2 a span"
-                    ).text.strip()
-                    
-                    # Get price (handle different price formats)
-                    try:
-                        price = product.find_element(
-                            By.CSS_SELECTOR, "span.a-price-whole"
-                        ).text
-                    except:
-                        price = "Price not found"
-                    
-                    # Get rating
-                    try:
-                        rating = product.find_element(
-                            By.CSS_SELECTOR, "span.a-icon-alt"
-                        ).get_attribute("innerHTML")
-                    except:
-                        rating = "No rating"
-                    
-                    # Get number of reviews
-                    try:
-                        review_count = product.find_element(
-                            By.CSS_SELECTOR, "span.a-size-base.s-underline-text"
-                        ).text
-                    except:
-                        review_count = "0"
-
-                    # Get product link
-                    link = product.find_element(
-                        By.CSS_SELECTOR, "h2 a"
-                    ).get_attribute("href")
-
-                    products.append({
-                        'title': title,
-                        'price': price,
-                        'rating': rating,
-                        'review_count': review_count,
-                        'link': link
-                    })
-
-                except Exception as e:
-                    self.logger.error(f"Error extracting product details: {str(e)}")
-                    continue
+            if self.extraction_mode == 'snapshot':
+                # One page_source round-trip instead of one per field
+                return extract_search_page(self.driver.page_source, base_url=self.driver.current_url)
 
-            return products
+            return self._extract_listings_webdriver()
 
         except TimeoutException:
-            self.logger.error("Timeout waiting for product listings")
-            return []
+            self.logger.error(f"Timeout waiting for product listings on {url}")
+            self.circuit_breaker.record(url, False, deadline)
+            return [], False
         except Exception as e:
-            self.logger.error(f"Error getting top products: {str(e)}")
-            return []
+            self.logger.error(f"Error getting search results from {url}: {str(e)}")
+            self.circuit_breaker.record(url, False, deadline)
+            return [], False
+
+    def _extract_listings_webdriver(self):
+        """Listings of the loaded results page, read element by element"""
+        products = []
+        for product in self.driver.find_elements(
+            By.CSS_SELECTOR, "div[data-component-type='s-search-result']"
+        ):
+            try:
+                # Extract product details
+                title = product.find_element(
+                    By.CSS_SELECTOR, "h2 a span"
+                ).text.strip()
+                
+                # Optional fields are probed without waiting, since the listing is already loaded
+                price = self._probe(product, "span.a-price-whole", default="Price not found")
+                rating = self._probe(product, "span.a-icon-alt", attribute="innerHTML", default="No rating")
+                review_count = self._probe(product, "span.a-size-base.s-underline-text", default="0")
+
+                # Get product link
+                link = product.find_element(
+                    By.CSS_SELECTOR, "h2 a"
+                ).get_attribute("href")
+
+                products.append({
+                    'title': title,
+                    'price': price,
+                    'rating': rating,
+                    'review_count': review_count,
+                    'link': link,
+                    'asin': product.get_attribute("data-asin") or extract_asin(link),
+                    'sponsored': bool(product.find_elements(
+                        By.XPATH, ".//*[normalize-space(text())='Sponsored']"
+                    ))
+                })
+
+            except Exception as e:
+                self.logger.error(f"Error extracting product details: {str(e)}")
+                continue
 
-    def analyze_product(self, product_url):
+        has_next = bool(self.driver.find_elements(
+            By.CSS_SELECTOR, "a.s-pagination-next, ul.a-pagination li.a-last a"
+        ))
+        return products, has_next
+
+    def _matches(self, product, min_price, max_price, min_rating):
+        """Whether a listing falls inside the price range and meets the minimum rating"""
+        if min_price or max_price:
+            price = parse_price(product['price'])
+            # Listings without a price cannot be shown to fit a budget
+            if price is None or (min_price and price < min_price) or (max_price and price > max_price):
+                return False
+        if min_rating:
+            rating = parse_rating(product['rating'])
+            if rating is None or rating < min_rating:
+                return False
+        return True
+
+    @traced('analyze_product')
+    def analyze_product(self, product_url, deadline=None):
         """Navigate to product page and analyze details"""
         try:
-            self.driver.get(product_url)
-            time.sleep(2)  # Respectful delay
+            if self.fetcher is not None and self.extraction_mode == 'snapshot':
+                page_source = self.fetcher.fetch(product_url, deadline)
+                return extract_product_details(page_source) if page_source is not None else None
+
+            if is_expired(deadline) or not self.circuit_breaker.allow(product_url):
+                return None
+            self.rate_limiter.acquire(product_url)
+            load_page(self.driver, product_url, deadline)
+
+            # Wait once for the title; a page without one is broken, not slow
+            title = self.get_element_text(By.ID, "productTitle", wait_timeout(TITLE_TIMEOUT, deadline))
+            self.circuit_breaker.record(product_url, title is not None, deadline)
+            if title is None:
+                self.logger.error(f"No product title on {product_url}")
 
-            # Get detailed product information
+            if self.extraction_mode == 'snapshot':
+                return extract_product_details(self.driver.page_source)
+
+            # The page is rendered by now, so optional fields are probed once without waiting
             product_info = {
-                'title': self.get_element_text(By.ID, "productTitle"),
-                'price': self.get_element_text(By.CSS_SELECTOR, "span.a-price-whole"),
-                'rating': self.get_element_text(By.CSS_SELECTOR, "span.a-icon-alt"),
+                'title': title,
+                'price': self._probe(self.driver, "span.a-price-whole"),
+                'rating': self._probe(self.driver, "span.a-icon-alt"),
                 'features': self.get_product_features(),
-                'availability': self.get_element_text(By.ID, "availability"),
+                'availability': self._probe(self.driver, "#availability"),
             }
 
             return product_info
 
         except Exception as e:
             self.logger.error(f"Error analyzing product: {str(e)}")
+            self.circuit_breaker.record(product_url, False, deadline)
             return None
 
-    def get_element_text(self, by, selector):
-        """Safely get element text"""
+    def get_element_text(self, by, selector, timeout=TITLE_TIMEOUT):
+        """Text of an element, waiting up to timeout seconds for it to appear, or None"""
         try:
-            element = WebDriverWait(self.driver, 5).until(
+            element = TimedWait(self.driver, timeout).until(
                 EC.presence_of_element_located((by, selector))
             )
             return element.text.strip()
-        except:
+        except (TimeoutException, WebDriverException):
             return None
 
     def get_product_features(self):
@@ -138,5 +215,16 @@ class ProductScraper:
                 By.CSS_SELECTOR, "#feature-bullets ul li span"
             )
             return [feature.text.strip() for feature in feature_list]
-        except:
+        except WebDriverException:
             return []
+
+    def _probe(self, parent, selector, attribute=None, default=None):
+        """Text or attribute of the first match of a CSS selector, looked up once without waiting"""
+        try:
+            elements = parent.find_elements(By.CSS_SELECTOR, selector)
+            if not elements:
+                return default
+            value = elements[0].get_attribute(attribute) if attribute else elements[0].text.strip()
+        except WebDriverException:
+            return default
+        return value if value is not None else default
@@ -0,0 +1,81 @@
+from urllib.parse import urlparse
+import os
+import time
+import threading
+from src.instrumentation.tracer import get_tracer
+
+
+class TokenBucket:
+    """Token bucket allowing ``burst`` requests at once and ``rate`` per second after that"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take tokens and return how many seconds to wait before using them.
+
+        The balance may go negative, which queues callers in arrival order
+        without polling.
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+
+class RateLimiter:
+    """Per-host request scheduler enforcing an explicit politeness rate"""
+
+    def __init__(self, rate=1.0, burst=5):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._waited = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        """Block until a request to the URL's host is allowed"""
+        host = urlparse(url).netloc or url
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+
+        wait = bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+        with self._lock:
+            self._waited[host] = self._waited.get(host, 0.0) + wait
+        get_tracer().count('rate_limit_wait_seconds', wait, host=host)
+        return wait
+
+    def stats(self):
+        """Total seconds spent waiting for each host"""
+        with self._lock:
+            return dict(self._waited)
+
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide limiter configured by SHOPPER_REQUEST_RATE and SHOPPER_REQUEST_BURST"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter(
+                rate=float(os.getenv('SHOPPER_REQUEST_RATE', '1.0')),
+                burst=int(os.getenv('SHOPPER_REQUEST_BURST', '5'))
+            )
+        return _default_limiter
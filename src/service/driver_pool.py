@@ -0,0 +1,187 @@
+from selenium.common.exceptions import WebDriverException
+from contextlib import contextmanager
+import queue
+import threading
+import logging
+from src.auth.amazon_auth import AmazonAuthenticator
+
+
+class _EmptySlot:
+    """Stands in for a driver whose replacement failed, so its slot is retried later"""
+
+    driver = None
+
+    def __init__(self, session=None):
+        self.session = session
+
+    def close(self):
+        pass
+
+
+class DriverPool:
+    """Pool of initialized, logged-in WebDrivers that are handed out per query"""
+
+    def __init__(self, size=2, authenticator_factory=AmazonAuthenticator,
+                 health_check_interval=60, session_prefix='worker'):
+        self.size = size
+        self.authenticator_factory = authenticator_factory
+        # Each driver keeps its own saved session, e.g. 'worker-1'; None shares the default one
+        self.session_prefix = session_prefix
+        self.health_check_interval = health_check_interval
+        self.logger = logging.getLogger(__name__)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._all = []
+        self._replaced = 0
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    def start(self):
+        """Start and log in every driver, then begin background health checks"""
+        for slot in range(self.size):
+            self._idle.put(self._create(self._session_name(slot)))
+
+        if self.health_check_interval:
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self._health_thread.start()
+
+        self.logger.info(f"Driver pool started with {self.size} drivers")
+
+    def acquire(self, timeout=None):
+        """Take a healthy authenticator out of the pool"""
+        try:
+            auth = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No driver available in the pool")
+
+        if not self.is_healthy(auth):
+            auth = self._replace(auth)
+            if auth.driver is None:
+                # Keep the slot so the next acquire or health check tries again
+                self._idle.put(auth)
+                raise Exception("Failed to replace an unhealthy driver")
+        return auth
+
+    def release(self, auth, healthy=True):
+        """Return an authenticator to the pool, replacing it if it is broken"""
+        if not healthy:
+            auth = self._replace(auth)
+        self._idle.put(auth)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager that lends out a logged-in driver"""
+        auth = self.acquire(timeout)
+        healthy = True
+        try:
+            yield auth.driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self.release(auth, healthy)
+
+    def is_healthy(self, auth):
+        """Check that the browser session still responds"""
+        if auth.driver is None:
+            return False
+        try:
+            auth.driver.execute_script("return document.readyState")
+            return bool(auth.driver.window_handles)
+        except WebDriverException:
+            return False
+
+    def health_check(self):
+        """Check every idle driver and replace the ones that stopped responding"""
+        checked = []
+        try:
+            while True:
+                try:
+                    auth = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                checked.append(auth)
+                if not self.is_healthy(auth):
+                    checked[-1] = self._replace(auth)
+        finally:
+            for auth in checked:
+                self._idle.put(auth)
+
+    def stats(self):
+        """Pool size and usage counters"""
+        idle = self._idle.qsize()
+        with self._lock:
+            total = len(self._all)
+            empty = sum(1 for auth in self._all if auth.driver is None)
+        return {
+            'size': self.size,
+            'idle': idle,
+            'in_use': total - idle,
+            'empty': empty,
+            'replaced': self._replaced,
+        }
+
+    def close(self):
+        """Stop health checks and quit every driver"""
+        self._stop.set()
+        if self._health_thread:
+            self._health_thread.join()
+
+        with self._lock:
+            for auth in self._all:
+                auth.close()
+            self._all = []
+
+    def _session_name(self, slot):
+        """Saved session used by the driver in a pool slot"""
+        return f"{self.session_prefix}-{slot + 1}" if self.session_prefix else None
+
+    def _create(self, session=None):
+        """Start a new browser and log it in"""
+        auth = self.authenticator_factory(session=session) if session else self.authenticator_factory()
+        try:
+            auth.initialize_driver()
+            if not auth.login(interactive=False):
+                raise Exception("Failed to login to Amazon")
+        except Exception:
+            auth.close()
+            raise
+
+        with self._lock:
+            self._all.append(auth)
+        return auth
+
+    def _replace(self, auth):
+        """Quit a broken driver and start a fresh one in its place.
+
+        Never raises: if the new driver cannot start or log in, an empty slot
+        takes its place and is retried on the next acquire or health check.
+        """
+        self.logger.warning("Replacing unhealthy driver")
+        with self._lock:
+            if auth in self._all:
+                self._all.remove(auth)
+            if auth.driver is not None:
+                self._replaced += 1
+        try:
+            auth.close()
+        except WebDriverException:
+            pass
+        # The replacement picks up the session the broken driver left behind
+        session = getattr(auth, 'session', None) if self.session_prefix else None
+        try:
+            return self._create(session)
+        except Exception as e:
+            self.logger.error(f"Failed to replace driver: {str(e)}")
+            slot = _EmptySlot(session)
+            with self._lock:
+                self._all.append(slot)
+            return slot
+
+    def _health_loop(self):
+        """Periodically health-check idle drivers"""
+        while not self._stop.wait(self.health_check_interval):
+            try:
+                self.health_check()
+            except Exception as e:
+                self.logger.error(f"Driver health check failed: {str(e)}")
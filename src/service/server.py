@@ -0,0 +1,178 @@
+"""Long-running shopper service backed by a warm pool of logged-in drivers.
+
+Run from the project root:
+    python -m src.service.server --port 8765 --pool-size 2
+
+Then query it over HTTP:
+    curl -X POST localhost:8765/query -d '{"query": "wireless headphones", "budget": 200}'
+
+Add "stream": true to receive the recommendation as chunked plain text while
+it is generated:
+    curl -N -X POST localhost:8765/query -d '{"query": "wireless headphones", "stream": true}'
+
+Timings and WebDriver, wait and LLM token counters are served as Prometheus
+text on GET /metrics and as a Chrome-format JSON trace on GET /trace.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import time
+import logging
+from src.main import AmazonAIShopperBot
+from src.service.driver_pool import DriverPool
+from src.scraper.circuit_breaker import circuit_stats
+from src.instrumentation.tracer import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class ShopperService:
+    """Runs shopping queries on drivers borrowed from a DriverPool"""
+
+    def __init__(self, pool, acquire_timeout=300, shared_products=None):
+        self.pool = pool
+        self.acquire_timeout = acquire_timeout
+        # Products loaded by one query are reused by the others (batch runs)
+        self.shared_products = shared_products
+
+    def run_query(self, query, budget=None, on_text=None):
+        """Search, analyze and recommend using a pooled driver, streaming to on_text if given"""
+        started = time.monotonic()
+        with self.pool.driver(timeout=self.acquire_timeout) as driver:
+            bot = AmazonAIShopperBot()
+            bot.shared_products = self.shared_products
+            bot.attach_driver(driver)
+            try:
+                recommendation = bot.search_and_analyze(query, budget, on_text=on_text)
+            finally:
+                bot.release()
+
+        return {
+            'query': query,
+            'budget': budget,
+            'recommendation': recommendation,
+            # The query ran out of time and answered from the products analyzed so far
+            'partial': bot.partial,
+            'elapsed': round(time.monotonic() - started, 3),
+        }
+
+
+class ShopperRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API: POST /query, GET /health, GET /metrics and GET /trace"""
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'pool': self.server.service.pool.stats(),
+                                  'circuits': circuit_stats()})
+        elif self.path == '/metrics':
+            self._send_text(200, get_tracer().to_prometheus(), 'text/plain; version=0.0.4')
+        elif self.path == '/trace':
+            self._send_json(200, get_tracer().to_trace())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/query':
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            query = payload['query']
+            budget = float(payload['budget']) if payload.get('budget') else None
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': f"invalid request: {str(e)}"})
+            return
+
+        if payload.get('stream'):
+            self._stream_query(query, budget)
+            return
+
+        try:
+            result = self.server.service.run_query(query, budget)
+        except TimeoutError as e:
+            self._send_json(503, {'error': str(e)})
+            return
+        except Exception as e:
+            logger.error(f"Error handling query: {str(e)}")
+            self._send_json(500, {'error': str(e)})
+            return
+
+        self._send_json(200, result)
+
+    def _stream_query(self, query, budget):
+        """Answer with the recommendation as chunked plain text while it is generated"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def send_chunk(text):
+            data = text.encode('utf-8')
+            self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            # A disconnected client raises inside send_chunk, which cancels the LLM stream
+            result = self.server.service.run_query(query, budget, on_text=send_chunk)
+            if not result['recommendation']:
+                send_chunk("Sorry, couldn't find a suitable recommendation.")
+        except Exception as e:
+            logger.error(f"Error handling streamed query: {str(e)}")
+        finally:
+            try:
+                self.wfile.write(b"0\r\n\r\n")
+            except OSError:
+                pass
+            self.close_connection = True
+
+    def _send_json(self, status, body):
+        self._send_text(status, json.dumps(body), 'application/json')
+
+    def _send_text(self, status, text, content_type):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.info(format % args)
+
+
+def create_server(service, host='127.0.0.1', port=8765):
+    """Build an HTTP server bound to a ShopperService"""
+    server = ThreadingHTTPServer((host, port), ShopperRequestHandler)
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Amazon AI Shopper service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pool-size', type=int, default=2, help="number of warm drivers")
+    parser.add_argument('--health-check-interval', type=int, default=60,
+                        help="seconds between idle driver health checks")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    pool = DriverPool(size=args.pool_size, health_check_interval=args.health_check_interval)
+    pool.start()
+    server = create_server(ShopperService(pool), args.host, args.port)
+    logger.info(f"Shopper service listening on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
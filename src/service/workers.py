@@ -0,0 +1,352 @@
+"""Crawl products with several worker processes that share a durable job queue.
+
+Run from the project root:
+    python -m src.service.workers jobs.jsonl --workers 4
+
+Each line of jobs.jsonl is a batch job such as {"query": "55 inch tv", "budget": 500}.
+Every query becomes a search job, and each listing it finds queues a details
+and a reviews job for its ASIN. Each worker process runs its own logged-in
+browser and writes what it fetches to the product cache, where later queries
+from the batch runner, the service or the CLI find it. The queue is kept in
+SQLite, so running the command again picks up where it stopped, and jobs
+held by a worker that died are run again once their lease expires.
+"""
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+import logging
+from dotenv import load_dotenv
+from src.auth.amazon_auth import AmazonAuthenticator
+from src.auth.session_store import SessionStore
+from src.batch import read_jobs
+from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.scraper.amazon_urls import extract_asin
+from src.scraper.fetchers import TabPoolFetcher, HttpFetcher, FallbackFetcher
+from src.scraper.product_scraper import ProductScraper
+from src.scraper.rate_limiter import RateLimiter
+from src.storage.job_queue import JobQueue
+from src.storage.llm_cache import normalize_query
+from src.storage.product_cache import ProductCache, DETAILS, REVIEWS
+
+logger = logging.getLogger(__name__)
+
+SEARCH = 'search'
+JOB_KINDS = (SEARCH, DETAILS, REVIEWS)
+
+
+def enqueue_search(queue, query, budget=None, num_products=5, num_reviews=20):
+    """Queue a search whose listings are crawled in turn; returns whether it was queued"""
+    subject = f"{normalize_query(query)}|{budget or ''}"
+    return queue.put(SEARCH, subject, {
+        'query': query, 'budget': budget, 'num_products': num_products, 'num_reviews': num_reviews
+    })
+
+
+def enqueue_product(queue, link, num_reviews=20):
+    """Queue the details and reviews of a product, once per ASIN; returns how many jobs were queued"""
+    asin = extract_asin(link)
+    if not asin:
+        logger.error(f"Could not find ASIN in product URL: {link}")
+        return 0
+    queued = queue.put(DETAILS, asin, {'link': link})
+    queued += queue.put(REVIEWS, asin, {'link': link, 'num_reviews': num_reviews})
+    return queued
+
+
+class CrawlWorker:
+    """Runs queued jobs on one logged-in browser and stores the results in the product cache.
+
+    The request budget of SHOPPER_REQUEST_RATE and SHOPPER_REQUEST_BURST is
+    split evenly between ``worker_count`` workers, so adding processes does
+    not raise the request rate against the site.
+    """
+
+    def __init__(self, name, queue, cache, worker_count=1, authenticator_factory=AmazonAuthenticator,
+                 fetch_backend=None, poll_interval=1.0, exit_when_drained=True, stop_event=None):
+        self.name = name
+        # Unique per process, so a restarted worker never completes its predecessor's leases
+        self.owner = f"{name}/{os.getpid()}"
+        self.queue = queue
+        self.cache = cache
+        self.authenticator_factory = authenticator_factory
+        self.fetch_backend = fetch_backend or os.getenv('SHOPPER_FETCH_BACKEND', 'browser')
+        self.poll_interval = poll_interval
+        self.exit_when_drained = exit_when_drained
+        self.stop_event = stop_event or threading.Event()
+        self.rate_limiter = RateLimiter(
+            rate=float(os.getenv('SHOPPER_REQUEST_RATE', '1.0')) / worker_count,
+            burst=max(1, int(os.getenv('SHOPPER_REQUEST_BURST', '5')) // worker_count)
+        )
+        self.logger = logging.getLogger(__name__)
+        self.auth = None
+        self.fetcher = None
+        self.scraper = None
+        self.analyzer = None
+        self.completed = 0
+        self.failed = 0
+
+    def run(self):
+        """Lease and run jobs until the queue is drained (or forever), then quit the browser"""
+        try:
+            self._start_browser()
+            while not self.stop_event.is_set():
+                jobs = self.queue.lease(self.owner)
+                if not jobs:
+                    if self.exit_when_drained and self.queue.is_drained():
+                        break
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+                for job in jobs:
+                    self.run_job(job)
+        finally:
+            self._stop_browser()
+        self.logger.info(f"{self.name} finished: {self.completed} jobs done, {self.failed} failed")
+
+    def run_job(self, job):
+        """Run one leased job, completing it on success and failing it for a retry on error"""
+        started = time.monotonic()
+        try:
+            with self._renewing(job):
+                handler = getattr(self, f"_run_{job['kind']}")
+                handler(job['subject'], job['payload'])
+        except Exception as e:
+            self.logger.error(f"{self.name}: {job['kind']} job {job['subject']} failed "
+                              f"(attempt {job['attempts']}): {str(e)}")
+            self.queue.fail(job, self.owner, e)
+            self.failed += 1
+            if isinstance(e, WebDriverException) or not self._browser_healthy():
+                self._restart_browser()
+            return False
+
+        self.queue.complete(job, self.owner)
+        self.completed += 1
+        self.logger.info(f"{self.name}: {job['kind']} job {job['subject']} done "
+                         f"in {time.monotonic() - started:.1f}s")
+        return True
+
+    def _run_search(self, subject, payload):
+        """Queue the details and reviews of every listing a search finds"""
+        listings = list(self.scraper.get_top_products(
+            payload['query'], num_products=payload.get('num_products', 5), max_price=payload.get('budget')
+        ))
+        if not listings:
+            raise ValueError("No listings found")
+        for product in listings:
+            enqueue_product(self.queue, product['link'], payload.get('num_reviews', 20))
+
+    def _run_details(self, asin, payload):
+        """Fetch a product page into the cache unless fresh details are already there"""
+        if self.cache.get_details(asin) is not None:
+            return
+        details = self.scraper.analyze_product(payload['link'])
+        if not details:
+            raise ValueError("No product details extracted")
+        self.cache.put_details(asin, details)
+
+    def _run_reviews(self, asin, payload):
+        """Fetch a product's review pages into the cache unless enough reviews are already there"""
+        num_reviews = payload.get('num_reviews', 20)
+        if self.cache.get_reviews(asin, num_reviews) is not None:
+            return
+        reviews = self.analyzer.get_reviews(payload['link'], num_reviews=num_reviews)
+        if not reviews:
+            # get_reviews returns [] on errors and blocked pages; retry instead of caching nothing
+            raise ValueError("No reviews extracted")
+        self.cache.put_reviews(asin, reviews, num_reviews)
+
+    @contextmanager
+    def _renewing(self, job):
+        """Renew a job's lease in the background while it runs"""
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(self.queue.lease_seconds / 3):
+                if not self.queue.renew(job, self.owner):
+                    self.logger.warning(f"{self.name} lost the lease on {job['kind']} job {job['subject']}")
+                    return
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def _start_browser(self):
+        """Start this worker's browser under its own saved session and log it in"""
+        self.auth = self.authenticator_factory(session=self.name)
+        self.auth.initialize_driver()
+        if not self.auth.login(interactive=False):
+            raise Exception("Failed to login to Amazon")
+
+        driver = self.auth.driver
+        if self.fetch_backend == 'http':
+            self.fetcher = FallbackFetcher(
+                HttpFetcher(SessionStore().file_for(self.name), rate_limiter=self.rate_limiter),
+                TabPoolFetcher(driver, max_tabs=1, rate_limiter=self.rate_limiter)
+            )
+        self.scraper = ProductScraper(driver, rate_limiter=self.rate_limiter, fetcher=self.fetcher)
+        self.analyzer = ReviewAnalyzer(driver, concurrency=1, rate_limiter=self.rate_limiter,
+                                       fetcher=self.fetcher)
+
+    def _stop_browser(self):
+        """Close the fetcher and quit the browser"""
+        if self.fetcher:
+            self.fetcher.close()
+            self.fetcher = None
+        if self.auth:
+            self.auth.close()
+            self.auth = None
+
+    def _restart_browser(self):
+        """Replace a browser that stopped responding"""
+        self.logger.warning(f"{self.name} is restarting its browser")
+        try:
+            self._stop_browser()
+        except WebDriverException:
+            pass
+        self._start_browser()
+
+    def _browser_healthy(self):
+        """Whether the browser session still responds.
+
+        Every worker has a browser, even with the HTTP backend whose pages
+        fall back to it, so a missing driver counts as unhealthy.
+        """
+        if self.auth is None or self.auth.driver is None:
+            return False
+        try:
+            self.auth.driver.execute_script("return document.readyState")
+            return True
+        except WebDriverException:
+            return False
+
+
+def run_worker(name, queue_path, cache_path, worker_count, authenticator_factory=AmazonAuthenticator,
+               lease_seconds=120, max_attempts=3, exit_when_drained=True):
+    """Entry point of a worker process"""
+    load_dotenv('config/config.env')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    queue = JobQueue(queue_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    # Workers only check whether an entry is there, so their reads do not refresh its LRU position
+    cache = ProductCache(cache_path, track_access=False)
+    try:
+        CrawlWorker(name, queue, cache, worker_count, authenticator_factory,
+                    exit_when_drained=exit_when_drained).run()
+    finally:
+        cache.close()
+        queue.close()
+
+
+class WorkerPool:
+    """Starts worker processes, restarts any that die, and waits for the queue to drain"""
+
+    def __init__(self, size, queue_path='shopper_jobs.db', cache_path='shopper_cache.db',
+                 authenticator_factory=AmazonAuthenticator, lease_seconds=120, max_attempts=3,
+                 exit_when_drained=True, max_restarts=10):
+        self.size = size
+        self.queue_path = queue_path
+        self.cache_path = cache_path
+        self.authenticator_factory = authenticator_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.exit_when_drained = exit_when_drained
+        self.max_restarts = max_restarts
+        self.logger = logging.getLogger(__name__)
+        # Spawned rather than forked: each process opens its own browser and SQLite connections
+        self._context = multiprocessing.get_context('spawn')
+        self._processes = {}
+        self.restarts = 0
+
+    def start(self):
+        """Start one process per worker"""
+        for slot in range(self.size):
+            self._spawn(f"worker-{slot + 1}")
+
+    def wait(self, poll_interval=1.0):
+        """Block until every worker has finished, restarting the ones that crash"""
+        while self._processes:
+            time.sleep(poll_interval)
+            for name, process in list(self._processes.items()):
+                if process.is_alive():
+                    continue
+                del self._processes[name]
+                if process.exitcode == 0:
+                    continue
+                self.logger.warning(f"{name} exited with status {process.exitcode}")
+                if self.restarts < self.max_restarts:
+                    # Its leased jobs return to the queue when their leases expire
+                    self.restarts += 1
+                    self._spawn(name)
+
+    def stop(self, timeout=10):
+        """Terminate every worker; their leased jobs are reclaimed on the next run"""
+        for process in self._processes.values():
+            process.terminate()
+        for process in self._processes.values():
+            process.join(timeout)
+        self._processes = {}
+
+    def _spawn(self, name):
+        """Start a worker process"""
+        process = self._context.Process(
+            target=run_worker, name=name,
+            args=(name, self.queue_path, self.cache_path, self.size, self.authenticator_factory,
+                  self.lease_seconds, self.max_attempts, self.exit_when_drained)
+        )
+        process.start()
+        self._processes[name] = process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('jobs', nargs='?', help="JSONL file of {query, budget} jobs to queue; "
+                                                "omit it to work through the queue as it is")
+    parser.add_argument('--workers', type=int, default=2, help="worker processes, one browser each")
+    parser.add_argument('--queue', default=None, help="job queue database (SHOPPER_JOB_QUEUE)")
+    parser.add_argument('--products', type=int, default=5, help="listings crawled per search")
+    parser.add_argument('--reviews', type=int, default=20, help="reviews fetched per product")
+    parser.add_argument('--lease', type=int, default=120, help="seconds a worker holds a job before it is reclaimed")
+    parser.add_argument('--max-attempts', type=int, default=3, help="tries before a job is given up on")
+    parser.add_argument('--keep-running', action='store_true', help="wait for new jobs instead of exiting when drained")
+    args = parser.parse_args()
+
+    load_dotenv('config/config.env')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    queue_path = args.queue or os.getenv('SHOPPER_JOB_QUEUE', 'shopper_jobs.db')
+    cache_path = os.getenv('SHOPPER_CACHE_PATH', 'shopper_cache.db')
+    if not cache_path:
+        parser.error("workers store their results in the product cache; set SHOPPER_CACHE_PATH")
+
+    queue = JobQueue(queue_path, lease_seconds=args.lease, max_attempts=args.max_attempts)
+    if args.jobs:
+        jobs = read_jobs(args.jobs)
+        queued = sum(enqueue_search(queue, job['query'], job.get('budget'), args.products, args.reviews)
+                     for job in jobs)
+        logger.info(f"Queued {queued} of {len(jobs)} searches, the rest are queued or done already")
+    logger.info(f"Queue: {queue.counts()}")
+
+    pool = WorkerPool(args.workers, queue_path, cache_path, lease_seconds=args.lease,
+                      max_attempts=args.max_attempts, exit_when_drained=not args.keep_running)
+    try:
+        pool.start()
+        pool.wait()
+    except KeyboardInterrupt:
+        logger.info("Workers interrupted; run the same command again to resume")
+    finally:
+        pool.stop()
+
+    logger.info(f"Queue: {queue.counts()}, {pool.restarts} worker restarts")
+    for kind, subject, error in queue.failures():
+        logger.warning(f"Gave up on {kind} job {subject}: {error}")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
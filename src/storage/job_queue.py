@@ -0,0 +1,198 @@
+import json
+import sqlite3
+import threading
+import time
+import logging
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+STATUSES = (PENDING, LEASED, DONE, FAILED)
+
+
+class JobQueue:
+    """Durable job queue in SQLite, shared by worker processes on one machine.
+
+    Jobs are keyed by (kind, subject), e.g. ('details', ASIN), so a product
+    queued twice is fetched once. A worker leases jobs for ``lease_seconds``
+    and must complete, fail or renew them before the lease runs out. Jobs of
+    a worker that died are handed to the next worker once their lease has
+    expired. Failed jobs are retried with exponential backoff until they have
+    been tried ``max_attempts`` times.
+    """
+
+    def __init__(self, path='shopper_jobs.db', lease_seconds=120, max_attempts=3, retry_delay=5,
+                 done_ttl=3600):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        # Finished jobs queued again after this many seconds run again
+        self.done_ttl = done_ttl
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stats = {'leases': 0, 'failures': 0, 'reclaimed': 0}
+
+        # Autocommit mode, so leases can take the write lock with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                kind TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                lease_expires REAL,
+                available_at REAL NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, subject)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)")
+
+    def put(self, kind, subject, payload=None):
+        """Queue a job unless the same one is queued, running or recently done; returns whether it was queued"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO jobs (kind, subject, payload, status, attempts, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 0, ?, ?, ?)
+                ON CONFLICT (kind, subject) DO UPDATE SET
+                    payload = excluded.payload, status = excluded.status, attempts = 0, owner = NULL,
+                    lease_expires = NULL, available_at = excluded.available_at, error = NULL,
+                    updated_at = excluded.updated_at
+                WHERE status = ? OR (status = ? AND updated_at < ?)
+                """,
+                (kind, subject, json.dumps(payload or {}), PENDING, now, now, now,
+                 FAILED, DONE, now - self.done_ttl)
+            )
+            return cursor.rowcount > 0
+
+    def lease(self, owner, limit=1):
+        """Take up to limit ready jobs for a worker, oldest first.
+
+        Expired leases are reclaimed first, so jobs of a dead worker run
+        again. Returns a list of job dicts with kind, subject, payload and
+        attempts.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._reclaim(now)
+                rows = self._conn.execute(
+                    """
+                    SELECT kind, subject, payload, attempts FROM jobs
+                    WHERE status = ? AND available_at <= ?
+                    ORDER BY available_at, created_at LIMIT ?
+                    """,
+                    (PENDING, now, limit)
+                ).fetchall()
+                for kind, subject, _, _ in rows:
+                    self._conn.execute(
+                        """
+                        UPDATE jobs SET status = ?, owner = ?, lease_expires = ?, attempts = attempts + 1,
+                            updated_at = ?
+                        WHERE kind = ? AND subject = ?
+                        """,
+                        (LEASED, owner, now + self.lease_seconds, now, kind, subject)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._stats['leases'] += len(rows)
+
+        return [
+            {'kind': kind, 'subject': subject, 'payload': json.loads(payload), 'attempts': attempts + 1}
+            for kind, subject, payload, attempts in rows
+        ]
+
+    def renew(self, job, owner):
+        """Extend a job's lease; returns False if the worker no longer holds it"""
+        return self._update_leased(job, owner, "lease_expires = ?", (time.time() + self.lease_seconds,))
+
+    def complete(self, job, owner):
+        """Mark a leased job done; returns False if the worker no longer holds it"""
+        return self._update_leased(job, owner, "status = ?, owner = NULL, lease_expires = NULL, error = NULL",
+                                   (DONE,))
+
+    def fail(self, job, owner, error):
+        """Release a job after an error, to be retried later or given up on after max_attempts"""
+        # Attempts are read from the row, which counts leases this job dict never saw
+        released = self._update_leased(
+            job, owner,
+            "status = CASE WHEN attempts >= ? THEN ? ELSE ? END, owner = NULL, lease_expires = NULL, "
+            "available_at = ? + ? * (1 << (attempts - 1)), error = ?",
+            (self.max_attempts, FAILED, PENDING, time.time(), self.retry_delay, str(error)[:500])
+        )
+        if released:
+            with self._lock:
+                self._stats['failures'] += 1
+        return released
+
+    def counts(self):
+        """Number of jobs in each status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def is_drained(self):
+        """Whether no job is waiting or running"""
+        counts = self.counts()
+        return not counts[PENDING] and not counts[LEASED]
+
+    def failures(self):
+        """(kind, subject, error) of every job that was given up on"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT kind, subject, error FROM jobs WHERE status = ? ORDER BY updated_at", (FAILED,)
+            ).fetchall()
+
+    def stats(self):
+        """Lease counters of this connection plus the job counts"""
+        with self._lock:
+            stats = dict(self._stats)
+        return dict(stats, **self.counts())
+
+    def clear(self):
+        """Remove every job"""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _reclaim(self, now):
+        """Return jobs with expired leases to the queue, or give up on them after max_attempts"""
+        cursor = self._conn.execute(
+            """
+            UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                owner = NULL, lease_expires = NULL, available_at = ?, error = 'lease expired', updated_at = ?
+            WHERE status = ? AND lease_expires <= ?
+            """,
+            (self.max_attempts, FAILED, PENDING, now, now, LEASED, now)
+        )
+        if cursor.rowcount:
+            self.logger.warning(f"Reclaimed {cursor.rowcount} jobs with expired leases")
+            self._stats['reclaimed'] += cursor.rowcount
+
+    def _update_leased(self, job, owner, assignments, values):
+        """Update a job only while the given worker still holds its lease"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? "
+                "WHERE kind = ? AND subject = ? AND status = ? AND owner = ?",
+                (*values, time.time(), job['kind'], job['subject'], LEASED, owner)
+            )
+        return cursor.rowcount > 0
@@ -0,0 +1,55 @@
+import hashlib
+import json
+import re
+from src.storage.sqlite_cache import SQLiteCache
+
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def normalize_query(query):
+    """Lowercase a query and collapse punctuation and whitespace"""
+    return ' '.join(_NON_WORD.sub(' ', query.lower()).split())
+
+
+def request_key(query, records, params):
+    """Content hash of a recommendation request.
+
+    Built from the normalized query, the compact product records and the
+    model and sampling parameters, so requests that would produce the same
+    prompt for the same model share a key.
+    """
+    content = json.dumps(
+        {'query': normalize_query(query), 'products': records, 'params': params},
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class LLMCache(SQLiteCache):
+    """On-disk cache of LLM replies keyed by request content hash.
+
+    Replies expire after ``ttl`` seconds, and the least recently used ones
+    are evicted once the cache grows past ``max_bytes``. Replies live in their
+    own table, so they can share a database file with the product cache.
+    """
+
+    def __init__(self, path='shopper_cache.db', ttl=24 * 3600, max_bytes=10 * 1024 * 1024, timeout=30):
+        super().__init__(path, 'llm_responses', ('key',), 'response', max_bytes,
+                         json_values=False, timeout=timeout)
+        self.ttl = ttl
+
+    def get_response(self, query, records, params):
+        """Cached reply for a recommendation request, or None"""
+        return self.get(request_key(query, records, params))
+
+    def put_response(self, query, records, params, response):
+        """Store the reply to a recommendation request"""
+        self.put(request_key(query, records, params), response)
+
+    def get(self, key):
+        """Fresh cached reply for a key, or None on a miss"""
+        return self._get((key,), self.ttl)
+
+    def put(self, key, response):
+        """Store a reply and evict old ones if the cache is over size"""
+        self._put((key,), response)
@@ -0,0 +1,48 @@
+from src.storage.sqlite_cache import SQLiteCache
+
+DETAILS = 'details'
+REVIEWS = 'reviews'
+REVIEW_STATE = 'review_state'
+
+
+class ProductCache(SQLiteCache):
+    """On-disk, ASIN-keyed cache of product details and reviews.
+
+    Details (price, availability) and reviews expire separately, and the
+    least recently used entries are evicted once the cache grows past
+    ``max_bytes``. Review state is never evicted and does not count toward
+    ``max_bytes``, since losing it resets a product's running aggregates.
+    """
+
+    def __init__(self, path='shopper_cache.db', details_ttl=3600, reviews_ttl=7 * 24 * 3600,
+                 max_bytes=50 * 1024 * 1024, track_access=True, timeout=30):
+        super().__init__(path, 'entries', ('kind', 'asin'), 'payload', max_bytes,
+                         track_access=track_access, pinned=('kind', REVIEW_STATE), timeout=timeout)
+        # Review state holds running aggregates and is neither expired nor evicted
+        self.ttls = {DETAILS: details_ttl, REVIEWS: reviews_ttl, REVIEW_STATE: None}
+
+    def get_details(self, asin):
+        """Cached analyze_product output, or None"""
+        return self._get((DETAILS, asin), self.ttls[DETAILS])
+
+    def put_details(self, asin, details):
+        """Store analyze_product output"""
+        self._put((DETAILS, asin), details)
+
+    def get_reviews(self, asin, num_reviews):
+        """Cached reviews if at least num_reviews were requested when they were stored"""
+        entry = self._get((REVIEWS, asin), self.ttls[REVIEWS],
+                          accept=lambda entry: entry['requested'] >= num_reviews)
+        return None if entry is None else entry['reviews'][:num_reviews]
+
+    def put_reviews(self, asin, reviews, num_reviews):
+        """Store the raw reviews fetched for a request of num_reviews"""
+        self._put((REVIEWS, asin), {'requested': num_reviews, 'reviews': reviews})
+
+    def get_review_state(self, asin):
+        """Saved ReviewState.to_dict() for incremental refreshes, or None"""
+        return self._get((REVIEW_STATE, asin), None)
+
+    def put_review_state(self, asin, state):
+        """Save ReviewState.to_dict() output"""
+        self._put((REVIEW_STATE, asin), state)
@@ -0,0 +1,338 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import threading
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in one process are still serialized by the thread lock
+    fcntl = None
+
+import numpy as np
+
+from src.analyzer.batch_analysis import (
+    ReviewColumns, SENTIMENT_CODES, analyze_review_columns, _parse_dates
+)
+
+# Fixed-width columns, one file each, one row per review
+COLUMNS = {
+    'key': np.uint64,          # hash of the review id, for de-duplication
+    'product': np.uint32,      # index into products.jsonl
+    'rating': np.float32,
+    'date': 'datetime64[D]',   # NaT when the review date could not be parsed
+    'verified': np.bool_,
+    'sentiment': np.int8,      # SENTIMENT_CODES, -1 when not classified
+    'text_end': np.uint64,     # end offset of the review text in text.bin
+}
+NO_SENTIMENT = -1
+
+
+class ReviewStore:
+    """Append-only, memory-mapped columnar store of reviews across products.
+
+    Each column is a flat binary file of fixed-width values, and review texts
+    are concatenated in text.bin and located through the ``text_end`` column.
+    Reads map the files into NumPy arrays without copying, so per-product and
+    per-category statistics never turn reviews into Python objects.
+
+    ``meta.json`` holds the number of committed rows. Writers append to every
+    column, fsync, then commit the new count, and bytes past the committed
+    count left by a crash are truncated away by the next writer.
+
+    Several processes can share a directory. Appends hold an exclusive lock
+    on the ``lock`` file and first catch up on rows and products committed
+    by other writers. Within a process, use ``get_review_store`` so every
+    caller shares one instance.
+    """
+
+    def __init__(self, directory='review_store'):
+        self.directory = directory
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        self._count = 0
+        self._text_bytes = 0
+        self._products = {}
+        self._asins = []
+        self._categories = []
+        self._products_offset = 0
+        self._keys = None
+        self._views = None
+        with self._lock, self._file_lock():
+            self._refresh()
+            self._truncate_uncommitted()
+
+    def append(self, asin, reviews, category=None, sentiment=None):
+        """Add reviews of a product, skipping ones already stored; returns how many were added.
+
+        ``sentiment`` classifies review text into SENTIMENT_LABELS at write
+        time, so sentiment counts can later be aggregated without the text.
+        """
+        with self._lock, self._file_lock():
+            # Another writer may have committed rows or products since the last look
+            self._refresh()
+            self._truncate_uncommitted()
+            product = self._product_id(asin, category)
+            keys = self._stored_keys()
+
+            rows = []
+            for review in reviews:
+                key = _review_key(asin, review)
+                if key in keys:
+                    continue
+                keys.add(key)
+                rows.append((key, review))
+            if not rows:
+                return 0
+
+            texts = [(review.get('text') or '').encode('utf-8') for _, review in rows]
+            ends = self._text_bytes + np.cumsum([len(text) for text in texts], dtype=np.uint64)
+            columns = {
+                'key': np.array([key for key, _ in rows], dtype=np.uint64),
+                'product': np.full(len(rows), product, dtype=np.uint32),
+                'rating': np.array([float(review['rating']) for _, review in rows], dtype=np.float32),
+                'date': _parse_dates((review.get('date') for _, review in rows), len(rows)),
+                'verified': np.array([bool(review.get('verified')) for _, review in rows], dtype=np.bool_),
+                'sentiment': np.array(
+                    [SENTIMENT_CODES[sentiment(review.get('text') or '')] if sentiment else NO_SENTIMENT
+                     for _, review in rows], dtype=np.int8
+                ),
+                'text_end': ends,
+            }
+
+            for name, values in columns.items():
+                self._append_file(f"{name}.col", values.astype(COLUMNS[name]).tobytes())
+            self._append_file('text.bin', b''.join(texts))
+
+            self._count += len(rows)
+            self._text_bytes = int(ends[-1])
+            self._write_meta()
+            self._views = None
+            return len(rows)
+
+    def columns(self):
+        """Every column as a read-only memory-mapped array of the committed rows"""
+        with self._lock:
+            self._refresh()
+            if self._views is None:
+                self._views = {name: self._map(f"{name}.col", dtype) for name, dtype in COLUMNS.items()}
+            return self._views
+
+    def product_stats(self, asin):
+        """Aggregate review statistics of one product, or None if it has no reviews"""
+        columns = self.columns()
+        product = self._products.get(asin)
+        if product is None:
+            return None
+        return self._stats(columns, columns['product'] == product)
+
+    def category_stats(self, category):
+        """Aggregate review statistics of every product in a category, or None"""
+        columns = self.columns()
+        ids = [index for index, name in enumerate(self._categories) if name == category]
+        if not ids:
+            return None
+        mask = np.isin(columns['product'], np.array(ids, dtype=np.uint32))
+        stats = self._stats(columns, mask)
+        if stats is not None:
+            stats['products'] = int(np.unique(columns['product'][mask]).size)
+        return stats
+
+    def product_ratings(self, category=None):
+        """Review count and average rating per ASIN, computed in one vectorized pass"""
+        columns = self.columns()
+        products = columns['product']
+        counts = np.bincount(products, minlength=len(self._asins))
+        sums = np.bincount(products, weights=columns['rating'], minlength=len(self._asins))
+        return {
+            asin: {'reviews': int(counts[index]), 'average_rating': float(sums[index] / counts[index])}
+            for index, asin in enumerate(self._asins)
+            if counts[index] and (category is None or self._categories[index] == category)
+        }
+
+    def texts(self, asin):
+        """Review texts of a product, decoded one at a time"""
+        columns = self.columns()
+        product = self._products.get(asin)
+        if product is None:
+            return
+        ends = columns['text_end']
+        blob = self._map('text.bin', np.uint8, self._text_bytes)
+        for row in np.flatnonzero(columns['product'] == product):
+            start = int(ends[row - 1]) if row else 0
+            yield blob[start:int(ends[row])].tobytes().decode('utf-8')
+
+    def categories(self):
+        """Names of the categories with stored products"""
+        with self._lock:
+            self._refresh()
+            return sorted({category for category in self._categories if category})
+
+    def stats(self):
+        """Stored review, product and text byte counts"""
+        with self._lock:
+            self._refresh()
+            return {'reviews': self._count, 'products': len(self._products), 'text_bytes': self._text_bytes}
+
+    def close(self):
+        """Drop the memory maps and the de-duplication index"""
+        with self._lock:
+            self._views = None
+            self._keys = None
+
+    def _stats(self, columns, mask):
+        """analyze_review_columns output for the rows selected by a boolean mask"""
+        if not mask.any():
+            return None
+        sentiments = columns['sentiment'][mask]
+        classified = sentiments[sentiments != NO_SENTIMENT]
+        return analyze_review_columns(ReviewColumns(
+            columns['rating'][mask], columns['verified'][mask], columns['date'][mask],
+            classified if classified.size == sentiments.size else None
+        ))
+
+    def _product_id(self, asin, category):
+        """Index of a product, registering it on first use"""
+        product = self._products.get(asin)
+        if product is not None:
+            if category and not self._categories[product]:
+                # A category learned later is recorded as a new line that overrides the first
+                self._categories[product] = category
+                self._append_product(asin, product, category)
+            return product
+
+        product = len(self._asins)
+        self._products[asin] = product
+        self._asins.append(asin)
+        self._categories.append(category)
+        self._append_product(asin, product, category)
+        return product
+
+    def _refresh(self):
+        """Catch up on rows and products committed by other writers"""
+        meta = self._read_meta()
+        if meta['count'] != self._count:
+            if self._keys is not None:
+                new_keys = self._map('key.col', np.uint64, meta['count'])[self._count:]
+                self._keys.update(new_keys.tolist())
+            self._count = meta['count']
+            self._text_bytes = meta['text_bytes']
+            self._views = None
+        self._load_products()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the store directory, shared with other processes"""
+        if fcntl is None:
+            yield
+            return
+        with open(self._path('lock'), 'a+b') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _stored_keys(self):
+        """Set of stored review keys, read from the key column on first use"""
+        if self._keys is None:
+            self._keys = set(self._map('key.col', np.uint64).tolist())
+        return self._keys
+
+    def _map(self, name, dtype, length=None):
+        """Read-only memory map of the committed part of a file"""
+        length = self._count if length is None else length
+        if not length:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode='r', shape=(length,))
+
+    def _append_file(self, name, data):
+        """Append bytes to a file and flush them to disk"""
+        with open(self._path(name), 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _append_product(self, asin, product, category):
+        """Record a product's index and category"""
+        line = json.dumps({'asin': asin, 'id': product, 'category': category}) + '\n'
+        self._append_file('products.jsonl', line.encode('utf-8'))
+
+    def _load_products(self):
+        """Read product index lines added since the last call, later lines winning"""
+        path = self._path('products.jsonl')
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            f.seek(self._products_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Still being written, or cut short by a crash
+                    break
+                self._products_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                product = entry['id']
+                while len(self._asins) <= product:
+                    self._asins.append(None)
+                    self._categories.append(None)
+                self._asins[product] = entry['asin']
+                self._categories[product] = entry['category']
+                self._products[entry['asin']] = product
+
+    def _truncate_uncommitted(self):
+        """Cut every file back to the committed row count; only safe under the file lock"""
+        sizes = {f"{name}.col": self._count * np.dtype(dtype).itemsize for name, dtype in COLUMNS.items()}
+        sizes['text.bin'] = self._text_bytes
+        sizes['products.jsonl'] = self._products_offset
+        for name, size in sizes.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                self.logger.warning(f"Discarding uncommitted data in {path}")
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def _read_meta(self):
+        """Committed row count and text size"""
+        try:
+            with open(self._path('meta.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'count': 0, 'text_bytes': 0}
+
+    def _write_meta(self):
+        """Atomically commit the current row count and text size"""
+        path = self._path('meta.json')
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'count': self._count, 'text_bytes': self._text_bytes}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+
+def _review_key(asin, review):
+    """64-bit hash identifying a review, by its id or else its product, date and text"""
+    identity = review.get('id') or f"{asin}|{review.get('date')}|{review.get('text')}"
+    return int.from_bytes(hashlib.blake2b(identity.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_review_store(directory):
+    """The process-wide ReviewStore of a directory, shared by every bot and thread"""
+    key = os.path.realpath(directory)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ReviewStore(directory)
+        return _stores[key]
@@ -0,0 +1,139 @@
+import json
+import sqlite3
+import threading
+import time
+import logging
+
+
+class SQLiteCache:
+    """Base for on-disk caches kept in one SQLite table.
+
+    Rows expire after a per-read ``ttl`` and the least recently used ones
+    are evicted once the table grows past ``max_bytes``. Rows whose
+    ``pinned`` (column, value) matches are never evicted and do not count
+    toward ``max_bytes``. With ``track_access=False`` reads never write,
+    which keeps many processes reading one database from locking each other
+    out. Values are stored as JSON unless ``json_values`` is False, in which
+    case they must be strings.
+    """
+
+    def __init__(self, path, table, key_columns, value_column, max_bytes, track_access=True,
+                 pinned=None, json_values=True, timeout=30):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.track_access = track_access
+        self.logger = logging.getLogger(__name__)
+        self._table = table
+        self._value_column = value_column
+        self._key_match = ' AND '.join(f"{column} = ?" for column in key_columns)
+        self._key_select = ', '.join(key_columns)
+        self._pinned = pinned
+        self._json_values = json_values
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+        # Writers from other processes hold the lock briefly; wait for them instead of failing
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        key_definitions = ''.join(f"{column} TEXT NOT NULL,\n" for column in key_columns)
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key_definitions}
+                {value_column} TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY ({self._key_select})
+            )
+        """)
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_lru ON {table} (accessed_at)")
+        self._conn.commit()
+
+    def stats(self):
+        """Hit/miss counters plus current entry count and size"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self._table}"
+            ).fetchone()
+            return dict(self._stats, entries=entries, bytes=size)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table}")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, key, ttl, accept=None):
+        """Fresh cached value for a key tuple, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._value_column}, stored_at FROM {self._table} WHERE {self._key_match}", key
+            ).fetchone()
+
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+
+            payload, stored_at = row
+            if ttl is not None and now - stored_at > ttl:
+                self._conn.execute(f"DELETE FROM {self._table} WHERE {self._key_match}", key)
+                self._conn.commit()
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            value = json.loads(payload) if self._json_values else payload
+            if accept is not None and not accept(value):
+                self._stats['misses'] += 1
+                return None
+
+            if self.track_access:
+                self._conn.execute(
+                    f"UPDATE {self._table} SET accessed_at = ? WHERE {self._key_match}", (now, *key)
+                )
+                self._conn.commit()
+            self._stats['hits'] += 1
+
+        return value
+
+    def _put(self, key, value):
+        """Store a value and evict old entries if the cache is over size"""
+        payload = json.dumps(value) if self._json_values else value
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} ({self._key_select}, {self._value_column}, "
+                f"size, stored_at, accessed_at) VALUES ({', '.join('?' * len(key))}, ?, ?, ?, ?)",
+                (*key, payload, len(payload.encode('utf-8')), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        unpinned, params = '', ()
+        if self._pinned is not None:
+            column, value = self._pinned
+            unpinned, params = f"WHERE {column} != ?", (value,)
+
+        total = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self._table} {unpinned}", params
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            f"SELECT {self._key_select}, size FROM {self._table} {unpinned} ORDER BY accessed_at", params
+        ).fetchall()
+        for *key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute(f"DELETE FROM {self._table} WHERE {self._key_match}", key)
+            total -= size
+            self._stats['evictions'] += 1
@@ -5,19 +5,69 @@ def test_imports():
     try:
         # Test auth module
         from src.auth.amazon_auth import AmazonAuthenticator
+        from src.auth.session_store import SessionStore
         print("✅ Authentication module imported successfully")
         
         # Test scraper module
         from src.scraper.product_scraper import ProductScraper
         print("✅ Product scraper module imported successfully")
+
+        from src.scraper.html_extractor import extract_search_results
+        print("✅ HTML extractor module imported successfully")
+
+        from src.scraper.fetchers import TabPoolFetcher
+        print("✅ Page fetcher module imported successfully")
+
+        from src.scraper.circuit_breaker import CircuitBreaker
+        print("✅ Circuit breaker module imported successfully")
         
         # Test analyzer module
         from src.analyzer.review_analyzer import ReviewAnalyzer
         print("✅ Review analyzer module imported successfully")
+
+        from src.analyzer.sentiment import SentimentEngine
+        print("✅ Sentiment engine module imported successfully")
+        from src.analyzer.prerank import PreRanker
+        print("✅ Pre-ranking module imported successfully")
+        
+        # Test recommender module
+        from src.recommender.prompt_builder import PromptBuilder
+        print("✅ Prompt builder module imported successfully")
+        
+        # Test pipeline module
+        from src.pipeline.product_pipeline import ProductPipeline
+        print("✅ Pipeline module imported successfully")
+        
+        # Test instrumentation module
+        from src.instrumentation.tracer import Tracer
+        print("✅ Instrumentation module imported successfully")
+        
+        # Test storage module
+        from src.storage.product_cache import ProductCache
+        print("✅ Product cache module imported successfully")
+
+        from src.storage.llm_cache import LLMCache
+        print("✅ LLM cache module imported successfully")
+
+        from src.storage.review_store import ReviewStore
+        print("✅ Review store module imported successfully")
+
+        from src.storage.job_queue import JobQueue
+        print("✅ Job queue module imported successfully")
         
         # Test main module
         from src.main import AmazonAIShopperBot
         print("✅ Main module imported successfully")
+
+        # Test service module
+        from src.service.server import ShopperService
+        print("✅ Service module imported successfully")
+
+        from src.batch import BatchRunner
+        print("✅ Batch module imported successfully")
+
+        from src.service.workers import WorkerPool
+        print("✅ Crawl workers module imported successfully")
         
         # Check environment variables
         try:
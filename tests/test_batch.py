@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from src.batch import BatchRunner, ResultWriter, SharedProducts, completed_keys
+from src.scraper.deadline import Deadline
+
+
+def test_complete_load_is_shared():
+    shared = SharedProducts()
+    calls = []
+    assert shared.get_or_load('B1', lambda: calls.append(1) or 'product') == 'product'
+    assert shared.get_or_load('B1', lambda: calls.append(1) or 'other') == 'product'
+    assert len(calls) == 1
+    assert (shared.loads, shared.reuses) == (1, 1)
+
+
+def test_failed_loads_are_not_memoized():
+    shared = SharedProducts()
+    assert shared.get_or_load('B1', lambda: None) is None
+    with pytest.raises(RuntimeError):
+        shared.get_or_load('B1', lambda: (_ for _ in ()).throw(RuntimeError('blocked')))
+    assert shared.get_or_load('B1', lambda: 'product') == 'product'
+
+
+def test_load_cut_short_by_deadline_is_not_memoized():
+    shared = SharedProducts()
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    assert shared.get_or_load('B1', lambda: 'partial', deadline) == 'partial'
+    assert shared.get_or_load('B1', lambda: 'full') == 'full'
+
+
+def test_waiter_gives_up_at_its_deadline():
+    shared = SharedProducts()
+    release = threading.Event()
+    owner = threading.Thread(target=shared.get_or_load, args=('B1', lambda: release.wait(5) and 'product'))
+    owner.start()
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    assert shared.get_or_load('B1', lambda: 'mine', Deadline(0.1)) is None
+    assert time.monotonic() - started < 1
+    release.set()
+    owner.join()
+
+
+def test_waiter_retries_after_owner_fails():
+    shared = SharedProducts()
+    release = threading.Event()
+
+    def failing_load():
+        release.wait(5)
+        return None
+
+    owner = threading.Thread(target=shared.get_or_load, args=('B1', failing_load))
+    owner.start()
+    time.sleep(0.05)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(shared.get_or_load('B1', lambda: 'product')))
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    owner.join()
+    waiter.join()
+    assert results == ['product']
+
+
+class _Service:
+    """Answers each query with a canned (recommendation, partial) outcome"""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+
+    def run_query(self, query, budget=None):
+        recommendation, partial = self.outcomes[query]
+        return {'recommendation': recommendation, 'partial': partial}
+
+
+def test_partial_results_are_rerun_on_resume(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    service = _Service({'tv': ('Buy P1', False), 'phone': ('Buy P2', True), 'desk': (None, False)})
+    writer = ResultWriter(path)
+    counts = BatchRunner(service, writer, parallel=2).run(
+        [{'query': 'tv'}, {'query': 'phone'}, {'query': 'desk'}])
+    writer.close()
+
+    assert counts == (1, 1, 1)
+    assert completed_keys(path) == {'tv|'}
+
+    # A rerun that completes the job checkpoints it
+    service.outcomes['phone'] = ('Buy P2', False)
+    writer = ResultWriter(path)
+    BatchRunner(service, writer).run([{'query': 'phone'}])
+    writer.close()
+    assert completed_keys(path) == {'tv|', 'phone|'}
+
+
+def test_partial_results_written_as_ok_are_not_checkpoints(tmp_path):
+    path = tmp_path / 'results.jsonl'
+    path.write_text('{"key": "tv|", "status": "ok", "partial": true}\n'
+                    '{"key": "phone|", "status": "ok", "partial": false}\n')
+    assert completed_keys(str(path)) == {'phone|'}
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_review_corpus
+from src.analyzer.batch_analysis import ReviewColumns, analyze_review_columns
+from src.analyzer.review_analyzer import ReviewAnalyzer
+
+
+def _review(rating, date, verified=True, text="works fine"):
+    return {'rating': rating, 'verified': verified, 'text': text,
+            'date': f"Reviewed in the United States on {date}"}
+
+
+def test_batch_path_matches_the_per_review_path():
+    analyzer = ReviewAnalyzer(None)
+    reviews = make_review_corpus(500)
+    batch = analyzer.analyze_reviews_batch(reviews)
+    loop = analyzer.analyze_reviews(reviews)
+
+    assert batch['total_reviews'] == loop['total_reviews'] == 500
+    assert batch['average_rating'] == pytest.approx(loop['average_rating'])
+    assert batch['verified_purchases'] == loop['verified_purchases']
+    assert batch['rating_distribution'] == dict(loop['rating_distribution'])
+    assert batch['sentiment_summary'] == loop['sentiment_summary']
+    assert batch['common_phrases'] == loop['common_phrases']
+    assert batch['verified_ratio'] == pytest.approx(loop['verified_purchases'] / 500)
+
+
+def test_monthly_trend_skips_undated_reviews():
+    reviews = [
+        _review(5.0, "January 5, 2024"),
+        _review(3.0, "January 20, 2024", verified=False),
+        _review(4.0, "March 1, 2024"),
+        dict(_review(1.0, ""), date="Reviewed somewhere"),
+    ]
+    analysis = analyze_review_columns(ReviewColumns.from_reviews(reviews))
+    assert analysis['rating_trend'] == [
+        {'month': '2024-01', 'reviews': 2, 'average_rating': 4.0},
+        {'month': '2024-03', 'reviews': 1, 'average_rating': 4.0},
+    ]
+    assert analysis['average_rating'] == pytest.approx(13.0 / 4)
+    assert analysis['rating_distribution'] == {1.0: 1, 3.0: 1, 4.0: 1, 5.0: 1}
+    # Without a sentiment function every label counts zero
+    assert analysis['sentiment_summary'] == {'positive': 0, 'negative': 0, 'neutral': 0}
+
+
+def test_columns_hold_dates_and_mark_unparseable_ones():
+    columns = ReviewColumns.from_reviews([_review(4.0, "May 2, 2023"), _review(4.0, "May 2, 2023"),
+                                          dict(_review(2.0, ""), date=None)])
+    assert columns.dates[0] == np.datetime64('2023-05-02')
+    assert columns.dates[1] == columns.dates[0]
+    assert np.isnat(columns.dates[2])
+    assert len(columns) == 3
+
+
+def test_no_reviews():
+    assert analyze_review_columns(ReviewColumns([], [], [])) is None
+    assert ReviewAnalyzer(None).analyze_reviews_batch([]) is None
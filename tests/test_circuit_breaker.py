@@ -0,0 +1,205 @@
+import time
+
+import pytest
+import requests
+from selenium.common.exceptions import TimeoutException
+
+from src.scraper.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN, circuit_stats
+from src.scraper.deadline import Deadline, load_page
+from src.scraper.fetchers import HttpFetcher, FallbackFetcher, TabPoolFetcher
+from src.scraper.product_scraper import ProductScraper
+from src.scraper.rate_limiter import RateLimiter
+
+URL = 'https://www.amazon.com/dp/B000000001'
+
+
+def _state(breaker):
+    return next(iter(breaker.stats().values()))['state']
+
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow(URL)
+        breaker.record_failure(URL)
+
+
+def test_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(URL)
+    assert _state(breaker) == CLOSED
+    breaker.record_failure(URL)
+    assert _state(breaker) == OPEN
+    assert not breaker.allow(URL)
+    assert next(iter(breaker.stats().values()))['rejected'] == 1
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(URL)
+    breaker.record_success(URL)
+    breaker.record_failure(URL)
+    assert _state(breaker) == CLOSED
+
+
+def test_half_open_trial_success_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.allow(URL)
+    assert _state(breaker) == HALF_OPEN
+    # Only one trial at a time
+    assert not breaker.allow(URL)
+    breaker.record_success(URL)
+    assert _state(breaker) == CLOSED
+    assert breaker.allow(URL)
+
+
+def test_half_open_trial_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    _open(breaker)
+    time.sleep(0.06)
+    assert breaker.allow(URL)
+    breaker.record_failure(URL)
+    assert _state(breaker) == OPEN
+    assert not breaker.allow(URL)
+
+
+def test_released_trial_lets_next_request_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.allow(URL)
+    breaker.record(URL, None)
+    assert _state(breaker) == OPEN
+    assert breaker.allow(URL)
+    assert _state(breaker) == HALF_OPEN
+
+
+class _SlowLimiter:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def acquire(self, url):
+        time.sleep(self.delay)
+
+
+class _FailingSession(requests.Session):
+    def get(self, url, **kwargs):
+        time.sleep(0.05)
+        raise requests.ConnectionError('refused')
+
+
+def test_http_fetch_cut_off_by_deadline_does_not_wedge_half_open():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    fetcher = HttpFetcher(cookies_file='', rate_limiter=_SlowLimiter(0.05), circuit_breaker=breaker)
+
+    # Deadline passes while waiting on the rate limiter
+    assert fetcher.fetch(URL, Deadline(0.01)) is None
+    assert _state(breaker) == OPEN
+
+    # Deadline passes during a failing request
+    fetcher.rate_limiter = _SlowLimiter(0)
+    fetcher.session = _FailingSession()
+    assert fetcher.fetch(URL, Deadline(0.01)) is None
+    assert _state(breaker) == OPEN
+    assert breaker.allow(URL)
+
+
+def test_http_fetch_failure_is_recorded():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    fetcher = HttpFetcher(cookies_file='', rate_limiter=_SlowLimiter(0), circuit_breaker=breaker)
+    fetcher.session = _FailingSession()
+    assert fetcher.fetch(URL) is None
+    assert _state(breaker) == OPEN
+
+
+class _StallingDriver:
+    """Driver whose pages take ``stall`` seconds, failing like Chrome past the page load timeout"""
+
+    def __init__(self, stall):
+        self.stall = stall
+        self.page_load_timeout = 30.0
+        self.timeouts = []
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+        self.timeouts.append(seconds)
+
+    def get(self, url):
+        time.sleep(min(self.stall, self.page_load_timeout))
+        if self.stall > self.page_load_timeout:
+            raise TimeoutException('page load timed out')
+
+
+def test_page_load_gives_up_at_the_deadline_and_restores_the_timeout():
+    driver = _StallingDriver(stall=5)
+    started = time.monotonic()
+    with pytest.raises(TimeoutException):
+        load_page(driver, URL, Deadline(0.1))
+    assert time.monotonic() - started < 1
+    assert driver.timeouts[0] <= 0.1
+    assert driver.page_load_timeout == 30.0
+
+
+def test_product_page_cut_off_by_deadline_is_not_a_failure():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    scraper = ProductScraper(_StallingDriver(stall=5), rate_limiter=RateLimiter(rate=0),
+                             circuit_breaker=breaker)
+    assert scraper.analyze_product(URL, Deadline(0.1)) is None
+    assert breaker.allow(URL)
+
+
+def test_search_page_cut_off_by_deadline_is_not_a_failure():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    scraper = ProductScraper(_StallingDriver(stall=5), rate_limiter=RateLimiter(rate=0),
+                             circuit_breaker=breaker)
+    url = 'https://www.amazon.com/s?k=headphones'
+    assert scraper._load_results_page(url, Deadline(0.1)) == ([], False)
+    assert breaker.allow(url)
+
+
+def test_page_load_timeout_without_deadline_is_a_failure():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    driver = _StallingDriver(stall=5)
+    driver.page_load_timeout = 0.05
+    scraper = ProductScraper(driver, rate_limiter=RateLimiter(rate=0), circuit_breaker=breaker)
+    assert scraper.analyze_product(URL) is None
+    assert not breaker.allow(URL)
+
+
+def test_review_page_cut_off_by_deadline_is_not_a_failure():
+    from src.analyzer.review_analyzer import ReviewAnalyzer
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    analyzer = ReviewAnalyzer(_StallingDriver(stall=5), extraction_mode='webdriver',
+                              rate_limiter=RateLimiter(rate=0), circuit_breaker=breaker)
+    url = 'https://www.amazon.com/product-reviews/B000000001/?pageNumber=1'
+    assert list(analyzer._iter_review_pages([url], Deadline(0.1))) == [(url, None)]
+    assert breaker.allow(url)
+
+
+def test_http_and_browser_backends_have_separate_breakers():
+    http = HttpFetcher(cookies_file='', rate_limiter=_SlowLimiter(0))
+    browser = TabPoolFetcher(None, rate_limiter=_SlowLimiter(0))
+    assert http.circuit_breaker is not browser.circuit_breaker
+    assert (http.circuit_breaker.backend, browser.circuit_breaker.backend) == ('http', 'browser')
+    assert set(circuit_stats()) >= {'http', 'browser'}
+
+
+def test_blocked_http_pages_still_fall_back_to_the_browser():
+    class Browser:
+        def __init__(self, breaker):
+            self.breaker = breaker
+
+        def fetch(self, url, deadline=None):
+            return '<html>page</html>' if self.breaker.allow(url) else None
+
+    http = HttpFetcher(cookies_file='', rate_limiter=_SlowLimiter(0),
+                       circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60, backend='http'))
+    http.session = _FailingSession()
+    fetcher = FallbackFetcher(http, Browser(CircuitBreaker(failure_threshold=1, reset_timeout=60)))
+    assert fetcher.fetch(URL) == '<html>page</html>'
+    assert not http.circuit_breaker.allow(URL)
+    assert fetcher.fetch(URL) == '<html>page</html>'
@@ -0,0 +1,40 @@
+import time
+
+from src.scraper.deadline import Deadline, is_expired, wait_timeout
+
+
+def test_no_limit():
+    deadline = Deadline()
+    assert deadline.remaining() is None
+    assert not deadline.expired()
+    assert deadline.timeout(30) == 30
+    assert not is_expired(None)
+    assert wait_timeout(30) == 30
+
+
+def test_waits_are_shortened_to_the_deadline():
+    deadline = Deadline(0.5)
+    assert deadline.timeout(30) <= 0.5
+    assert deadline.timeout(0.1) == 0.1
+    assert wait_timeout(30, deadline) <= 0.5
+
+
+def test_expiry():
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    assert deadline.expired()
+    assert is_expired(deadline)
+    assert deadline.remaining() == 0.0
+
+
+def test_split_gives_each_stage_its_cumulative_share():
+    deadline = Deadline(10)
+    stages = deadline.split((('search', 0.2), ('analyze', 0.5), ('recommend', 0.3)))
+    assert 1.9 < stages['search'].remaining() <= 2.0
+    assert 6.9 < stages['analyze'].remaining() <= 7.0
+    assert abs(stages['recommend'].expires_at - deadline.expires_at) < 0.01
+
+
+def test_split_without_limit():
+    stages = Deadline().split((('search', 1), ('analyze', 1)))
+    assert all(stage.remaining() is None for stage in stages.values())
@@ -0,0 +1,94 @@
+from selenium.common.exceptions import WebDriverException
+
+import pytest
+
+from src.service.driver_pool import DriverPool
+
+
+class _FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.window_handles = ['main']
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise WebDriverException('session gone')
+        return 'complete'
+
+    def quit(self):
+        self.alive = False
+
+
+class _FakeAuth:
+    fail_logins = 0
+
+    def __init__(self, session=None):
+        self.session = session
+        self.driver = None
+
+    def initialize_driver(self):
+        self.driver = _FakeDriver()
+
+    def login(self, interactive=True):
+        if _FakeAuth.fail_logins:
+            _FakeAuth.fail_logins -= 1
+            return False
+        return True
+
+    def close(self):
+        if self.driver:
+            self.driver.quit()
+
+
+@pytest.fixture
+def pool():
+    _FakeAuth.fail_logins = 0
+    pool = DriverPool(size=3, authenticator_factory=_FakeAuth, health_check_interval=0)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+def _kill_idle(pool, count):
+    drivers = [pool.acquire(timeout=0) for _ in range(3)]
+    for auth in drivers[:count]:
+        auth.driver.alive = False
+    for auth in drivers:
+        pool.release(auth)
+
+
+def test_failed_replacement_in_health_check_keeps_every_slot(pool):
+    _kill_idle(pool, 1)
+    _FakeAuth.fail_logins = 1
+    pool.health_check()
+
+    stats = pool.stats()
+    assert stats['idle'] == 3
+    assert stats['in_use'] == 0
+    assert stats['empty'] == 1
+
+    # The empty slot is filled on the next health check
+    pool.health_check()
+    assert pool.stats()['empty'] == 0
+    assert all(pool.is_healthy(pool.acquire(timeout=0)) for _ in range(3))
+
+
+def test_failed_replacement_on_acquire_requeues_slot(pool):
+    _kill_idle(pool, 1)
+    _FakeAuth.fail_logins = 1
+    with pytest.raises(Exception):
+        pool.acquire(timeout=0)
+    assert pool.stats()['idle'] == 3
+
+    # Healthy drivers are still handed out, then the slot is retried
+    acquired = [pool.acquire(timeout=0) for _ in range(3)]
+    assert all(pool.is_healthy(auth) for auth in acquired)
+
+
+def test_failed_replacement_on_release_keeps_slot(pool):
+    auth = pool.acquire(timeout=0)
+    _FakeAuth.fail_logins = 1
+    pool.release(auth, healthy=False)
+    stats = pool.stats()
+    assert stats['idle'] == 3
+    assert stats['empty'] == 1
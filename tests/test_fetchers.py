@@ -0,0 +1,138 @@
+from urllib.parse import parse_qs, urlparse
+
+from selenium.common.exceptions import NoSuchWindowException, WebDriverException
+
+from benchmarks.synthetic import make_reviews_page
+from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.scraper.circuit_breaker import CircuitBreaker
+from src.scraper.fetchers import TabPoolFetcher
+from src.scraper.rate_limiter import RateLimiter
+
+BLANK = '<html><head></head><body></body></html>'
+
+
+class _Tab:
+    def __init__(self, target, blank_polls):
+        self.target = target
+        self.url = 'about:blank'
+        self.blank_polls = blank_polls
+
+
+class _FakeTabDriver:
+    """Single WebDriver session whose tabs sit on about:blank for a few polls before navigating"""
+
+    def __init__(self, pages, blank_polls=None, broken=()):
+        self.pages = pages
+        self.blank_polls = {} if blank_polls is None else blank_polls
+        self.broken = set(broken)
+        self.tabs = {}
+        self.opened = []
+        self.current_window_handle = 'home'
+        self.switch_to = self
+
+    @property
+    def window_handles(self):
+        return ['home'] + list(self.tabs)
+
+    def window(self, handle):
+        if handle != 'home' and handle not in self.tabs:
+            raise NoSuchWindowException(handle)
+        self.current_window_handle = handle
+
+    def execute_script(self, script, *args):
+        if script.startswith('window.open'):
+            handle = f"tab-{len(self.opened)}"
+            self.opened.append(args[0])
+            self.tabs[handle] = _Tab(args[0], self.blank_polls.get(args[0], 2))
+            return None
+        # about:blank is 'complete' too, which is what the fetcher must not be fooled by
+        return 'complete'
+
+    @property
+    def current_url(self):
+        tab = self.tabs[self.current_window_handle]
+        if tab.blank_polls:
+            tab.blank_polls -= 1
+        else:
+            tab.url = tab.target
+        return tab.url
+
+    @property
+    def page_source(self):
+        tab = self.tabs[self.current_window_handle]
+        if tab.target in self.broken:
+            raise WebDriverException('renderer crashed')
+        return BLANK if tab.url == 'about:blank' else self.pages[tab.target]
+
+    def close(self):
+        del self.tabs[self.current_window_handle]
+
+
+def _fetcher(driver, max_tabs=3):
+    return TabPoolFetcher(driver, max_tabs=max_tabs, rate_limiter=RateLimiter(rate=0),
+                          poll_interval=0.001, circuit_breaker=CircuitBreaker())
+
+
+def test_blank_new_tab_is_not_read_as_the_page():
+    url = 'https://www.amazon.com/dp/B000000001'
+    driver = _FakeTabDriver({url: '<html>product</html>'}, blank_polls={url: 3})
+    assert list(_fetcher(driver).fetch_many([url])) == [(url, '<html>product</html>')]
+    assert driver.window_handles == ['home']
+
+
+def test_tab_that_fails_to_read_is_closed():
+    good, bad = 'https://www.amazon.com/dp/B1', 'https://www.amazon.com/dp/B2'
+    driver = _FakeTabDriver({good: 'ok', bad: 'never'}, broken=[bad])
+    results = dict(_fetcher(driver).fetch_many([good, bad]))
+    assert results == {good: 'ok', bad: None}
+    assert driver.window_handles == ['home']
+    assert driver.current_window_handle == 'home'
+
+
+def _review_site(sizes, blank_polls=None):
+    """Driver serving review pages of the given sizes; page n has sizes[n - 1] reviews"""
+    driver = _FakeTabDriver({}, blank_polls=blank_polls)
+    driver.pages = _ReviewPages(sizes)
+    return driver
+
+
+class _ReviewPages(dict):
+    def __init__(self, sizes):
+        super().__init__()
+        self.sizes = sizes
+
+    def __getitem__(self, url):
+        page = _page_number(url)
+        return make_reviews_page(self.sizes[page - 1], seed=page)
+
+
+def _page_number(url):
+    return int(parse_qs(urlparse(url).query)['pageNumber'][0])
+
+
+def _analyzer(driver, concurrency):
+    return ReviewAnalyzer(driver, concurrency=concurrency, rate_limiter=RateLimiter(rate=0),
+                          circuit_breaker=CircuitBreaker())
+
+
+def test_review_pagination_stops_after_a_short_page():
+    driver = _review_site([10, 3, 10, 10, 10])
+    pages = list(_analyzer(driver, concurrency=1).iter_review_pages(
+        'https://www.amazon.com/dp/B000000001', max_pages=5))
+    assert [(page, len(reviews)) for page, reviews in pages] == [(1, 10), (2, 3)]
+    # Nothing past the last page was even requested
+    assert [_page_number(url) for url in driver.opened] == [1, 2]
+
+
+def test_review_pages_arrive_in_completion_order():
+    driver = _review_site([10, 10, 10], blank_polls=_SlowFirstPage())
+    pages = list(_analyzer(driver, concurrency=3).iter_review_pages(
+        'https://www.amazon.com/dp/B000000001', max_pages=3))
+    assert sorted(page for page, _ in pages) == [1, 2, 3]
+    # The first page stays blank longest, so it comes last
+    assert pages[-1][0] == 1
+
+
+class _SlowFirstPage(dict):
+    def get(self, url, default=None):
+        return 5 if _page_number(url) == 1 else 1
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from src.scraper.amazon_urls import extract_asin, page_type, review_page_url
+from src.scraper.html_extractor import (
+    extract_product_details, extract_reviews, extract_search_page, parse_count, parse_price, parse_rating
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'fixtures')
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_search_page_listings():
+    listings, has_next = extract_search_page(_fixture('search_results.html'),
+                                             base_url='https://www.amazon.com/s?k=headphones')
+    assert has_next
+    assert len(listings) == 16
+    first = listings[0]
+    assert first['asin'] == 'B043464097'
+    assert first['link'].startswith('https://www.amazon.com/dp/B043464097')
+    assert first['sponsored'] is True
+    assert parse_rating(first['rating']) == 4.6
+
+
+def test_product_details():
+    details = extract_product_details(_fixture('product_page.html'))
+    assert details['title'].startswith('Sony WH-1000XM4')
+    assert parse_price(details['price']) == 198.0
+    assert details['availability'] == 'In Stock'
+    assert len(details['features']) == 7
+
+
+def test_reviews_page():
+    reviews = extract_reviews(_fixture('reviews_page.html'))
+    assert len(reviews) == 10
+    assert reviews[0]['id'] == 'R6877951598416'
+    assert reviews[0]['rating'] == 4.0
+    assert reviews[0]['verified'] is True
+
+
+def test_missing_page_yields_nothing():
+    assert extract_reviews('<html><body></body></html>') == []
+
+
+@pytest.mark.parametrize('text, expected', [('$1,299.99', 1299.99), ('Price not found', None)])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+
+def test_parse_count():
+    assert parse_count('12,387') == 12387
+
+
+def test_asin_and_review_urls():
+    assert extract_asin('https://www.amazon.com/Some-Thing/dp/B0ABCDEFGH/ref=sr_1_1?x=1') == 'B0ABCDEFGH'
+    url = review_page_url('B0ABCDEFGH', 2)
+    assert 'pageNumber=2' in url
+    assert page_type(url) == 'reviews'
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+from src.storage.job_queue import JobQueue, PENDING, LEASED, DONE, FAILED
+from src.storage.product_cache import ProductCache
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.db'), lease_seconds=60, max_attempts=2, retry_delay=0.05)
+    yield queue
+    queue.close()
+
+
+def test_same_job_is_queued_once(queue):
+    assert queue.put('details', 'B1', {'link': 'x'})
+    assert not queue.put('details', 'B1', {'link': 'x'})
+    assert queue.counts()[PENDING] == 1
+
+
+def test_lease_is_exclusive_and_complete_marks_done(queue):
+    queue.put('details', 'B1')
+    job, = queue.lease('w1')
+    assert job['attempts'] == 1
+    assert queue.lease('w2') == []
+    # Only the lease holder can complete it
+    assert not queue.complete(job, 'w2')
+    assert queue.complete(job, 'w1')
+    assert queue.counts()[DONE] == 1
+    assert queue.is_drained()
+
+
+def test_failed_job_is_retried_after_backoff_then_given_up(queue):
+    queue.put('reviews', 'B1')
+    job, = queue.lease('w1')
+    assert queue.fail(job, 'w1', ValueError('No reviews extracted'))
+    # Backing off before the retry
+    assert queue.lease('w1') == []
+    time.sleep(0.06)
+    job, = queue.lease('w1')
+    assert job['attempts'] == 2
+
+    queue.fail(job, 'w1', ValueError('No reviews extracted'))
+    assert queue.counts()[FAILED] == 1
+    assert queue.failures() == [('reviews', 'B1', 'No reviews extracted')]
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.db'), lease_seconds=0.05, max_attempts=3)
+    queue.put('details', 'B1')
+    job, = queue.lease('dead-worker')
+    assert queue.counts()[LEASED] == 1
+    time.sleep(0.06)
+
+    reclaimed, = queue.lease('w2')
+    assert reclaimed['attempts'] == 2
+    assert not queue.complete(job, 'dead-worker')
+    assert queue.complete(reclaimed, 'w2')
+    queue.close()
+
+
+def test_untracked_reads_do_not_refresh_lru_position(tmp_path):
+    cache = ProductCache(str(tmp_path / 'cache.db'), track_access=False)
+    cache.put_details('B1', {'title': 'x'})
+    before = cache._conn.execute("SELECT accessed_at FROM entries").fetchone()[0]
+    time.sleep(0.01)
+    assert cache.get_details('B1') == {'title': 'x'}
+    assert cache._conn.execute("SELECT accessed_at FROM entries").fetchone()[0] == before
+    cache.close()
+
+
+def test_worker_fails_reviews_job_without_reviews(tmp_path):
+    pytest.importorskip('dotenv')
+    from src.service.workers import CrawlWorker
+
+    class NoReviews:
+        def get_reviews(self, link, num_reviews=20):
+            return []
+
+    cache = ProductCache(str(tmp_path / 'cache.db'))
+    worker = CrawlWorker('worker-1', None, cache)
+    worker.analyzer = NoReviews()
+    with pytest.raises(ValueError):
+        worker._run_reviews('B1', {'link': 'https://www.amazon.com/dp/B1', 'num_reviews': 5})
+    assert cache.get_reviews('B1', 5) is None
+    cache.close()
+
+
+def test_worker_restarts_a_browser_without_a_driver(tmp_path, queue):
+    pytest.importorskip('dotenv')
+    from src.service.workers import CrawlWorker
+
+    class LostDriver:
+        driver = None
+
+        def close(self):
+            pass
+
+    class Failing:
+        def analyze_product(self, link):
+            raise ValueError("page did not load")
+
+    cache = ProductCache(str(tmp_path / 'cache.db'))
+    worker = CrawlWorker('worker-1', queue, cache)
+    worker.auth = LostDriver()
+    worker.scraper = Failing()
+    starts = []
+    worker._start_browser = lambda: starts.append(1)
+
+    queue.put('details', 'B1', {'link': 'https://www.amazon.com/dp/B1'})
+    job, = queue.lease(worker.owner)
+    assert not worker._browser_healthy()
+    assert not worker.run_job(job)
+    assert starts == [1]
+    cache.close()
@@ -0,0 +1,63 @@
+import sqlite3
+import threading
+
+from src.storage.llm_cache import LLMCache, normalize_query, request_key
+from src.storage.product_cache import ProductCache
+
+RECORDS = [{'id': 'P1', 'price': 198.0, 'rating': 4.6}]
+PARAMS = {'model': 'gpt-3.5-turbo', 'temperature': 0.0}
+
+
+def test_normalized_queries_share_a_key():
+    assert normalize_query('  Wireless,  HEADPHONES! ') == 'wireless headphones'
+    assert request_key('Wireless headphones', RECORDS, PARAMS) == request_key('wireless headphones!', RECORDS, PARAMS)
+
+
+def test_key_changes_with_products_or_params():
+    key = request_key('headphones', RECORDS, PARAMS)
+    assert key != request_key('headphones', [dict(RECORDS[0], price=199.0)], PARAMS)
+    assert key != request_key('headphones', RECORDS, dict(PARAMS, temperature=0.7))
+
+
+def test_round_trip_and_expiry(tmp_path):
+    cache = LLMCache(str(tmp_path / 'cache.db'))
+    assert cache.get_response('headphones', RECORDS, PARAMS) is None
+    cache.put_response('headphones', RECORDS, PARAMS, 'Buy P1')
+    assert cache.get_response('Headphones', RECORDS, PARAMS) == 'Buy P1'
+    cache.close()
+
+    expired = LLMCache(str(tmp_path / 'cache.db'), ttl=-1)
+    assert expired.get_response('headphones', RECORDS, PARAMS) is None
+    assert expired.stats()['expired'] == 1
+    expired.close()
+
+
+def test_least_recently_used_replies_are_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / 'cache.db'), max_bytes=250)
+    for index in range(5):
+        cache.put(f"key{index}", 'x' * 100)
+    assert cache.get('key0') is None
+    assert cache.get('key4') == 'x' * 100
+    assert cache.stats()['bytes'] <= 250
+    cache.close()
+
+
+def test_shares_a_database_with_the_product_cache_and_waits_for_writers(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    products = ProductCache(path)
+    cache = LLMCache(path, timeout=5)
+    products.put_details('B1', {'title': 'x'})
+
+    writer = sqlite3.connect(path, check_same_thread=False)
+    writer.execute("BEGIN IMMEDIATE")
+    releaser = threading.Timer(0.2, writer.commit)
+    releaser.start()
+    cache.put('key', 'Buy B1')
+    releaser.join()
+    writer.close()
+
+    assert cache.get('key') == 'Buy B1'
+    assert products.get_details('B1') == {'title': 'x'}
+    assert cache.stats()['entries'] == products.stats()['entries'] == 1
+    cache.close()
+    products.close()
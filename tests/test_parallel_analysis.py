@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip('dotenv')
+
+from benchmarks.stub_llm import StubLLMClient
+from benchmarks.synthetic import make_product_page, make_reviews_page
+from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.main import AmazonAIShopperBot
+from src.scraper.deadline import Deadline
+
+
+class _Fetcher:
+    """Serves synthetic pages in reverse request order; URLs containing a failing ASIN return None"""
+
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.requested = []
+
+    def fetch_many(self, urls, deadline=None):
+        urls = list(urls)
+        self.requested.extend(urls)
+        for url in reversed(urls):
+            if any(asin in url for asin in self.failing):
+                yield url, None
+            elif '/product-reviews/' in url:
+                yield url, make_reviews_page(10, seed=urls.index(url))
+            else:
+                yield url, make_product_page(5)
+
+
+def _bot(monkeypatch, tmp_path, fetcher):
+    monkeypatch.setenv('SHOPPER_CACHE_PATH', str(tmp_path / 'cache.db'))
+    monkeypatch.setenv('SHOPPER_REVIEW_STORE', '')
+    bot = AmazonAIShopperBot(workers=3, llm_client=StubLLMClient())
+    bot.fetcher = fetcher
+    bot.analyzer = ReviewAnalyzer(None)
+    return bot
+
+
+def _candidates(count):
+    return [{'title': f"Product {rank}", 'link': f"https://www.amazon.com/dp/B00000000{rank}"}
+            for rank in range(count)]
+
+
+def test_results_keep_search_rank_order(monkeypatch, tmp_path):
+    fetcher = _Fetcher()
+    bot = _bot(monkeypatch, tmp_path, fetcher)
+    products = bot._analyze_candidates_parallel(_candidates(3), num_reviews=15)
+
+    assert [product['basic_info']['title'] for product in products] == ["Product 0", "Product 1", "Product 2"]
+    # Both review pages are read, in page order, and cut to num_reviews
+    assert all(product['review_analysis']['total_reviews'] == 15 for product in products)
+    assert len(fetcher.requested) == 9
+    assert not bot.partial
+
+
+def test_cached_products_are_not_fetched_again(monkeypatch, tmp_path):
+    bot = _bot(monkeypatch, tmp_path, _Fetcher())
+    first = bot._analyze_candidates_parallel(_candidates(2), num_reviews=20)
+
+    fetcher = bot.fetcher = _Fetcher()
+    again = bot._analyze_candidates_parallel(_candidates(2), num_reviews=20)
+    assert fetcher.requested == []
+    assert again == first
+
+
+def test_failed_product_page_drops_only_that_product(monkeypatch, tmp_path):
+    bot = _bot(monkeypatch, tmp_path, _Fetcher(failing=('B000000001',)))
+    products = bot._analyze_candidates_parallel(_candidates(3), num_reviews=10)
+    assert [product['basic_info']['title'] for product in products] == ["Product 0", "Product 2"]
+
+
+def test_expired_deadline_marks_partial_and_skips_review_cache(monkeypatch, tmp_path):
+    bot = _bot(monkeypatch, tmp_path, _Fetcher())
+    products = bot._analyze_candidates_parallel(_candidates(2), num_reviews=10,
+                                                deadline=Deadline(expires_at=0))
+    assert len(products) == 2
+    assert bot.partial
+    assert bot.cache.get_reviews('B000000000', 10) is None
+    assert bot.cache.get_details('B000000000') is not None
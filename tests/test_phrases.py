@@ -0,0 +1,45 @@
+import pytest
+
+from src.analyzer.phrases import PhraseExtractor, SpaceSaving
+
+
+def test_phrases_skip_punctuation_and_stopword_edges():
+    extractor = PhraseExtractor(n=2)
+    found = extractor.phrases("Battery life. Life sound quality is the best")
+    assert 'battery life' in found
+    assert 'sound quality' in found
+    # Spans a full stop
+    assert 'life life' not in found
+    # Ends on a stopword
+    assert 'quality is' not in found
+
+
+def test_top_phrases_across_reviews():
+    extractor = PhraseExtractor(n=2, capacity=10)
+    extractor.add_many(["great battery life", "battery life is short", "noise cancelling works"])
+    assert extractor.top(1) == {'battery life': 2}
+
+
+def test_phrase_length_is_bounded():
+    with pytest.raises(ValueError):
+        PhraseExtractor(n=5)
+
+
+def test_space_saving_keeps_heavy_hitters_in_bounded_memory():
+    counter = SpaceSaving(capacity=3)
+    counter.update(['a', 'b', 'rare'] * 10 + [f"rare{index}" for index in range(20)] + ['a'] * 40)
+    assert len(counter) == 3
+    # 'a' is more than a third of the stream, so it is guaranteed to be tracked
+    (item, count), = counter.most_common(1)
+    assert item == 'a'
+    # Counts overestimate by at most the recorded error
+    assert count - counter.errors['a'] <= 50 <= count
+
+
+def test_space_saving_round_trips():
+    counter = SpaceSaving(capacity=2)
+    counter.update('aab')
+    restored = SpaceSaving.from_dict(counter.to_dict())
+    restored.add('c')
+    assert len(restored) == 2
+    assert restored.most_common(1) == [('a', 2)]
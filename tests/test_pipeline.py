@@ -0,0 +1,119 @@
+import threading
+import time
+
+from benchmarks.stub_llm import StubLLMClient
+from benchmarks.synthetic import make_product_page, make_reviews_page
+from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.pipeline.product_pipeline import ProductPipeline
+from src.pipeline.stages import Pipeline, Stage
+from src.recommender.prompt_builder import PromptBuilder
+
+
+def test_stages_overlap_and_return_every_output():
+    pipeline = Pipeline('source', range(20), [
+        Stage('double', lambda item: [item * 2], workers=3),
+        Stage('split', lambda item: [item, item + 1], workers=2),
+    ], queue_size=2)
+    results = pipeline.run()
+    assert sorted(results) == sorted(value for item in range(20) for value in (item * 2, item * 2 + 1))
+    report = {row['stage']: row for row in pipeline.report()}
+    assert report['source']['outputs'] == 20
+    assert (report['double']['items'], report['double']['outputs']) == (20, 20)
+    assert (report['split']['items'], report['split']['outputs']) == (20, 40)
+
+
+def test_bounded_queue_holds_back_a_fast_source():
+    produced = []
+    consumed = []
+    lead = []
+
+    def source():
+        for item in range(30):
+            lead.append(len(produced) - len(consumed))
+            produced.append(item)
+            yield item
+
+    def slow(item):
+        time.sleep(0.005)
+        consumed.append(item)
+        return [item]
+
+    pipeline = Pipeline('source', source(), [Stage('slow', slow)], queue_size=2)
+    assert pipeline.run() == list(range(30))
+    # Two queued, one in the worker's hands and one waiting to be put
+    assert max(lead) <= 4
+    assert pipeline.report()[0]['blocked'] > 0
+
+
+def test_failing_items_are_dropped_and_counted():
+    def fragile(item):
+        if item % 3 == 0:
+            raise ValueError(f"bad item {item}")
+        return [item]
+
+    pipeline = Pipeline('source', range(9), [Stage('fragile', fragile, workers=2)])
+    assert sorted(pipeline.run()) == [1, 2, 4, 5, 7, 8]
+    assert pipeline.report()[1]['errors'] == 3
+
+
+def test_failing_source_shuts_every_stage_down():
+    def source():
+        yield 1
+        yield 2
+        raise RuntimeError("search page broke")
+
+    before = threading.active_count()
+    pipeline = Pipeline('source', source(), [Stage('a', lambda item: [item], workers=3),
+                                             Stage('b', lambda item: [item], workers=2)])
+    assert sorted(pipeline.run()) == [1, 2]
+    assert pipeline.report()[0]['errors'] == 1
+    assert threading.active_count() == before
+
+
+class _Fetcher:
+    """Serves synthetic product and review pages; URLs containing a failing ASIN return None"""
+
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.requested = []
+
+    def fetch_many(self, urls, deadline=None):
+        for url in urls:
+            self.requested.append(url)
+            if any(asin in url for asin in self.failing):
+                yield url, None
+            elif '/product-reviews/' in url:
+                yield url, make_reviews_page(10, seed=len(self.requested))
+            else:
+                yield url, make_product_page(5)
+
+
+def _candidates(count):
+    return [{'title': f"Product {rank}", 'link': f"https://www.amazon.com/dp/B00000000{rank}"}
+            for rank in range(count)]
+
+
+def test_product_pipeline_keeps_search_rank_order():
+    fetcher = _Fetcher()
+    pipeline = ProductPipeline(fetcher, ReviewAnalyzer(None), num_reviews=20)
+    products = pipeline.run(iter(_candidates(4)), "headphones")
+    assert [product['basic_info']['title'] for product in products] == [f"Product {rank}" for rank in range(4)]
+    assert all(product['review_analysis']['total_reviews'] == 20 for product in products)
+    # One product page and two review pages per candidate
+    assert len(fetcher.requested) == 12
+
+
+def test_product_pipeline_drops_products_whose_page_failed():
+    pipeline = ProductPipeline(_Fetcher(failing=('B000000001',)), ReviewAnalyzer(None))
+    products = pipeline.run(_candidates(3), "headphones")
+    assert [product['basic_info']['title'] for product in products] == ["Product 0", "Product 2"]
+
+
+def test_product_pipeline_adds_summaries():
+    client = StubLLMClient("Great battery life.")
+    pipeline = ProductPipeline(_Fetcher(), ReviewAnalyzer(None), prompt_builder=PromptBuilder(),
+                               llm_client=client)
+    products = pipeline.run(_candidates(2), "headphones")
+    assert [product['summary'] for product in products] == ["Great battery life."] * 2
+    assert len(client.requests) == 2
+    assert [row['stage'] for row in pipeline.report()] == ['fetch', 'parse', 'analyze', 'summarize']
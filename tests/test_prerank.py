@@ -0,0 +1,54 @@
+import pytest
+
+from src.analyzer.prerank import PreRanker, query_terms
+
+
+def _listing(title, rating, reviews, price='49.99'):
+    return {'title': title, 'rating': f"{rating} out of 5 stars", 'review_count': f"{reviews:,}",
+            'price': price, 'link': f"https://www.amazon.com/dp/{title}"}
+
+
+def test_query_terms_drop_stopwords_and_plurals():
+    assert query_terms("the headphones for running") == {'headphone', 'running'}
+    # Titles are stemmed the same way, so singular and plural match
+    assert query_terms("Wireless Headphone") == query_terms("wireless headphones")
+
+
+def test_few_perfect_reviews_are_shrunk_below_many_good_ones():
+    ranker = PreRanker(prior_rating=4.0, prior_reviews=20)
+    few = _listing('few', 5.0, 3)
+    many = _listing('many', 4.6, 10000)
+    assert ranker.adjusted_rating(few) == pytest.approx((5.0 * 3 + 4.0 * 20) / 23)
+    assert ranker.adjusted_rating(few) < ranker.adjusted_rating(many)
+    assert [listing['product'] for listing in ranker.rank([few, many], "headphones")] == [many, few]
+
+
+def test_unrated_listing_sits_at_the_prior():
+    ranker = PreRanker(prior_rating=4.0)
+    assert ranker.adjusted_rating({'title': 'new', 'rating': None, 'review_count': None}) == 4.0
+
+
+def test_select_keeps_top_k_in_score_order():
+    listings = [_listing(f"headphones{index}", 3.5 + index * 0.2, 5000) for index in range(5)]
+    selected = PreRanker(top_k=3).select(listings, "headphones")
+    assert [listing['title'] for listing in selected] == ['headphones4', 'headphones3', 'headphones2']
+
+
+def test_adaptive_mode_cuts_listings_whose_interval_cannot_reach_the_leader():
+    leader = _listing('leader', 4.8, 20000)
+    close = _listing('close', 4.7, 40)
+    loser = _listing('loser', 3.2, 20000)
+    ranker = PreRanker(top_k=3)
+    scores = {listing['product']['title']: listing for listing in ranker.rank([leader, close, loser], "")}
+    floor = scores['leader']['rating_low']
+    assert scores['close']['rating_high'] >= floor > scores['loser']['rating_high']
+
+    adaptive = PreRanker(top_k=3, adaptive=True)
+    assert adaptive.select([loser, close, leader], "") == [leader, close]
+    assert PreRanker(top_k=3).select([loser, close, leader], "") == [leader, close, loser]
+
+
+def test_adaptive_mode_always_keeps_min_k():
+    listings = [_listing('a', 4.9, 50000), _listing('b', 2.0, 50000)]
+    assert len(PreRanker(top_k=2, adaptive=True, min_k=2).select(listings, "")) == 2
+    assert PreRanker(top_k=2, adaptive=True).select([], "") == []
@@ -0,0 +1,27 @@
+from src.storage.product_cache import ProductCache
+
+
+def test_review_state_survives_eviction(tmp_path):
+    cache = ProductCache(str(tmp_path / 'cache.db'), max_bytes=500)
+    cache.put_review_state('B1', {'asin': 'B1', 'rating_sum': 42.0, 'seen_ids': ['x'] * 20})
+    for index in range(20):
+        cache.put_details(f"D{index}", {'title': 'x' * 40})
+
+    assert cache.get_review_state('B1')['rating_sum'] == 42.0
+    assert cache.get_details('D0') is None
+    assert cache.get_details('D19') is not None
+    assert cache.stats()['evictions'] > 0
+    cache.close()
+
+
+def test_reviews_expire_and_need_enough_requested(tmp_path):
+    cache = ProductCache(str(tmp_path / 'cache.db'), reviews_ttl=-1)
+    cache.put_reviews('B1', [{'id': 'r1'}], 10)
+    assert cache.get_reviews('B1', 10) is None
+    assert cache.stats()['expired'] == 1
+
+    cache = ProductCache(str(tmp_path / 'other.db'))
+    cache.put_reviews('B1', [{'id': 'r1'}, {'id': 'r2'}], 10)
+    assert cache.get_reviews('B1', 1) == [{'id': 'r1'}]
+    assert cache.get_reviews('B1', 20) is None
+    cache.close()
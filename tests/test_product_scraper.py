@@ -0,0 +1,50 @@
+from benchmarks.synthetic import make_product_page, make_search_page
+from src.scraper.product_scraper import ProductScraper
+from src.scraper.rate_limiter import RateLimiter
+
+
+class _Fetcher:
+    """Fetcher that serves fixed pages and returns None for every other URL"""
+
+    def __init__(self, pages=None):
+        self.pages = pages or {}
+        self.requested = []
+
+    def fetch(self, url, deadline=None):
+        self.requested.append(url)
+        for marker, page_source in self.pages.items():
+            if marker in url:
+                return page_source
+        return None
+
+
+class _RecordingDriver:
+    """Driver that records page loads and never finds anything"""
+
+    def __init__(self):
+        self.loaded = []
+
+    def get(self, url):
+        self.loaded.append(url)
+        raise RuntimeError("not a real browser")
+
+
+def _scraper(fetcher, driver=None):
+    return ProductScraper(driver or _RecordingDriver(), rate_limiter=RateLimiter(rate=0), fetcher=fetcher)
+
+
+def test_failed_fetch_does_not_fall_through_to_the_driver():
+    fetcher = _Fetcher()
+    driver = _RecordingDriver()
+    scraper = _scraper(fetcher, driver)
+    assert scraper.analyze_product('https://www.amazon.com/dp/B000000001') is None
+    assert list(scraper.search_product('headphones')) == []
+    assert len(fetcher.requested) == 2
+    assert driver.loaded == []
+
+
+def test_fetched_pages_are_parsed():
+    scraper = _scraper(_Fetcher({'/s?': make_search_page(16), '/dp/': make_product_page(5)}))
+    listings = list(scraper.get_top_products('headphones', num_products=3))
+    assert len(listings) == 3
+    assert scraper.analyze_product(listings[0]['link'])['title']
@@ -0,0 +1,66 @@
+import pytest
+
+from benchmarks.bench_prompt import make_products
+from benchmarks.stub_llm import StubLLMClient
+from src.recommender import prompt_builder
+from src.recommender.prompt_builder import LEVELS, PromptBuilder, TokenCounter
+
+
+def test_larger_budgets_keep_richer_levels():
+    products = make_products(5)
+    levels = [PromptBuilder(token_budget=budget).build(products, "headphones").level
+              for budget in (100000, 1500, 1000, 700)]
+    assert levels[0] == 0
+    assert levels == sorted(levels)
+    assert levels[-1] > levels[0]
+
+
+def test_prompt_fits_the_budget_when_a_level_can():
+    products = make_products(5)
+    for budget in (3000, 1500, 1000, 700):
+        prompt = PromptBuilder(token_budget=budget).build(products, "headphones")
+        assert prompt.within_budget
+        assert prompt.tokens <= budget
+        assert prompt.tokens == TokenCounter().count_messages(prompt.messages)
+        assert prompt.saved_tokens > 0
+
+
+def test_leanest_level_is_sent_when_nothing_fits():
+    prompt = PromptBuilder(token_budget=10).build(make_products(5), "headphones")
+    assert prompt.level == len(LEVELS) - 1
+    assert not prompt.within_budget
+    assert [record['id'] for record in prompt.records] == ['P1', 'P2', 'P3', 'P4', 'P5']
+
+
+def test_token_counts_are_estimated_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(prompt_builder, 'tiktoken', None)
+    counter = TokenCounter()
+    assert not counter.exact
+    # Words count one token per four characters, symbols one each
+    assert counter.count("headphones, cheap!") == 3 + 1 + 2 + 1
+    assert counter.count_messages([{'role': 'user', 'content': 'hi'}]) == 1 + prompt_builder.MESSAGE_OVERHEAD
+
+
+def test_unknown_tiktoken_model_falls_back_to_estimates(monkeypatch):
+    class BrokenTiktoken:
+        @staticmethod
+        def encoding_for_model(model):
+            raise KeyError(model)
+
+    monkeypatch.setattr(prompt_builder, 'tiktoken', BrokenTiktoken)
+    counter = TokenCounter("unknown-model")
+    assert not counter.exact
+    assert counter.count("headphones") == 3
+
+
+def test_bot_prompt_stays_under_the_configured_budget(monkeypatch):
+    pytest.importorskip('dotenv')
+    from src.main import AmazonAIShopperBot
+
+    monkeypatch.setenv('SHOPPER_PROMPT_TOKEN_BUDGET', '900')
+    monkeypatch.setenv('SHOPPER_CACHE_PATH', '')
+    bot = AmazonAIShopperBot(llm_client=StubLLMClient())
+    prompt = bot.prompt_builder.build(make_products(5), "wireless headphones")
+    assert bot.prompt_builder.token_budget == 900
+    assert prompt.within_budget and prompt.tokens <= 900
+    assert prompt.level > 0
@@ -0,0 +1,32 @@
+import time
+
+from src.scraper.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_burst_goes_out_without_waiting():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_requests_past_the_burst_are_spaced_at_the_rate():
+    bucket = TokenBucket(rate=10, burst=1)
+    assert bucket.reserve() == 0.0
+    waits = [bucket.reserve() for _ in range(3)]
+    # Callers queue in arrival order, each one interval after the last
+    assert [round(wait, 1) for wait in waits] == [0.1, 0.2, 0.3]
+
+
+def test_zero_rate_disables_limiting():
+    bucket = TokenBucket(rate=0, burst=1)
+    assert bucket.reserve() == bucket.reserve() == 0.0
+
+
+def test_hosts_have_separate_buckets():
+    limiter = RateLimiter(rate=5, burst=1)
+    started = time.monotonic()
+    limiter.acquire('https://www.amazon.com/dp/B1')
+    limiter.acquire('https://www.amazon.co.uk/dp/B1')
+    assert time.monotonic() - started < 0.1
+
+    assert limiter.acquire('https://www.amazon.com/dp/B2') > 0.1
+    assert set(limiter.stats()) == {'www.amazon.com', 'www.amazon.co.uk'}
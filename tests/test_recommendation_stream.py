@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('dotenv')
+
+from benchmarks.bench_prompt import make_products
+from benchmarks.stub_llm import StubLLMClient
+from src import main
+from src.main import AmazonAIShopperBot, STREAM_BREAK
+from src.recommender.llm_client import iterate_until
+from src.scraper.deadline import Deadline
+
+REPLY = "1. Recommended Product: P1 Wireless Headphones"
+
+
+def _bot(monkeypatch, tmp_path, client, cache=False):
+    monkeypatch.setenv('SHOPPER_CACHE_PATH', str(tmp_path / 'cache.db') if cache else '')
+    return AmazonAIShopperBot(llm_client=client)
+
+
+class _Chunks:
+    """Async stream of numbered chunks that records whether it was closed"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        try:
+            for index in range(5):
+                await asyncio.sleep(self.delay)
+                yield index
+        finally:
+            self.closed = True
+
+
+def test_astream_recommendation_streams_then_serves_the_cached_reply(monkeypatch, tmp_path):
+    client = StubLLMClient(REPLY)
+    bot = _bot(monkeypatch, tmp_path, client, cache=True)
+    products = make_products(3)
+
+    async def collect():
+        return [piece async for piece in bot.astream_recommendation(products, "headphones")]
+
+    pieces = asyncio.run(collect())
+    assert len(pieces) > 1 and ''.join(pieces) == REPLY
+    assert asyncio.run(collect()) == [REPLY]
+    assert len(client.requests) == 1
+
+
+def test_iterate_until_times_out_and_closes_the_stream():
+    chunks = _Chunks(delay=0.05)
+
+    async def collect():
+        loop = asyncio.get_running_loop()
+        received = []
+        with pytest.raises(asyncio.TimeoutError):
+            async for chunk in iterate_until(chunks, loop.time() + 0.12):
+                received.append(chunk)
+        return received
+
+    assert asyncio.run(collect()) == [0, 1]
+    assert chunks.closed
+
+
+def test_cancelling_the_consumer_closes_the_stream():
+    chunks = _Chunks(delay=10)
+
+    async def consume():
+        async for _ in iterate_until(chunks, asyncio.get_running_loop().time() + 60):
+            pass
+
+    async def run():
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert chunks.closed
+
+
+def test_complete_stream_returns_what_was_sent(monkeypatch, tmp_path):
+    bot = _bot(monkeypatch, tmp_path, StubLLMClient(REPLY))
+    sent = []
+    recommendation = bot.stream_recommendation(make_products(3), "headphones", sent.append)
+    assert recommendation == ''.join(sent) == REPLY
+    assert not bot.partial
+
+
+def test_stream_cut_off_by_the_deadline_marks_the_break(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'MIN_LLM_SECONDS', 0.0)
+    bot = _bot(monkeypatch, tmp_path, StubLLMClient(REPLY, token_delay=0.1))
+    sent = []
+    recommendation = bot.stream_recommendation(make_products(3), "headphones", sent.append,
+                                               deadline=Deadline(0.25))
+    assert sent[-1] == STREAM_BREAK
+    assert recommendation == ''.join(sent)
+    assert REPLY.startswith(recommendation[:-len(STREAM_BREAK)])
+    assert bot.partial
+
+
+def test_stream_failing_before_any_text_sends_nothing(monkeypatch, tmp_path):
+    bot = _bot(monkeypatch, tmp_path, StubLLMClient(REPLY, latency=1.0))
+    sent = []
+    recommendation = bot.stream_recommendation(make_products(3), "headphones", sent.append,
+                                               deadline=Deadline(0.5))
+    assert recommendation is None
+    assert sent == []
@@ -0,0 +1,88 @@
+import json
+
+from src.analyzer.review_analyzer import ReviewAnalyzer
+from src.analyzer.review_state import ReviewState
+from src.analyzer.sentiment import SentimentEngine
+
+
+def _review(review_id, rating, day, text='great battery life'):
+    return {'id': review_id, 'rating': rating, 'verified': True, 'text': text,
+            'date': f"Reviewed in the United States on January {day}, 2024"}
+
+
+def test_incremental_merge_matches_full_analysis():
+    analyzer = ReviewAnalyzer(None)
+    older = [_review('r2', 4.0, 2), _review('r1', 2.0, 1, 'poor battery life')]
+    newer = [_review('r3', 5.0, 3)]
+
+    state = ReviewState('B1')
+    state.merge(older, analyzer.sentiment_engine)
+    # A save and reload between refreshes keeps the running totals
+    state = ReviewState.from_dict(json.loads(json.dumps(state.to_dict())))
+    state.merge(newer, analyzer.sentiment_engine)
+
+    incremental = state.to_analysis()
+    full = analyzer.analyze_reviews(newer + older)
+    for key in ('total_reviews', 'average_rating', 'verified_purchases', 'sentiment_summary'):
+        assert incremental[key] == full[key]
+    assert incremental['rating_distribution'] == dict(full['rating_distribution'])
+
+
+def test_known_reviews_are_recognized_by_id_or_age():
+    state = ReviewState('B1')
+    state.merge([_review('r2', 4.0, 2)], SentimentEngine())
+    assert state.is_known(_review('r2', 4.0, 2))
+    assert state.is_known(_review('r0', 4.0, 1))
+    assert not state.is_known(_review('r3', 4.0, 3))
+
+
+def test_empty_state_has_no_analysis():
+    assert ReviewState('B1').to_analysis() is None
+
+
+def _refresh(pages, state):
+    """refresh_reviews over pre-loaded pages; pages maps page number to reviews, None if it failed"""
+    analyzer = ReviewAnalyzer(None)
+
+    def iter_review_pages(product_url, max_pages=10, sort_by='helpful', filter_by_star=None,
+                          is_last_page=None, deadline=None):
+        for page, page_reviews in sorted(pages.items()):
+            if page_reviews is None:
+                continue
+            yield page, page_reviews
+            if is_last_page(page, page_reviews):
+                return
+
+    analyzer.iter_review_pages = iter_review_pages
+    return analyzer.refresh_reviews('https://www.amazon.com/dp/B1', state)
+
+
+def _known_state():
+    state = ReviewState('B1')
+    state.merge([_review('r1', 3.0, 1)], SentimentEngine())
+    return state
+
+
+def test_refresh_skips_merge_when_a_page_failed():
+    state = _known_state()
+    pages = {
+        1: [_review(f"p1-{day}", 5.0, day) for day in range(30, 20, -1)],
+        2: None,
+        3: [_review('p3', 5.0, 12), _review('r1', 3.0, 1)],
+    }
+    assert _refresh(pages, state) == []
+    assert state.total_reviews == 1
+    # The reviews of the failed page are still new next time
+    assert not state.is_known(_review('p2', 5.0, 15))
+
+
+def test_refresh_merges_contiguous_pages_up_to_a_known_review():
+    state = _known_state()
+    pages = {
+        1: [_review(f"p1-{day}", 5.0, day) for day in range(30, 20, -1)],
+        2: [_review('p2', 4.0, 15), _review('r1', 3.0, 1)],
+    }
+    new_reviews = _refresh(pages, state)
+    assert len(new_reviews) == 11
+    assert state.total_reviews == 12
+    assert state.is_known(_review('p2', 4.0, 15))
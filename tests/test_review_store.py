@@ -0,0 +1,59 @@
+import os
+
+from src.storage.review_store import ReviewStore, get_review_store
+
+
+def _reviews(prefix, count, rating=5.0):
+    return [
+        {'id': f"{prefix}-{index}", 'rating': rating, 'date': 'January 1, 2024',
+         'verified': True, 'text': f"review {prefix} {index}"}
+        for index in range(count)
+    ]
+
+
+def test_append_skips_duplicates_and_survives_reopen(tmp_path):
+    store = ReviewStore(str(tmp_path))
+    assert store.append('A1', _reviews('a', 3), category='headphones') == 3
+    assert store.append('A1', _reviews('a', 4)) == 1
+    store.close()
+
+    reopened = ReviewStore(str(tmp_path))
+    assert reopened.stats()['reviews'] == 4
+    assert reopened.product_stats('A1')['total_reviews'] == 4
+    assert list(reopened.texts('A1'))[0] == 'review a 0'
+    assert reopened.categories() == ['headphones']
+
+
+def test_reopen_truncates_uncommitted_rows(tmp_path):
+    store = ReviewStore(str(tmp_path))
+    store.append('A1', _reviews('a', 2))
+    # Simulate a writer that crashed after appending column bytes but before committing
+    with open(os.path.join(str(tmp_path), 'rating.col'), 'ab') as f:
+        f.write(b'\0' * 8)
+    with open(os.path.join(str(tmp_path), 'products.jsonl'), 'ab') as f:
+        f.write(b'{"asin": "B')
+
+    reopened = ReviewStore(str(tmp_path))
+    assert reopened.stats()['reviews'] == 2
+    assert os.path.getsize(os.path.join(str(tmp_path), 'rating.col')) == 2 * 4
+    assert reopened.append('B1', _reviews('b', 1)) == 1
+    assert ReviewStore(str(tmp_path)).product_stats('B1')['total_reviews'] == 1
+
+
+def test_two_writers_on_one_directory_keep_products_apart(tmp_path):
+    first = ReviewStore(str(tmp_path))
+    second = ReviewStore(str(tmp_path))
+    first.append('A1', _reviews('a', 3, rating=5.0))
+    second.append('B1', _reviews('b', 2, rating=1.0))
+    first.append('A1', _reviews('a2', 1, rating=5.0))
+    second.append('A1', _reviews('a', 3))
+
+    for store in (first, second, ReviewStore(str(tmp_path))):
+        ratings = store.product_ratings()
+        assert ratings['A1'] == {'reviews': 4, 'average_rating': 5.0}
+        assert ratings['B1'] == {'reviews': 2, 'average_rating': 1.0}
+        assert store.stats()['reviews'] == 6
+
+
+def test_get_review_store_is_shared_per_directory(tmp_path):
+    assert get_review_store(str(tmp_path)) is get_review_store(os.path.join(str(tmp_path), '.'))
@@ -0,0 +1,49 @@
+import pytest
+
+from src.analyzer.sentiment import SentimentEngine
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return SentimentEngine()
+
+
+def test_whole_tokens_only(engine):
+    assert engine.score("these goods arrived") == 0.0
+    assert engine.score("good") == 1.0
+
+
+def test_negation_flips_following_words(engine):
+    assert engine.score("this is not great") == -1.0
+    assert engine.score("not bad at all") == 1.0
+    assert engine.classify("never a good idea") == 'negative'
+
+
+def test_negation_stops_at_clause_punctuation(engine):
+    assert engine.classify("no complaints, great value") == 'positive'
+    assert engine.score("Not bad. Great product, love it!") == 3.0
+    assert engine.score("nothing; perfect") == 1.0
+
+
+def test_negation_stops_at_but(engine):
+    assert engine.score("not cheap but great") == 1.0
+
+
+def test_curly_apostrophes_are_negations(engine):
+    assert engine.score("I don’t love it") == -1.0
+    assert engine.classify("It isn’t good") == 'negative'
+
+
+def test_negation_window(engine):
+    assert engine.score("not at all really good") == 1.5
+
+
+def test_intensifier_scales_next_word(engine):
+    assert engine.score("very good") == 1.5
+    assert engine.score("not very good") == -1.5
+
+
+def test_multi_word_entries():
+    engine = SentimentEngine({'waste of money': -2.0, 'money': 0.5})
+    assert engine.score("a waste of money") == -2.0
+    assert engine.score("worth the money") == 0.5
@@ -0,0 +1,59 @@
+import os
+import stat
+
+from src.auth.session_store import SessionStore
+
+NOW = 1_700_000_000
+
+
+def _cookies(expiry=NOW + 3600, name='at-main'):
+    return [{'name': 'i18n-prefs', 'value': 'USD'}, {'name': name, 'value': 'token', 'expiry': expiry}]
+
+
+def test_save_is_private_and_atomic(tmp_path):
+    store = SessionStore(str(tmp_path / 'amazon_cookies.json'))
+    path = tmp_path / 'amazon_cookies.json'
+    path.write_text('[]')
+    os.chmod(path, 0o644)
+
+    assert store.save(_cookies())
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert store.load() == _cookies()
+    assert os.listdir(tmp_path) == ['amazon_cookies.json']
+
+
+def test_failed_save_keeps_the_previous_session(tmp_path):
+    store = SessionStore(str(tmp_path / 'amazon_cookies.json'))
+    assert store.save(_cookies())
+    assert not store.save([{'name': 'at-main', 'value': object()}])
+    assert store.load() == _cookies()
+    assert os.listdir(tmp_path) == ['amazon_cookies.json']
+
+
+def test_named_sessions_sit_next_to_the_default(tmp_path):
+    store = SessionStore(str(tmp_path / 'amazon_cookies.json'))
+    assert store.file_for('worker-1') == str(tmp_path / 'amazon_cookies.worker-1.json')
+    assert store.file_for('default') == store.file_for() == store.path
+
+
+def test_validity_follows_auth_cookie_expiry():
+    store = SessionStore(min_lifetime=300)
+    assert store.is_valid(_cookies(expiry=NOW + 3600), now=NOW)
+    # Expiring within min_lifetime counts as expired
+    assert not store.is_valid(_cookies(expiry=NOW + 100), now=NOW)
+    assert not store.is_valid(_cookies(expiry=NOW - 1), now=NOW)
+    # Session cookies without an expiry stay valid; without an auth cookie nobody is signed in
+    assert store.is_valid(_cookies(expiry=None), now=NOW)
+    assert not store.is_valid(_cookies(name='session-id'), now=NOW)
+
+
+def test_load_valid_falls_back_to_the_default_session(tmp_path):
+    store = SessionStore(str(tmp_path / 'amazon_cookies.json'))
+    assert store.load_valid('worker-1') is None
+
+    store.save(_cookies(expiry=1), 'worker-1')
+    store.save(_cookies(expiry=None))
+    assert store.load_valid('worker-1') == _cookies(expiry=None)
+
+    (tmp_path / 'amazon_cookies.json').write_text('not json')
+    assert store.load_valid('worker-1') is None
@@ -0,0 +1,102 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from src.instrumentation.tracer import NO_STAGE, TimedWait, Tracer, get_tracer, instrument_driver, traced
+
+
+@pytest.fixture
+def tracer():
+    tracer = get_tracer()
+    tracer.reset()
+    yield tracer
+    tracer.reset()
+
+
+def _counter(tracer, metric, **labels):
+    return sum(counter['value'] for counter in tracer.counters()
+               if counter['metric'] == metric and all(counter['labels'].get(key) == value
+                                                      for key, value in labels.items()))
+
+
+def test_spans_nest_and_record_errors():
+    tracer = Tracer()
+    with tracer.span('query', query='tv'):
+        assert tracer.current_stage() == 'query'
+        with pytest.raises(ValueError):
+            with tracer.span('analyze'):
+                raise ValueError("broken page")
+    assert tracer.current_stage() == NO_STAGE
+
+    totals = tracer.span_totals()
+    assert (totals['query']['count'], totals['query']['errors']) == (1, 0)
+    assert (totals['analyze']['count'], totals['analyze']['errors']) == (1, 1)
+    events = {event['name']: event for event in tracer.to_trace()['traceEvents']}
+    assert events['analyze']['args']['parent'] == 'query'
+    assert events['query']['args']['query'] == 'tv'
+    assert events['analyze']['ph'] == 'X' and events['analyze']['dur'] >= 0
+
+
+def test_prometheus_text():
+    tracer = Tracer()
+    with tracer.span('search'):
+        pass
+    tracer.count('llm_tokens', 120, kind='prompt', model='gpt "3.5"')
+    tracer.count('llm_tokens', 30, kind='completion', model='gpt "3.5"')
+    tracer.count('llm_cache_hits')
+
+    lines = tracer.to_prometheus().splitlines()
+    assert 'shopper_span_seconds_count{span="search"} 1' in lines
+    assert 'shopper_span_errors_total{span="search"} 0' in lines
+    assert 'shopper_llm_tokens_total{kind="prompt",model="gpt \\"3.5\\""} 120' in lines
+    assert 'shopper_llm_cache_hits_total 1' in lines
+    assert lines.count('# TYPE shopper_llm_tokens_total counter') == 1
+
+
+def test_traced_uses_the_process_tracer(tracer):
+    @traced('load')
+    def load():
+        return tracer.current_stage()
+
+    assert load() == 'load'
+    assert tracer.span_totals()['load']['count'] == 1
+
+
+class _Driver:
+    """Minimal WebDriver stand-in whose commands succeed or raise"""
+
+    def __init__(self):
+        self.sent = []
+
+    def execute(self, driver_command, params=None):
+        self.sent.append(driver_command)
+        if driver_command == 'broken':
+            raise RuntimeError("session lost")
+        return {'value': None}
+
+
+def test_instrumented_driver_counts_commands_by_stage(tracer):
+    driver = instrument_driver(_Driver())
+    assert instrument_driver(driver) is driver
+
+    with tracer.span('analyze_product'):
+        driver.execute('get', {'url': 'https://www.amazon.com/dp/B1'})
+        with pytest.raises(RuntimeError):
+            driver.execute('broken')
+    driver.execute('getTitle')
+
+    assert driver.sent == ['get', 'broken', 'getTitle']
+    assert _counter(tracer, 'webdriver_commands', stage='analyze_product') == 2
+    assert _counter(tracer, 'webdriver_commands', command='getTitle', stage=NO_STAGE) == 1
+    assert _counter(tracer, 'webdriver_command_seconds', command='get') >= 0
+
+
+def test_timed_wait_counts_waits_and_timeouts(tracer):
+    driver = _Driver()
+    with tracer.span('search_page'):
+        assert TimedWait(driver, 1).until(lambda driver: 'ready') == 'ready'
+        with pytest.raises(TimeoutException):
+            TimedWait(driver, 0.05, poll_frequency=0.01).until(lambda driver: False)
+
+    assert _counter(tracer, 'webdriver_waits', stage='search_page') == 2
+    assert _counter(tracer, 'webdriver_wait_timeouts', stage='search_page') == 1
+    assert _counter(tracer, 'webdriver_wait_seconds', stage='search_page') >= 0.05